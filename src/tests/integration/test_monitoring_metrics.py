@@ -6,21 +6,49 @@ scraping, metrics exporters functionality, Grafana dashboards integration,
 and alerting pipeline to ensure production-ready monitoring.
 """
 
-import re
 import time
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
 
+import numpy as np
 import pytest  # type: ignore[import-untyped]
 import requests
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import RequestException
 
-from src.utils.constants import METRICS_EXPORTERS, WEB_SERVICES
+from src.utils.alert_latency import format_latency_report, measure_pipeline_latency
+from src.utils.blackbox_probe import format_probe_matrix, run_probe_matrix
+from src.utils.cardinality import (
+    CardinalityAnalysis,
+    analyze_cardinality,
+    format_cardinality_report,
+)
+from src.utils.circuit_breaker import CIRCUIT_BREAKERS
+from src.utils.constants import BLACKBOX_TARGETS, METRICS_EXPORTERS, WEB_SERVICES
+from src.utils.exporter_scrape import format_scrape_report, scrape_exporters
+from src.utils.http_timing import TimedSession
+from src.utils.local_rates import LocalRates, format_rate_report, measure_rates
+from src.utils.prometheus_text import parse_families
+from src.utils.promql import PromQLExecutor, PromQuery, QueryResult, format_query_report
+from src.utils.promql_benchmark import collect_queries
+from src.utils.range_export import RangeExport, export_range
+from src.utils.recording_rules import propose_rules, validate_rules, write_rule_file
+from src.utils.scrape_cost import (
+    ScrapeCostProfile,
+    format_scrape_cost_report,
+    profile_scrape_costs,
+)
+from src.utils.scrape_wait import ScrapeWaitResult, wait_for_scrapes
+from src.utils.slo_eval import evaluate_resources, format_evaluation_report
 
 
 class MonitoringTestUtils:
     """Utility class for monitoring and metrics testing."""
 
+    # Shared: connection reuse, phase timings and per-host circuit breaking
+    session = TimedSession("prometheus", breakers=CIRCUIT_BREAKERS)
+    exporter_session = TimedSession(breakers=CIRCUIT_BREAKERS)
+
     @staticmethod
     def get_prometheus_metrics(
         prometheus_url: str = "http://localhost:9090",
@@ -35,7 +63,9 @@ class MonitoringTestUtils:
             Metrics content as string or None if failed
         """
         try:
-            response = requests.get(f"{prometheus_url}/metrics", timeout=10)
+            response = MonitoringTestUtils.session.get(
+                f"{prometheus_url}/metrics", timeout=10
+            )
             if response.status_code == 200:
                 return response.text
             return None
@@ -57,7 +87,7 @@ class MonitoringTestUtils:
             Query result dictionary or None if failed
         """
         try:
-            response = requests.get(
+            response = MonitoringTestUtils.session.get(
                 f"{prometheus_url}/api/v1/query", params={"query": query}, timeout=10
             )
             if response.status_code == 200:
@@ -66,21 +96,143 @@ class MonitoringTestUtils:
         except RequestException:
             return None
 
+    @staticmethod
+    def run_queries(
+        queries: Iterable[Union[str, PromQuery]],
+        prometheus_url: str = "http://localhost:9090",
+    ) -> Dict[PromQuery, QueryResult]:
+        """
+        Execute many PromQL queries concurrently over the shared session.
+
+        Args:
+            queries: Instant expressions or ``PromQuery`` (range) objects;
+                duplicates run once
+            prometheus_url: Prometheus base URL
+
+        Returns:
+            Result per distinct query with latency and series counts
+        """
+        executor = PromQLExecutor(prometheus_url, session=MonitoringTestUtils.session)
+        return executor.run(queries)
+
+    @staticmethod
+    def export_range(
+        expr: str,
+        start: float,
+        end: float,
+        step: float,
+        prometheus_url: str = "http://localhost:9090",
+        cache_dir: Optional[Union[str, Path]] = None,
+    ) -> RangeExport:
+        """
+        Export a range query into NumPy arrays over the shared session.
+
+        Args:
+            expr: PromQL expression
+            start: Window start (Unix seconds)
+            end: Window end (Unix seconds)
+            step: Resolution in seconds
+            prometheus_url: Prometheus base URL
+            cache_dir: Directory of cached ``.npz`` exports; None disables it
+
+        Returns:
+            RangeExport with timestamp and value arrays per series
+        """
+        return export_range(
+            expr,
+            start,
+            end,
+            step,
+            prometheus_url,
+            session=MonitoringTestUtils.session,
+            cache_dir=cache_dir,
+        )
+
+    @staticmethod
+    def measure_local_rates(
+        exporter: str, scrapes: int = 2, interval: float = 5.0, host: str = "localhost"
+    ) -> LocalRates:
+        """
+        Compute counter rates of an exporter from successive local scrapes.
+
+        Args:
+            exporter: Name from ``METRICS_EXPORTERS``
+            scrapes: Number of scrapes (at least two)
+            interval: Seconds between scrapes
+            host: Host the exporter port is published on
+
+        Returns:
+            Per-series rates and histogram quantiles, without Prometheus
+        """
+        config = METRICS_EXPORTERS[exporter]
+        url = f"http://{host}:{config['port']}{config.get('endpoint', '/metrics')}"
+        return measure_rates(
+            url, scrapes, interval, session=MonitoringTestUtils.exporter_session
+        )
+
+    @staticmethod
+    def analyze_cardinality(
+        prometheus_url: str = "http://localhost:9090",
+        baseline_path: Optional[Union[str, Path]] = None,
+    ) -> CardinalityAnalysis:
+        """
+        Analyse series cardinality of the exporters in ``prometheus.yml``.
+
+        Args:
+            prometheus_url: Prometheus base URL
+            baseline_path: Per-job counts of the previous run, read and then
+                overwritten; None skips the growth check
+
+        Returns:
+            Per-exporter, per-job and TSDB series counts, plus the exporters
+            whose cardinality grew since the previous run
+        """
+        return analyze_cardinality(
+            prometheus_url,
+            session=MonitoringTestUtils.session,
+            baseline_path=baseline_path,
+        )
+
+    @staticmethod
+    def profile_scrape_costs(
+        prometheus_url: str = "http://localhost:9090", window: int = 3600
+    ) -> ScrapeCostProfile:
+        """
+        Profile scrape duration, samples and series per job over a window.
+
+        Args:
+            prometheus_url: Prometheus base URL
+            window: Lookback window in seconds
+
+        Returns:
+            Percentiles per target and per job, ranked by interval usage
+        """
+        return profile_scrape_costs(
+            prometheus_url, window, session=MonitoringTestUtils.session
+        )
+
     @staticmethod
     def get_prometheus_targets(
         prometheus_url: str = "http://localhost:9090",
+        state: Optional[str] = "active",
     ) -> Optional[Dict]:
         """
-        Get all Prometheus targets and their states.
+        Get Prometheus targets and their states.
 
         Args:
             prometheus_url: Prometheus base URL
+            state: Target state filter (``active``, ``dropped`` or ``None`` for
+                all); dropped targets can dwarf the active list
 
         Returns:
             Targets information or None if failed
         """
         try:
-            response = requests.get(f"{prometheus_url}/api/v1/targets", timeout=10)
+            response = MonitoringTestUtils.session.get(
+                f"{prometheus_url}/api/v1/targets",
+                params={"state": state} if state else None,
+                timeout=10,
+            )
             if response.status_code == 200:
                 return response.json()
             return None
@@ -96,30 +248,37 @@ class MonitoringTestUtils:
             metrics_content: Raw metrics content
 
         Returns:
-            Dictionary with metric families and their samples
-        """
-        metric_families = {}
-        current_family = None
-
-        for line in metrics_content.split("\n"):
-            line = line.strip()
-
-            if line.startswith("# HELP "):
-                current_family = line.split(" ", 2)[2].split(" ")[0]
-                if current_family not in metric_families:
-                    metric_families[current_family] = []
-            elif line and not line.startswith("#"):
-                # Extract metric name from sample line
-                metric_match = re.match(r"^([a-zA-Z_][a-zA-Z0-9_]*)", line)
-                if metric_match:
-                    metric_name = metric_match.group(1)
-                    if (
-                        current_family
-                        and metric_name not in metric_families[current_family]
-                    ):
-                        metric_families[current_family].append(metric_name)
-
-        return metric_families
+            Dictionary with metric families and their sample names (e.g. a
+            histogram family lists its ``_bucket``, ``_sum`` and ``_count``)
+        """
+        return {
+            name: sorted(family.sample_names)
+            for name, family in parse_families(metrics_content).items()
+        }
+
+    @staticmethod
+    def wait_for_prometheus_scrapes(
+        target_jobs: Iterable[str],
+        prometheus_url: str = "http://localhost:9090",
+        timeout: int = 60,
+    ) -> ScrapeWaitResult:
+        """
+        Wait for Prometheus to successfully scrape several jobs at once.
+
+        Each job is polled through its own ``scrapePool`` filter, shortly
+        after its next scrape is due according to ``prometheus.yml``.
+
+        Args:
+            target_jobs: Job names to wait for
+            prometheus_url: Prometheus base URL
+            timeout: Maximum wait time in seconds, shared by all jobs
+
+        Returns:
+            ScrapeWaitResult with the first healthy scrape timestamp per job
+        """
+        return wait_for_scrapes(
+            target_jobs, prometheus_url, timeout, session=MonitoringTestUtils.session
+        )
 
     @staticmethod
     def wait_for_prometheus_scrape(
@@ -138,23 +297,9 @@ class MonitoringTestUtils:
         Returns:
             True if target is scraped successfully, False otherwise
         """
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            targets_data = MonitoringTestUtils.get_prometheus_targets(prometheus_url)
-            if targets_data and targets_data.get("status") == "success":
-                active_targets = targets_data.get("data", {}).get("activeTargets", [])
-
-                for target in active_targets:
-                    if (
-                        target.get("labels", {}).get("job") == target_job
-                        and target.get("health") == "up"
-                    ):
-                        return True
-
-            time.sleep(5)
-
-        return False
+        return MonitoringTestUtils.wait_for_prometheus_scrapes(
+            [target_job], prometheus_url, timeout
+        ).all_healthy
 
 
 @pytest.mark.integration
@@ -216,79 +361,24 @@ class TestMonitoringInfrastructure:
         """
         failed_exporters = []
 
-        for exporter_name, config in METRICS_EXPORTERS.items():
-            try:
-                port = config["port"]
-                endpoint = config["endpoint"]
-
-                response = requests.get(
-                    f"http://localhost:{port}{endpoint}", timeout=15
-                )
-
-                if response.status_code != 200:
-                    failed_exporters.append(
-                        f"{exporter_name}: HTTP {response.status_code}"
-                    )
-                    continue
-
-                metrics_content = response.text
-
-                # Validate metrics format and content
-                if not metrics_content or len(metrics_content.strip()) == 0:
-                    failed_exporters.append(f"{exporter_name}: Empty metrics response")
-                    continue
-
-                # Parse and validate metrics
-                parsed_metrics = MonitoringTestUtils.parse_prometheus_metrics(
-                    metrics_content
+        # Scrape every exporter at once; each stops after its required families
+        scrapes = scrape_exporters(
+            METRICS_EXPORTERS, session=MonitoringTestUtils.exporter_session
+        )
+        print(format_scrape_report(scrapes))
+
+        for exporter_name, scrape in scrapes.items():
+            if scrape.error:
+                failed_exporters.append(f"{exporter_name}: {scrape.error}")
+            elif scrape.status_code != 200:
+                failed_exporters.append(f"{exporter_name}: HTTP {scrape.status_code}")
+            elif scrape.samples == 0:
+                failed_exporters.append(f"{exporter_name}: No valid metrics found")
+            elif scrape.missing:
+                failed_exporters.append(
+                    f"{exporter_name}: Missing metrics {scrape.missing}"
                 )
 
-                if len(parsed_metrics) == 0:
-                    failed_exporters.append(f"{exporter_name}: No valid metrics found")
-                    continue
-
-                # Validate specific exporter metrics based on type
-                if "node-exporter" in exporter_name:
-                    required_metrics = ["node_cpu", "node_memory", "node_filesystem"]
-                    missing_metrics = [
-                        m
-                        for m in required_metrics
-                        if not any(m in family for family in parsed_metrics.keys())
-                    ]
-                    if missing_metrics:
-                        failed_exporters.append(
-                            f"{exporter_name}: Missing metrics {missing_metrics}"
-                        )
-
-                elif "cadvisor" in exporter_name:
-                    required_metrics = ["container_cpu", "container_memory"]
-                    missing_metrics = [
-                        m
-                        for m in required_metrics
-                        if not any(m in family for family in parsed_metrics.keys())
-                    ]
-                    if missing_metrics:
-                        failed_exporters.append(
-                            f"{exporter_name}: Missing metrics {missing_metrics}"
-                        )
-
-                elif "postgres-exporter" in exporter_name:
-                    required_metrics = ["pg_up", "pg_stat"]
-                    missing_metrics = [
-                        m
-                        for m in required_metrics
-                        if not any(m in family for family in parsed_metrics.keys())
-                    ]
-                    if missing_metrics:
-                        failed_exporters.append(
-                            f"{exporter_name}: Missing metrics {missing_metrics}"
-                        )
-
-            except RequestException as e:
-                failed_exporters.append(f"{exporter_name}: Connection error - {e}")
-            except Exception as e:
-                failed_exporters.append(f"{exporter_name}: Unexpected error - {e}")
-
         if failed_exporters:
             failure_details = "\n".join([f"  - {error}" for error in failed_exporters])
             pytest.fail(
@@ -308,6 +398,12 @@ class TestMonitoringInfrastructure:
         prometheus_config = WEB_SERVICES["infra-default-prometheus"]
         base_url = f"http://localhost:{prometheus_config['port']}"
 
+        # Give freshly started exporters one scrape round before judging health
+        scrape_wait = MonitoringTestUtils.wait_for_prometheus_scrapes(
+            ["prometheus", *METRICS_EXPORTERS], base_url, timeout=30
+        )
+        print(f"⏱️  Scrape wait: {scrape_wait.describe()}")
+
         # Get all targets
         targets_data = MonitoringTestUtils.get_prometheus_targets(base_url)
         assert targets_data is not None, "❌ Failed to retrieve Prometheus targets"
@@ -316,7 +412,6 @@ class TestMonitoringInfrastructure:
         ), "❌ Prometheus targets API failed"
 
         active_targets = targets_data.get("data", {}).get("activeTargets", [])
-        targets_data.get("data", {}).get("droppedTargets", [])
 
         assert len(active_targets) > 0, "❌ No active targets found in Prometheus"
 
@@ -388,37 +483,29 @@ class TestMonitoringInfrastructure:
 
         failed_queries = []
 
-        for query, description in test_queries:
-            try:
-                result = MonitoringTestUtils.query_prometheus(query, base_url)
-
-                if result is None:
-                    failed_queries.append(f"{description}: Query failed")
-                    continue
-
-                if result.get("status") != "success":
-                    failed_queries.append(
-                        f"{description}: {result.get('error', 'Unknown error')}"
-                    )
-                    continue
+        # All queries run concurrently over the shared session
+        results = MonitoringTestUtils.run_queries(
+            [query for query, _ in test_queries], base_url
+        )
+        print(format_query_report(results))
 
-                data = result.get("data", {})
-                result_type = data.get("resultType")
-                result_values = data.get("result", [])
+        for query, description in test_queries:
+            result = results[PromQuery(query)]
 
-                if result_type not in ["vector", "matrix", "scalar"]:
-                    failed_queries.append(
-                        f"{description}: Invalid result type {result_type}"
-                    )
-                    continue
+            if not result.ok:
+                failed_queries.append(f"{description}: {result.error}")
+                continue
 
-                if len(result_values) == 0 and query in ["up", "prometheus_build_info"]:
-                    failed_queries.append(
-                        f"{description}: No data returned for basic query"
-                    )
+            if result.result_type not in ["vector", "matrix", "scalar"]:
+                failed_queries.append(
+                    f"{description}: Invalid result type {result.result_type}"
+                )
+                continue
 
-            except Exception as e:
-                failed_queries.append(f"{description}: Exception - {e}")
+            if result.series == 0 and query in ["up", "prometheus_build_info"]:
+                failed_queries.append(
+                    f"{description}: No data returned for basic query"
+                )
 
         if failed_queries:
             failure_details = "\n".join([f"  - {error}" for error in failed_queries])
@@ -426,6 +513,164 @@ class TestMonitoringInfrastructure:
                 f"❌ {len(failed_queries)} PromQL quer(ies) failed:\n{failure_details}"
             )
 
+    def test_series_cardinality_analysis(self, tmp_path: Path) -> None:
+        """
+        🧮 Test series cardinality across the exporters and the TSDB.
+
+        This test verifies:
+        - Every exporter body is counted per metric, label and label value
+        - The TSDB status endpoint reports head series
+        - Per-job series counts are saved as a baseline outside the source tree
+        """
+        prometheus_config = WEB_SERVICES["infra-default-prometheus"]
+        base_url = f"http://localhost:{prometheus_config['port']}"
+        baseline = tmp_path / "cardinality-baseline.json"
+
+        analysis = MonitoringTestUtils.analyze_cardinality(base_url, baseline)
+        print(format_cardinality_report(analysis))
+
+        assert (
+            analysis.tsdb is not None
+        ), f"❌ TSDB status unavailable: {analysis.errors.get('prometheus')}"
+        assert analysis.tsdb.series > 0, "❌ Prometheus head block reports no series"
+        assert (
+            analysis.exporters
+        ), f"❌ No exporter could be analysed: {analysis.errors}"
+
+        assert baseline.exists(), "❌ Per-job series baseline was not saved"
+
+    def test_scrape_cost_profile(self) -> None:
+        """
+        💸 Test scrape cost of every configured job.
+
+        This test verifies:
+        - Scrape duration and sample series exist for the configured jobs
+        - No target's p95 scrape takes longer than its scrape interval
+        """
+        prometheus_config = WEB_SERVICES["infra-default-prometheus"]
+        base_url = f"http://localhost:{prometheus_config['port']}"
+
+        profile = MonitoringTestUtils.profile_scrape_costs(base_url, window=900)
+        print(format_scrape_cost_report(profile))
+
+        assert not profile.errors, f"❌ Scrape metric queries failed: {profile.errors}"
+        assert "prometheus" in profile.jobs, "❌ No scrape data for Prometheus itself"
+
+        overrunning = [
+            f"{cost.job} ({cost.instance}): {cost.interval_usage:.0%} of interval"
+            for cost in profile.ranked()
+            if cost.interval_usage >= 1
+        ]
+        assert not overrunning, f"❌ Scrapes overrunning interval: {overrunning}"
+
+    def test_range_export_to_arrays(self) -> None:
+        """
+        📦 Test chunked range export into NumPy arrays.
+
+        This test verifies:
+        - A window split into several chunks is merged into one series per target
+        - Timestamps are strictly increasing, with no duplicates at chunk edges
+        """
+        prometheus_config = WEB_SERVICES["infra-default-prometheus"]
+        base_url = f"http://localhost:{prometheus_config['port']}"
+        end = time.time() // 15 * 15
+
+        export = MonitoringTestUtils.export_range(
+            'up{job="prometheus"}', end - 900, end, 15, base_url
+        )
+        chunked = export_range(
+            'up{job="prometheus"}', end - 900, end, 15, base_url, max_points=10
+        )
+
+        assert export.series, "❌ No series exported for the Prometheus job"
+        assert chunked.samples == export.samples, "❌ Chunked export lost samples"
+        for series in chunked.series:
+            assert (np.diff(series.timestamps) > 0).all(), "❌ Unordered samples"
+
+    def test_resource_thresholds_over_history(self) -> None:
+        """
+        🎯 Test CPU, memory and disk history against the monitor thresholds.
+
+        This test verifies:
+        - Container CPU and filesystem usage history is available
+        - Multiwindow burn rate alerts are reported, not silently dropped
+        """
+        prometheus_config = WEB_SERVICES["infra-default-prometheus"]
+        base_url = f"http://localhost:{prometheus_config['port']}"
+
+        evaluations = evaluate_resources(
+            base_url, window=3600, step=15, session=MonitoringTestUtils.session
+        )
+        print(format_evaluation_report(evaluations))
+
+        assert evaluations["cpu"].history.labels, "❌ No container CPU history"
+        assert evaluations["disk"].history.labels, "❌ No filesystem usage history"
+        firing = [
+            f"{resource}: {alert.labels}"
+            for resource, evaluation in evaluations.items()
+            for alert in evaluation.alerts
+            if alert.firing_now
+        ]
+        if firing:
+            print(f"⚠️  Error budget burning: {firing}")
+
+    def test_local_counter_rates(self) -> None:
+        """
+        ⚡ Test counter rates computed locally from two cadvisor scrapes.
+
+        This test verifies:
+        - Container CPU counters are indexed by series and diffed locally
+        - At least one container is using CPU between the scrapes
+        """
+        # Idle containers are resampled less often; three scrapes give the
+        # busy ones at least one fresh sample
+        local = MonitoringTestUtils.measure_local_rates(
+            "cadvisor", scrapes=3, interval=2
+        )
+        print(format_rate_report(local, match="container_cpu_usage_seconds_total"))
+
+        busiest = local.top(5, match="container_cpu_usage_seconds_total")
+        assert busiest, "❌ No container CPU counters found in cadvisor scrapes"
+        assert busiest[0].rate > 0, "❌ No container used CPU between scrapes"
+
+    def test_blackbox_probe_matrix(self) -> None:
+        """
+        🛰️ Test on-demand blackbox probes of the monitoring services.
+
+        This test verifies:
+        - The exporter's /probe endpoint answers for http, tcp and icmp modules
+        - Prometheus and Grafana pass their HTTP and TCP probes
+        """
+        targets = {name: BLACKBOX_TARGETS[name] for name in ("prometheus", "grafana")}
+        matrix = run_probe_matrix(targets, session=MonitoringTestUtils.exporter_session)
+        print(format_probe_matrix(matrix))
+
+        latency = matrix.latency()
+        failed = [
+            f"{target} {kind}"
+            for target in targets
+            for kind in ("http", "tcp")
+            if latency[target].get(kind) is None
+        ]
+        assert not failed, f"❌ Blackbox probes failed: {failed}"
+
+    def test_generated_recording_rules_are_valid(self, tmp_path: Path) -> None:
+        """
+        📼 Test recording rules proposed for the alert and dashboard queries.
+
+        This test verifies:
+        - Expensive sub-expressions of every query get a recording rule
+        - promtool accepts the generated rule file
+        """
+        rules, rewrites = propose_rules(query.expr for query in collect_queries())
+        if not rules:
+            pytest.skip("No query has a sub-expression worth recording")
+
+        rule_file = write_rule_file(rules, tmp_path / "recording_rules.yml")
+        valid, output = validate_rules(rule_file)
+        assert valid, f"❌ promtool rejected the generated rules:\n{output}"
+        print(f"✅ {len(rules)} recording rule(s) for {len(rewrites)} quer(ies)")
+
     def test_grafana_prometheus_integration(self) -> None:
         """
         📊 Test Grafana and Prometheus integration.
@@ -534,6 +779,27 @@ class TestMonitoringInfrastructure:
             )
             print(f"📊 Alert states: {state_summary}")
 
+    @pytest.mark.slow
+    def test_alert_pipeline_latency(self) -> None:
+        """
+        ⏱️ Test firing-to-delivery latency of the alert pipeline.
+
+        This test verifies:
+        - The probe rule is installed for the run and fires once its
+          condition holds
+        - Alertmanager receives it and delivers it through the probe receiver
+        """
+        prometheus_config = WEB_SERVICES["infra-default-prometheus"]
+        prometheus_url = f"http://localhost:{prometheus_config['port']}"
+
+        runs = measure_pipeline_latency(runs=1, prometheus_url=prometheus_url)
+        print(format_latency_report(runs))
+
+        run = runs[0]
+        assert run.evaluated is not None, "❌ Probe alert never fired in Prometheus"
+        assert run.received is not None, "❌ Alertmanager never received the alert"
+        assert run.delivered is not None, "❌ Webhook notification never delivered"
+
 
 @pytest.mark.integration
 @pytest.mark.monitoring
@@ -5,9 +5,15 @@ This module tests Keycloak, Vault, SonarQube security features,
 MailHog, Alertmanager, and Webhook Listener functionality.
 """
 
+from typing import Any, Callable, Dict
+
 import pytest
 
+from src.utils.circuit_breaker import CIRCUIT_BREAKERS, CircuitOpenError
+from src.utils.http_probe import ProbeSpec, fetch_probe
+from src.utils.http_timing import TimedSession, emit_report
 from src.utils.security_testing import (
+    SecurityTestSkipped,
     comprehensive_security_test,
     test_alertmanager_functionality,
     test_keycloak_functionality,
@@ -18,11 +24,19 @@ from src.utils.security_testing import (
 )
 
 
+def _run_or_skip(test_func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Run a service check, skipping the test when the service's circuit is open."""
+    try:
+        return test_func()
+    except SecurityTestSkipped as e:
+        pytest.skip(str(e))
+
+
 @pytest.mark.integration
 @pytest.mark.security
 def test_keycloak_service_functionality() -> None:
     """🔐 Test Keycloak authentication server functionality."""
-    results = test_keycloak_functionality()
+    results = _run_or_skip(test_keycloak_functionality)
 
     assert results["server_info"], "❌ Keycloak server info endpoint not accessible"
     assert results["realms_accessible"], "❌ Keycloak realms endpoint not accessible"
@@ -37,7 +51,7 @@ def test_keycloak_service_functionality() -> None:
 @pytest.mark.security
 def test_vault_service_functionality() -> None:
     """🔒 Test HashiCorp Vault functionality."""
-    results = test_vault_functionality()
+    results = _run_or_skip(test_vault_functionality)
 
     assert results["server_status"], "❌ Vault server not accessible"
     assert results["sys_health"], "❌ Vault system health check failed"
@@ -52,7 +66,7 @@ def test_vault_service_functionality() -> None:
 @pytest.mark.security
 def test_sonarqube_security_features() -> None:
     """🧹 Test SonarQube security configuration and API."""
-    results = test_sonarqube_security()
+    results = _run_or_skip(test_sonarqube_security)
 
     assert results["system_status"], "❌ SonarQube system not running properly"
     assert results[
@@ -68,7 +82,7 @@ def test_sonarqube_security_features() -> None:
 @pytest.mark.services
 def test_mailhog_email_capture() -> None:
     """📧 Test MailHog email capture functionality."""
-    results = test_mailhog_functionality()
+    results = _run_or_skip(test_mailhog_functionality)
 
     assert results["web_interface"], "❌ MailHog web interface not accessible"
     assert results["api_accessible"], "❌ MailHog API not accessible"
@@ -83,7 +97,7 @@ def test_mailhog_email_capture() -> None:
 @pytest.mark.monitoring
 def test_alertmanager_monitoring() -> None:
     """🚨 Test Prometheus Alertmanager functionality."""
-    results = test_alertmanager_functionality()
+    results = _run_or_skip(test_alertmanager_functionality)
 
     assert results["status_check"], "❌ Alertmanager health check failed"
     assert results["config_check"], "❌ Alertmanager configuration check failed"
@@ -95,7 +109,7 @@ def test_alertmanager_monitoring() -> None:
 @pytest.mark.services
 def test_webhook_listener_service() -> None:
     """🔗 Test custom webhook listener functionality."""
-    results = test_webhook_listener_functionality()
+    results = _run_or_skip(test_webhook_listener_functionality)
 
     assert results["server_accessible"], "❌ Webhook listener server not accessible"
 
@@ -123,9 +137,13 @@ def test_all_security_services_comprehensive() -> None:
             failures.append(
                 f"{service_name}: {service_results.get('error', 'Unknown error')}"
             )
+        elif service_results.get("overall_status") == "SKIPPED":
+            print(f"⏭️  {service_name.title()} {service_results['error']}")
         else:
             print(f"✅ {service_name.title()} security tests passed")
 
+    print(emit_report())
+
     if failures:
         failure_msg = "❌ Security service failures:\n" + "\n".join(failures)
         pytest.fail(failure_msg)
@@ -161,6 +179,8 @@ def test_security_service_individual(service: str, test_func) -> None:
         # Ensure at least 50% of tests pass for the service to be considered functional
         assert success_rate >= 50, f"❌ {service} has less than 50% test success rate"
 
+    except SecurityTestSkipped as e:
+        pytest.skip(str(e))
     except Exception as e:
         pytest.fail(f"❌ {service} security test failed: {e}")
 
@@ -174,23 +194,29 @@ def test_security_services_basic_health() -> None:
     import requests
 
     security_endpoints = [
-        ("Keycloak", "http://localhost:8099/health"),
-        ("Vault", "http://localhost:8200/v1/sys/health"),
-        ("SonarQube", "http://localhost:9000/api/system/status"),
-        ("MailHog", "http://localhost:8025/api/v1/messages"),
-        ("Alertmanager", "http://localhost:9093/-/healthy"),
-        ("Webhook Listener", "http://localhost:5001/"),
+        ("Keycloak", "http://localhost:8099", "/health"),
+        ("Vault", "http://localhost:8200", "/v1/sys/health"),
+        ("SonarQube", "http://localhost:9000", "/api/system/status"),
+        ("MailHog", "http://localhost:8025", "/api/v1/messages"),
+        ("Alertmanager", "http://localhost:9093", "/-/healthy"),
+        ("Webhook Listener", "http://localhost:5001", "/"),
     ]
 
     failures = []
 
-    for service_name, endpoint in security_endpoints:
+    for service_name, base_url, path in security_endpoints:
         try:
-            response = requests.get(endpoint, timeout=10)
-            if response.status_code not in [200, 401, 403, 404, 405]:
-                failures.append(f"{service_name}: HTTP {response.status_code}")
+            # Status only: HEAD, or a GET whose body is never read
+            with TimedSession(
+                service_name.lower(), breakers=CIRCUIT_BREAKERS
+            ) as session:
+                probe = fetch_probe(session, base_url, ProbeSpec(path), timeout=10)
+            if probe.status_code not in [200, 401, 403, 404, 405]:
+                failures.append(f"{service_name}: HTTP {probe.status_code}")
             else:
                 print(f"✅ {service_name} is accessible")
+        except CircuitOpenError as e:
+            print(f"⏭️  {service_name} skipped: {e}")
         except requests.RequestException as e:
             failures.append(f"{service_name}: {str(e)}")
 
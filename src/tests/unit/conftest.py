@@ -0,0 +1,39 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, List, Type
+
+import pytest
+
+StartServer = Callable[..., str]
+
+
+@pytest.fixture
+def http_server() -> Iterator[StartServer]:
+    """
+    Start stub HTTP services on localhost for one test.
+
+    The fixture is a factory: call it with a ``BaseHTTPRequestHandler``
+    subclass, and optionally a fixed port, to get the base URL of a
+    threaded server answering with that handler. Request logging is
+    silenced, and every server started is shut down at teardown.
+
+    Example:
+        >>> url = http_server(_MetricsHandler)
+    """
+    servers: List[ThreadingHTTPServer] = []
+
+    def start(handler: Type[BaseHTTPRequestHandler], port: int = 0) -> str:
+        quiet = type(handler.__name__, (handler,), {"log_message": _no_log})
+        server = ThreadingHTTPServer(("127.0.0.1", port), quiet)
+        servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _no_log(self: BaseHTTPRequestHandler, format: str, *args: object) -> None:
+    pass
@@ -0,0 +1,152 @@
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List
+
+import pytest
+import yaml
+
+from src.utils.alert_latency import (
+    PROBE_ALERT,
+    AlertLatencyError,
+    PipelineRun,
+    format_latency_report,
+    latency_summary,
+    measure_pipeline_latency,
+    measure_run,
+    next_onset,
+)
+from src.utils.http_timing import TimedSession
+
+STATE: Dict[str, Any] = {}
+
+
+def _rfc3339(epoch: float) -> str:
+    moment = datetime.fromtimestamp(epoch, timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f") + "123Z"
+
+
+class _PipelineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        onset = STATE["onset"]
+        body: Any
+        if self.path.startswith("/api/v1/alerts"):
+            alerts = [
+                {
+                    "labels": {"alertname": PROBE_ALERT},
+                    "state": "firing",
+                    "activeAt": _rfc3339(onset + 2),
+                }
+            ]
+            body = {"status": "success", "data": {"alerts": alerts}}
+        elif self.path.startswith("/api/v2/alerts"):
+            body = [
+                # Previous onset, still listed
+                {"startsAt": _rfc3339(onset - 118), "updatedAt": _rfc3339(onset - 60)},
+                {"startsAt": _rfc3339(onset + 2), "updatedAt": _rfc3339(onset + 2.4)},
+            ]
+        else:
+            # The probe receiver's delivered count (sent minus failed) goes
+            # from 1 to 2; other critical alerts notify on every call
+            STATE["metrics_calls"] += 1
+            calls = STATE["metrics_calls"]
+            sent = 3 if calls > 2 else 2
+            body = (
+                'alertmanager_notifications_total{integration="webhook",'
+                f'receiver_name="webhook-rabbitmq"}} {calls}\n'
+                'alertmanager_notifications_total{integration="webhook",'
+                f'receiver_name="pipeline-latency-probe"}} {sent}\n'
+                'alertmanager_notifications_failed_total{integration="webhook",'
+                'receiver_name="pipeline-latency-probe"} 1\n'
+            )
+
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stack_url(http_server: Callable[..., str]) -> str:
+    STATE.update(onset=time.time() - 0.5, metrics_calls=0)
+    return http_server(_PipelineHandler)
+
+
+@pytest.mark.unit
+def test_next_onset_is_the_next_period_boundary() -> None:
+    assert next_onset(1000.0, period=120) == 1080.0
+    assert next_onset(1080.0, period=120) == 1200.0
+
+
+@pytest.mark.unit
+def test_run_timestamps_every_stage(stack_url: str) -> None:
+    with TimedSession() as session:
+        run = measure_run(session, STATE["onset"], stack_url, stack_url, timeout=5)
+
+    assert run.complete
+    latencies = run.stage_latencies()
+    assert latencies["evaluation"] == pytest.approx(2.0, abs=0.01)
+    assert latencies["receipt"] == pytest.approx(0.4, abs=0.01)
+    assert run.delivered is not None and run.delivered >= 0.5
+    assert STATE["metrics_calls"] == 3
+
+
+class _Runner:
+    def __init__(self, failing: str = "") -> None:
+        self.failing = failing
+        self.commands: List[List[str]] = []
+        self.rules: Any = None
+
+    def __call__(self, command: List[str], **kwargs: Any) -> Any:
+        self.commands.append(command)
+        if command[1] == "cp":
+            with open(command[2]) as rule_file:
+                self.rules = yaml.safe_load(rule_file)
+        code = 1 if self.failing and self.failing in command else 0
+        return subprocess.CompletedProcess(command, code, "", "err" if code else "")
+
+
+@pytest.mark.unit
+def test_probe_rule_exists_only_while_measuring() -> None:
+    runner = _Runner()
+
+    assert measure_pipeline_latency(runs=0, runner=runner) == []
+
+    assert [command[1] for command in runner.commands] == ["cp", "kill", "exec", "kill"]
+    assert runner.commands[0][3].endswith(":/etc/prometheus/latency_probe.yml")
+    assert runner.commands[2][-1] == "/etc/prometheus/latency_probe.yml"
+    (rule,) = runner.rules["groups"][0]["rules"]
+    assert rule["alert"] == PROBE_ALERT
+    assert rule["expr"] == "(time() % 120) < 30"
+    assert rule["labels"]["probe"] == "pipeline-latency"
+
+
+@pytest.mark.unit
+def test_probe_is_removed_when_install_fails() -> None:
+    runner = _Runner(failing="HUP")
+
+    with pytest.raises(AlertLatencyError, match="HUP"):
+        measure_pipeline_latency(runs=1, runner=runner)
+
+    assert [command[1] for command in runner.commands] == ["cp", "kill", "exec", "kill"]
+
+
+@pytest.mark.unit
+def test_summary_skips_missing_stages() -> None:
+    runs = [
+        PipelineRun(0, evaluated=5.0, received=5.5, delivered=16.0),
+        PipelineRun(120, evaluated=14.0, received=14.2, delivered=25.0),
+        PipelineRun(240, evaluated=1.0),
+    ]
+
+    summary = latency_summary(runs)
+
+    assert summary["evaluation"]["count"] == 3
+    assert summary["end_to_end"]["count"] == 2
+    assert summary["delivery"]["max"] == pytest.approx(10.8)
+    assert "never reached: receipt, delivery" in format_latency_report(runs)
@@ -0,0 +1,54 @@
+from http.server import BaseHTTPRequestHandler
+from typing import Callable
+
+import pytest
+
+from src.utils.alertmanager_benchmark import (
+    BENCHMARK_RECEIVER,
+    build_alerts,
+    webhook_notifications,
+)
+from src.utils.http_timing import TimedSession, TimingRecorder
+
+METRICS = b"""# HELP alertmanager_notifications_total The total number of attempted notifications.
+# TYPE alertmanager_notifications_total counter
+alertmanager_notifications_total{integration="email",receiver_name="default-receiver"} 7
+alertmanager_notifications_total{integration="webhook",receiver_name="webhook-rabbitmq"} 9
+alertmanager_notifications_total{integration="webhook",receiver_name="alertmanager-benchmark"} 3
+alertmanager_notifications_failed_total{integration="email",receiver_name="default-receiver"} 7
+alertmanager_notifications_failed_total{integration="webhook",receiver_name="webhook-rabbitmq"} 2
+alertmanager_notifications_failed_total{integration="webhook",receiver_name="alertmanager-benchmark"} 0
+"""
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(METRICS)))
+        self.end_headers()
+        self.wfile.write(METRICS)
+
+
+@pytest.fixture
+def alertmanager_url(http_server: Callable[..., str]) -> str:
+    return http_server(_MetricsHandler)
+
+
+@pytest.mark.unit
+def test_build_alerts_spreads_over_groups() -> None:
+    alerts = build_alerts("run", "s1", cardinality=10, groups=3, extra_labels=2)
+
+    assert len({alert["labels"]["alertname"] for alert in alerts}) == 3
+    assert len({alert["labels"]["instance"] for alert in alerts}) == 10
+    assert all(alert["labels"]["severity"] == "critical" for alert in alerts)
+    assert all(alert["labels"]["benchmark"] == "alertmanager" for alert in alerts)
+    assert {"extra_0", "extra_1"} <= alerts[0]["labels"].keys()
+
+
+@pytest.mark.unit
+def test_webhook_notifications_counts_delivered(alertmanager_url: str) -> None:
+    with TimedSession("alertmanager", recorder=TimingRecorder()) as session:
+        assert webhook_notifications(session, alertmanager_url) == 10
+        # Only the benchmark's own receiver, not the always-firing alerts
+        assert webhook_notifications(session, alertmanager_url, BENCHMARK_RECEIVER) == 3
+        assert webhook_notifications(session, alertmanager_url, "unknown") == 0
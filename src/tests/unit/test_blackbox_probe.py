@@ -0,0 +1,114 @@
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.utils.blackbox_probe import (
+    format_probe_matrix,
+    probe_plan,
+    run_probe_matrix,
+)
+
+TARGETS = {
+    "web": {"host": "web", "port": 80, "http": "/health"},
+    "db": {"host": "db", "port": 5432},
+}
+
+HTTP_OUTPUT = """# HELP probe_dns_lookup_time_seconds Returns the time taken for probe dns lookup in seconds
+# TYPE probe_dns_lookup_time_seconds gauge
+probe_dns_lookup_time_seconds 0.001
+# TYPE probe_duration_seconds gauge
+probe_duration_seconds 0.012
+# TYPE probe_http_duration_seconds gauge
+probe_http_duration_seconds{phase="connect"} 0.002
+probe_http_duration_seconds{phase="processing"} 0.008
+probe_http_duration_seconds{phase="resolve"} 0.001
+probe_http_duration_seconds{phase="tls"} 0
+probe_http_duration_seconds{phase="transfer"} 0.0005
+# TYPE probe_http_status_code gauge
+probe_http_status_code 200
+# TYPE probe_success gauge
+probe_success 1
+"""
+
+TCP_OUTPUT = """# TYPE probe_duration_seconds gauge
+probe_duration_seconds 0.004
+# TYPE probe_success gauge
+probe_success 1
+"""
+
+FAILED_OUTPUT = """# TYPE probe_duration_seconds gauge
+probe_duration_seconds 5.0
+# TYPE probe_success gauge
+probe_success 0
+"""
+
+
+class _BlackboxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        params = {
+            key: values[0]
+            for key, values in parse_qs(urlparse(self.path).query).items()
+        }
+        time.sleep(0.2)
+        if params["module"] == "http_2xx":
+            status, body = 200, HTTP_OUTPUT
+        elif params["module"] == "tcp_connect":
+            status, body = 200, TCP_OUTPUT
+        elif params["target"] == "db":
+            status, body = 200, FAILED_OUTPUT
+        else:
+            status, body = 400, "Unknown module"
+
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def blackbox_url(http_server: Callable[..., str]) -> str:
+    return http_server(_BlackboxHandler)
+
+
+@pytest.mark.unit
+def test_plan_probes_every_applicable_kind() -> None:
+    assert probe_plan(TARGETS) == [
+        ("web", "http", "http://web:80/health"),
+        ("web", "tcp", "web:80"),
+        ("web", "icmp", "web"),
+        ("db", "tcp", "db:5432"),
+        ("db", "icmp", "db"),
+    ]
+    assert probe_plan(TARGETS, kinds=["tcp"]) == [
+        ("web", "tcp", "web:80"),
+        ("db", "tcp", "db:5432"),
+    ]
+
+
+@pytest.mark.unit
+def test_matrix_runs_probes_concurrently(blackbox_url: str) -> None:
+    started = time.perf_counter()
+    matrix = run_probe_matrix(TARGETS, blackbox_url=blackbox_url)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.6
+    assert matrix.latency() == {
+        "web": {"http": 0.012, "tcp": 0.004, "icmp": None},
+        "db": {"tcp": 0.004, "icmp": None},
+    }
+    http = matrix.results[0]
+    assert http.status_code == 200
+    assert http.phases["processing"] == 0.008 and http.phases["resolve"] == 0.001
+
+    failures = {(result.target, result.kind): result for result in matrix.failures()}
+    assert failures[("db", "icmp")].error == "probe failed"
+    assert failures[("web", "icmp")].error == "HTTP 400: Unknown module"
+    report = format_probe_matrix(matrix)
+    assert "processing=8.0" in report and "❌ db icmp" in report
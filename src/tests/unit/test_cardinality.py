@@ -0,0 +1,115 @@
+import json
+import socket
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Callable, Dict
+from urllib.parse import urlsplit
+
+import pytest
+
+from src.utils.cardinality import (
+    analyze_cardinality,
+    find_growth,
+    format_cardinality_report,
+    profile_samples,
+)
+from src.utils.prometheus_text import parse_families, synthetic_cadvisor_text
+
+EXPORTER_BODY = synthetic_cadvisor_text(containers=30, seed_metrics=2).encode()
+JOB_SERIES = {"cadvisor": 100}
+TSDB: Dict[str, Any] = {
+    "headStats": {"numSeries": 1234},
+    "seriesCountByMetricName": [{"name": "container_metric_0_total", "value": 30}],
+    "labelValueCountByLabelName": [{"name": "name", "value": 30}],
+    "seriesCountByLabelValuePair": [{"name": "job=cadvisor", "value": 100}],
+}
+
+
+class _StackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, payload: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.startswith("/api/v1/status/tsdb"):
+            self._send(json.dumps({"status": "success", "data": TSDB}).encode())
+        else:
+            self._send(EXPORTER_BODY)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        result = [
+            {"metric": {"job": job}, "value": [0, str(count)]}
+            for job, count in JOB_SERIES.items()
+        ]
+        data = {"resultType": "vector", "result": result}
+        self._send(json.dumps({"status": "success", "data": data}).encode())
+
+
+@pytest.fixture
+def stack_url(http_server: Callable[..., str]) -> str:
+    return http_server(_StackHandler)
+
+
+@pytest.mark.unit
+def test_profile_counts_series_per_metric_and_label() -> None:
+    families = parse_families(
+        'a{pod="x",env="prod"} 1\na{pod="y",env="prod"} 1\nb{pod="x"} 1\n',
+        keep_samples=True,
+    )
+    samples = [sample for family in families.values() for sample in family.samples]
+
+    report = profile_samples("job", samples, top=2)
+
+    assert report.series == 3
+    assert report.by_metric == {"a": 2, "b": 1}
+    assert report.label_values == {"pod": 2, "env": 1}
+    assert report.top_label_values == [("pod", "x", 2), ("env", "prod", 2)]
+    assert report.top_metrics(1) == [("a", 2)]
+    assert report.memory_bytes == 3 * 3 * 1024
+
+
+@pytest.mark.unit
+def test_find_growth_flags_only_known_sources_above_threshold() -> None:
+    previous = {"a": 100, "b": 100, "c": 100}
+    current = {"a": 111, "b": 109, "c": 50, "new": 10}
+
+    assert find_growth(previous, current, threshold=0.1) == {"a": (100, 111)}
+
+
+@pytest.mark.unit
+def test_analysis_combines_exporters_tsdb_and_flags_growth(
+    stack_url: str, tmp_path: Path
+) -> None:
+    baseline = tmp_path / "baseline.json"
+    exporters: Dict[str, Dict[str, Any]] = {
+        "cadvisor": {"port": urlsplit(stack_url).port}
+    }
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        exporters["down"] = {"port": probe.getsockname()[1]}
+
+    first = analyze_cardinality(
+        stack_url, exporters, host="127.0.0.1", baseline_path=baseline
+    )
+    JOB_SERIES["cadvisor"] = 150
+    try:
+        second = analyze_cardinality(
+            stack_url, exporters, host="127.0.0.1", baseline_path=baseline
+        )
+    finally:
+        JOB_SERIES["cadvisor"] = 100
+
+    cadvisor = first.exporters["cadvisor"]
+    assert cadvisor.series == 30 * 2 + 30 * 6
+    assert cadvisor.label_values["name"] == 30
+    assert first.tsdb is not None and first.tsdb.series == 1234
+    assert first.tsdb.top_label_values == [("job", "cadvisor", 100)]
+    assert first.jobs == {"cadvisor": 100}
+    assert "down" in first.errors and not first.grown
+    assert second.grown == {"cadvisor": (100, 150)}
+    assert "grew 100 → 150" in format_cardinality_report(second)
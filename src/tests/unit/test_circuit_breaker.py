@@ -0,0 +1,106 @@
+import socket
+from typing import Any, List
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+)
+from src.utils.http_timing import TimedSession, TimingRecorder
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.unit
+def test_breaker_opens_then_half_opens_after_cooldown() -> None:
+    clock = _FakeClock()
+    breaker = CircuitBreaker("svc:1", failure_threshold=2, cooldown=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 10
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.before_call()  # the single trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.unit
+def test_session_fails_fast_after_first_hard_failure() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead_url = f"http://127.0.0.1:{sock.getsockname()[1]}/health"
+
+    registry = CircuitBreakerRegistry(failure_threshold=1, cooldown=60)
+    errors: List[type] = []
+
+    with TimedSession("dead", recorder=TimingRecorder(), breakers=registry) as session:
+        for _ in range(3):
+            try:
+                session.get(dead_url, timeout=2)
+            except requests.RequestException as e:
+                errors.append(type(e))
+
+    assert errors[0] is requests.ConnectionError
+    assert errors[1:] == [CircuitOpenError, CircuitOpenError]
+    assert list(registry.states().values()) == [STATE_OPEN]
+
+
+@pytest.mark.unit
+def test_unexpected_error_releases_half_open_trial(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    registry = CircuitBreakerRegistry(failure_threshold=1, cooldown=0)
+    registry.get("127.0.0.1:9").record_failure()
+
+    def broken_send(*args: Any, **kwargs: Any) -> requests.Response:
+        raise RuntimeError("not a transport error")
+
+    monkeypatch.setattr(HTTPAdapter, "send", broken_send)
+
+    with TimedSession("svc", recorder=TimingRecorder(), breakers=registry) as session:
+        for _ in range(2):
+            # The second trial is let through: the first one was settled
+            with pytest.raises(RuntimeError):
+                session.get("http://127.0.0.1:9/health", timeout=1)
+
+    assert registry.states() == {"127.0.0.1:9": STATE_HALF_OPEN}
+
+
+@pytest.mark.unit
+def test_sessions_use_no_breaker_by_default() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead_url = f"http://127.0.0.1:{sock.getsockname()[1]}/health"
+
+    with TimedSession("dead", recorder=TimingRecorder()) as session:
+        for _ in range(3):
+            with pytest.raises(requests.ConnectionError) as error:
+                session.get(dead_url, timeout=2)
+            assert not isinstance(error.value, CircuitOpenError)
@@ -0,0 +1,109 @@
+import gzip
+import socket
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import pytest
+
+from src.utils.exporter_scrape import (
+    format_scrape_report,
+    scrape_exporter,
+    scrape_exporters,
+)
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.prometheus_text import synthetic_cadvisor_text
+
+BODY = synthetic_cadvisor_text(containers=200, seed_metrics=10).encode()
+GZIPPED = gzip.compress(BODY)
+
+
+class _ExporterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        gzipped = self.path == "/gzip" and "gzip" in self.headers["Accept-Encoding"]
+        body = GZIPPED if gzipped else BODY
+        self.send_response(200)
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # Client stopped reading early
+
+
+@pytest.fixture
+def exporter_url(http_server: Callable[..., str]) -> str:
+    return http_server(_ExporterHandler)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", ["/metrics", "/gzip"])
+def test_scrape_stops_once_required_families_seen(exporter_url: str, path: str) -> None:
+    with TimedSession("exporter", recorder=TimingRecorder()) as session:
+        result = scrape_exporter(
+            session,
+            f"{exporter_url}{path}",
+            required=["container_metric_0", "container_metric_1"],
+            chunk_size=4096,
+        )
+
+    assert result.stopped_early
+    assert result.missing == []
+    assert result.compressed == (path == "/gzip")
+    assert result.total_bytes == len(GZIPPED if path == "/gzip" else BODY)
+    assert result.read_fraction is not None and result.read_fraction < 0.5
+
+
+@pytest.mark.unit
+def test_scrape_reads_everything_and_reports_missing(exporter_url: str) -> None:
+    with TimedSession("exporter", recorder=TimingRecorder()) as session:
+        result = scrape_exporter(
+            session, f"{exporter_url}/metrics", required=["node_cpu", "container"]
+        )
+
+    assert not result.stopped_early
+    assert result.missing == ["node_cpu"]
+    assert result.bytes_read == result.total_bytes == len(BODY)
+    assert result.samples == 200 * 10 + 200 * 6
+    assert result.families["container_latency_seconds"].type == "histogram"
+
+
+class _SlowExporterHandler(_ExporterHandler):
+    spans: List[Tuple[float, float]] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        started = time.perf_counter()
+        time.sleep(0.3)
+        self.spans.append((started, time.perf_counter()))
+        super().do_GET()
+
+
+@pytest.mark.unit
+def test_scrape_exporters_runs_concurrently(http_server: Callable[..., str]) -> None:
+    urls = [http_server(_SlowExporterHandler) for _ in range(2)]
+    exporters: Dict[str, Dict[str, Any]] = {
+        f"exporter-{index}": {
+            "port": urlsplit(url).port,
+            "required_families": ["container_metric_3"],
+        }
+        for index, url in enumerate(urls)
+    }
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        exporters["down"] = {"port": probe.getsockname()[1]}
+
+    _SlowExporterHandler.spans.clear()
+    results = scrape_exporters(exporters, host="127.0.0.1", timeout=2)
+
+    # Both slow handlers were in flight at the same time
+    (_, first_end), (second_start, _) = sorted(_SlowExporterHandler.spans)
+    assert second_start < first_end
+    assert list(results) == ["exporter-0", "exporter-1", "down"]
+    assert all(results[f"exporter-{i}"].stopped_early for i in range(2))
+    assert results["down"].error is not None
+    assert "down" in format_scrape_report(results)
@@ -0,0 +1,76 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from typing import Callable
+
+import pytest
+
+from src.utils.http_probe import (
+    READ_BYTES,
+    READ_JSON,
+    ProbeError,
+    ProbeSpec,
+    fetch_probe,
+)
+from src.utils.http_timing import TimedSession, TimingRecorder
+
+LARGE_BODY = b"y" * (1024 * 1024)
+
+
+class _HeavyEndpointHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self.send_response(405)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.startswith("/json"):
+            body = json.dumps({"total": 3, "items": [{"id": 1}]}).encode()
+        else:
+            body = LARGE_BODY
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def heavy_server(http_server: Callable[..., str]) -> str:
+    return http_server(_HeavyEndpointHandler)
+
+
+@pytest.mark.unit
+def test_status_probe_falls_back_to_unread_get(heavy_server: str) -> None:
+    recorder = TimingRecorder()
+    with TimedSession("heavy", recorder=recorder) as session:
+        result = fetch_probe(session, heavy_server, ProbeSpec("/large"))
+
+    assert result.status_code == 200
+    assert result.bytes_read == 0
+    assert [entry.method for entry in recorder.entries()] == ["HEAD", "GET"]
+
+
+@pytest.mark.unit
+def test_bounded_probes_stop_reading_early(heavy_server: str) -> None:
+    with TimedSession("heavy", recorder=TimingRecorder()) as session:
+        partial = fetch_probe(
+            session, heavy_server, ProbeSpec("/large", read=READ_BYTES, max_bytes=100)
+        )
+        total = fetch_probe(
+            session, heavy_server, ProbeSpec("/json", read=READ_JSON, json_path="total")
+        )
+        item = fetch_probe(
+            session,
+            heavy_server,
+            ProbeSpec("/json", read=READ_JSON, json_path="items.0.id"),
+        )
+        with pytest.raises(ProbeError):
+            fetch_probe(
+                session, heavy_server, ProbeSpec("/large", read=READ_JSON, max_bytes=10)
+            )
+
+    assert partial.body == LARGE_BODY[:100]
+    assert partial.truncated
+    assert total.value == 3
+    assert item.value == 1
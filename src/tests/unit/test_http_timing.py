@@ -0,0 +1,84 @@
+import socket
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, List
+
+import pytest
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.perf_stats import percentile, summarize
+
+
+class _PayloadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        body = b"x" * 4096
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def local_server(http_server: Callable[..., str]) -> str:
+    return http_server(_PayloadHandler)
+
+
+@pytest.mark.unit
+def test_percentile_interpolates_between_ranks() -> None:
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == pytest.approx(2.5)
+    assert summarize([])["count"] == 0
+    assert summarize([1.0, 3.0])["p50"] == pytest.approx(2.0)
+
+
+@pytest.mark.unit
+def test_timed_session_records_phases_per_endpoint(local_server: str) -> None:
+    recorder = TimingRecorder()
+
+    with TimedSession("local", recorder=recorder) as session:
+        for _ in range(3):
+            response = session.get(f"{local_server}/payload", timeout=5)
+            assert response.status_code == 200
+
+    entries = recorder.entries()
+    assert len(entries) == 3
+    assert all(entry.bytes_read == 4096 for entry in entries)
+    # Keep-alive: only the first request pays for connection set-up
+    assert entries[0].connect > 0
+    assert entries[1].connect == 0
+
+    summary = recorder.summary()[("local", "/payload")]
+    assert summary["requests"] == 3
+    assert summary["errors"] == 0
+
+    metrics = recorder.to_prometheus_text()
+    assert 'probe_http_phase_seconds_count{service="local",endpoint="/payload"' in (
+        metrics
+    )
+    assert "local" in recorder.format_report()
+
+
+@pytest.mark.unit
+def test_connect_falls_back_to_next_resolved_address(
+    local_server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    port = int(local_server.rsplit(":", 1)[1])
+    resolve = socket.getaddrinfo
+
+    def dual_stack(host: str, *args: Any, **kwargs: Any) -> List[Any]:
+        if host != "dual-stack.test":
+            return resolve(host, *args, **kwargs)
+        # Nothing listens on the first address, like ::1 with an IPv4-only server
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port)),
+        ]
+
+    monkeypatch.setattr(socket, "getaddrinfo", dual_stack)
+    recorder = TimingRecorder()
+
+    with TimedSession("local", recorder=recorder) as session:
+        response = session.get(f"http://dual-stack.test:{port}/payload", timeout=5)
+
+    assert response.status_code == 200
+    assert recorder.entries()[0].connect > 0
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from src.utils.json_stream import JsonStreamError, iter_json_path
+
+TARGETS: Dict[str, Any] = {
+    "status": "success",
+    "data": {
+        "activeTargets": [
+            {"labels": {"job": f"job-{i}"}, "health": "up", "lastError": 'a"b\\c'}
+            for i in range(50)
+        ],
+        "droppedTargets": [{"discoveredLabels": {"é": "ü" * 10}}] * 20,
+    },
+}
+
+
+def _chunked(payload: bytes, size: int) -> List[bytes]:
+    return [payload[i : i + size] for i in range(0, len(payload), size)]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+def test_iter_json_path_matches_full_parse(chunk_size: int) -> None:
+    payload = json.dumps(TARGETS, ensure_ascii=False, indent=1).encode()
+    chunks = _chunked(payload, chunk_size)
+
+    targets = list(iter_json_path(chunks, "data.activeTargets.*"))
+    jobs = list(iter_json_path(chunks, "data.activeTargets.*.labels.job"))
+
+    assert targets == TARGETS["data"]["activeTargets"]
+    assert jobs == [f"job-{i}" for i in range(50)]
+    assert list(iter_json_path(chunks, "data.activeTargets.3.health")) == ["up"]
+    assert list(iter_json_path(chunks, "status")) == ["success"]
+
+
+@pytest.mark.unit
+def test_iter_json_path_stops_consuming_on_early_exit() -> None:
+    payload = json.dumps(TARGETS).encode()
+    consumed = []
+
+    def chunks() -> Iterator[bytes]:
+        for chunk in _chunked(payload, 16):
+            consumed.append(chunk)
+            yield chunk
+
+    first = next(iter(iter_json_path(chunks(), "data.activeTargets.*")))
+
+    assert first["labels"]["job"] == "job-0"
+    assert len(consumed) < len(payload) // 16 // 4
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("payload", [b'{"a":}', b"[1,", b'{"a" 1}', b"[1]]"])
+def test_iter_json_path_rejects_invalid_json(payload: bytes) -> None:
+    with pytest.raises(JsonStreamError):
+        list(iter_json_path([payload], "a"))
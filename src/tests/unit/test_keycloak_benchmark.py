@@ -0,0 +1,72 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.utils.keycloak_benchmark import JwksVerifier, TokenCache
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+JWK = {
+    **json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key())),
+    "kid": "unit",
+    "use": "sig",
+    "alg": "RS256",
+}
+
+
+class _CertsHandler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        _CertsHandler.requests_served += 1
+        body = json.dumps({"keys": [JWK]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def certs_url(http_server: Callable[..., str]) -> str:
+    _CertsHandler.requests_served = 0
+    return f"{http_server(_CertsHandler)}/certs"
+
+
+@pytest.mark.unit
+def test_token_cache_refreshes_near_expiry() -> None:
+    now = [0.0]
+    issued: List[Dict[str, Any]] = []
+
+    def fetch() -> Dict[str, Any]:
+        issued.append({"access_token": f"token-{len(issued)}", "expires_in": 60})
+        return issued[-1]
+
+    cache = TokenCache(fetch, refresh_margin=30, clock=lambda: now[0])
+
+    assert cache.get() == "token-0"
+    now[0] = 29.0
+    assert cache.get() == "token-0"
+    now[0] = 30.0
+    assert cache.get() == "token-1"
+    assert len(issued) == 2
+
+
+@pytest.mark.unit
+def test_jwks_verifier_caches_signing_keys(certs_url: str) -> None:
+    token = jwt.encode(
+        {"sub": "svc", "exp": int(time.time()) + 60},
+        PRIVATE_KEY,
+        algorithm="RS256",
+        headers={"kid": "unit"},
+    )
+    verifier = JwksVerifier(certs_url)
+
+    claims = [verifier.verify(token) for _ in range(5)]
+
+    assert all(claim["sub"] == "svc" for claim in claims)
+    assert _CertsHandler.requests_served == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from src.utils.load_testing import format_load_table, run_load
+
+
+@pytest.mark.unit
+def test_run_load_counts_iterations_and_errors() -> None:
+    def operation(iteration: int) -> None:
+        if iteration % 10 == 0:
+            raise RuntimeError(f"boom {iteration}")
+
+    result = run_load(operation, concurrency=4, iterations=100, name="unit")
+
+    assert result.operations == 90
+    assert result.errors == 10
+    assert result.error_rate == pytest.approx(0.1)
+    assert result.error_samples[0].startswith("RuntimeError: boom")
+    assert "unit" in format_load_table([result], "title")
+
+
+@pytest.mark.unit
+def test_run_load_requires_a_limit() -> None:
+    with pytest.raises(ValueError):
+        run_load(lambda _: None, concurrency=1)
@@ -0,0 +1,141 @@
+import math
+import threading
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from src.utils.http_timing import TimedSession
+from src.utils.local_rates import (
+    LocalRateError,
+    Snapshot,
+    compute_rates,
+    format_rate_report,
+    histogram_quantile,
+    take_snapshot,
+)
+from src.utils.prometheus_text import parse_families
+from src.utils.synthetic_exporter import SyntheticConfig, SyntheticExporter, serve
+
+BODY = """# TYPE requests_total counter
+requests_total{path="/a"} %s
+requests_total{path="/b"} 10
+# TYPE temperature gauge
+temperature 21
+# TYPE legacy_errors_total untyped
+legacy_errors_total 5
+"""
+
+
+# cAdvisor style: explicit millisecond timestamps, refreshed per container
+TIMESTAMPED = """# TYPE container_cpu_usage_seconds_total counter
+container_cpu_usage_seconds_total{name="web"} %s %s
+container_cpu_usage_seconds_total{name="idle"} 7 1000000
+"""
+
+
+def _snapshot(taken: float, a_value: float) -> Snapshot:
+    families = parse_families(BODY % a_value, keep_samples=True)
+    return Snapshot.from_families("test", taken, families)
+
+
+def _timestamped(taken: float, web_value: float, web_ms: int) -> Snapshot:
+    families = parse_families(TIMESTAMPED % (web_value, web_ms), keep_samples=True)
+    return Snapshot.from_families("test", taken, families)
+
+
+@pytest.mark.unit
+def test_snapshot_indexes_counter_series_only() -> None:
+    snapshot = _snapshot(0, 1)
+
+    assert sorted(name for name, _ in snapshot.values) == [
+        "legacy_errors_total",
+        "requests_total",
+        "requests_total",
+    ]
+    assert snapshot.values[("requests_total", (("path", "/b"),))] == 10
+
+
+@pytest.mark.unit
+def test_rates_handle_counter_resets() -> None:
+    # 100 -> 160 (+60), restart -> 30 (+30), 90 (+60)
+    snapshots = [_snapshot(t, v) for t, v in ((0, 100), (10, 160), (20, 30), (30, 90))]
+
+    local = compute_rates(snapshots)
+
+    busiest = local.top(1)[0]
+    assert busiest.labels == {"path": "/a"}
+    assert (busiest.increase, busiest.resets) == (150, 1)
+    assert busiest.rate == pytest.approx(5.0)
+    assert local.top(10, match="legacy")[0].rate == 0
+    with pytest.raises(LocalRateError):
+        compute_rates(snapshots[:1])
+
+
+@pytest.mark.unit
+def test_rates_use_sample_timestamps_when_exposed() -> None:
+    # Two seconds apart on the wall clock, 2.5 s apart in sample time
+    snapshots = [_timestamped(1002.0, 10, 1000000), _timestamped(1004.0, 15, 1002500)]
+
+    local = compute_rates(snapshots)
+
+    assert snapshots[0].time_of(("container_cpu_usage_seconds_total", ())) == 1002.0
+    (web,) = local.rates
+    assert web.labels == {"name": "web"}
+    assert (web.rate, web.elapsed) == (pytest.approx(2.0), pytest.approx(2.5))
+    assert local.elapsed == 2.0
+
+
+@pytest.mark.unit
+def test_histogram_quantile_interpolates_like_promql() -> None:
+    buckets = [(0.1, 50.0), (0.5, 90.0), (1.0, 100.0), (math.inf, 100.0)]
+
+    assert histogram_quantile(0.5, buckets) == pytest.approx(0.1)
+    assert histogram_quantile(0.25, buckets) == pytest.approx(0.05)
+    assert histogram_quantile(0.7, buckets) == pytest.approx(0.3)
+    assert histogram_quantile(0.99, [(1.0, 10.0), (math.inf, 20.0)]) == 1.0
+    assert math.isnan(histogram_quantile(0.5, [(1.0, 0.0), (math.inf, 0.0)]))
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def synthetic() -> Iterator[Tuple[str, _Clock]]:
+    clock = _Clock()
+    config = SyntheticConfig(metrics=2, series_per_metric=5, histograms=1, buckets=4)
+    server = serve(SyntheticExporter(config, clock), "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/metrics", clock
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_rates_from_successive_scrapes(synthetic: Tuple[str, _Clock]) -> None:
+    url, clock = synthetic
+    snapshots: List[Snapshot] = []
+    with TimedSession() as session:
+        for now in (0.0, 10.0):
+            clock.now = now
+            snapshot = take_snapshot(session, url)
+            # Rates over exporter time rather than wall time
+            snapshot.taken = now
+            snapshots.append(snapshot)
+
+    local = compute_rates(snapshots)
+
+    # Counter series ``index`` grows by ``index + 1`` per second
+    top = local.top(2, match="synthetic_metric_0_total")
+    assert [rate.rate for rate in top] == pytest.approx([5.0, 4.0])
+    assert "synthetic_metric_1" not in {rate.name for rate in local.rates}
+    histogram, *_ = local.histograms
+    assert histogram.family == "synthetic_latency_0_seconds"
+    assert histogram.rate == pytest.approx(1.0)
+    assert 0 < histogram.quantiles[0.5] <= histogram.quantiles[0.99]
+    assert "synthetic_metric_0_total" in format_rate_report(local)
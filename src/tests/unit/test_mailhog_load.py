@@ -0,0 +1,86 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.mailhog_load import (
+    SENT_AT_HEADER,
+    parse_mailhog_time,
+    search_messages,
+    wait_for_delivery,
+)
+
+# Newest first, as returned by MailHog
+MESSAGES = [
+    {
+        "Created": f"2024-01-01T00:00:{10 + index:02d}.500000123Z",
+        "Content": {
+            "Headers": {
+                "Subject": [f"run #{index}"],
+                SENT_AT_HEADER: [f"{1704067200 + 10 + index:.6f}"],
+            }
+        },
+    }
+    for index in reversed(range(5))
+]
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages: List[Dict[str, Any]] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        query = parse_qs(urlsplit(self.path).query)
+        self.pages.append(query)
+        start, limit = int(query["start"][0]), int(query["limit"][0])
+        items = MESSAGES[start : start + limit]
+        body = json.dumps(
+            {
+                "total": len(MESSAGES),
+                "count": len(items),
+                "start": start,
+                "items": items,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def mailhog_url(http_server: Callable[..., str]) -> str:
+    _SearchHandler.pages = []
+    return http_server(_SearchHandler)
+
+
+@pytest.mark.unit
+def test_parse_mailhog_time_normalises_fraction_and_zone() -> None:
+    assert parse_mailhog_time("2024-01-01T00:00:10.500000999Z") == 1704067210.5
+    # Go trims trailing zeros, so fractions can have any length
+    assert parse_mailhog_time("2024-01-01T00:00:10.5Z") == 1704067210.5
+    assert parse_mailhog_time("2024-01-01T02:00:10.25+02:00") == 1704067210.25
+
+
+@pytest.mark.unit
+def test_search_pages_through_results(mailhog_url: str) -> None:
+    with TimedSession("mailhog", recorder=TimingRecorder()) as session:
+        found = list(search_messages(session, mailhog_url, "run", page_size=2))
+
+    assert found == MESSAGES
+    assert [page["start"] for page in _SearchHandler.pages] == [["0"], ["2"], ["4"]]
+
+
+@pytest.mark.unit
+def test_wait_for_delivery_stops_after_newest_batch(mailhog_url: str) -> None:
+    expected = {"run #4", "run #3", "run #2"}
+    with TimedSession("mailhog", recorder=TimingRecorder()) as session:
+        latencies = wait_for_delivery(
+            session, mailhog_url, "run", expected, timeout=1, page_size=2
+        )
+
+    assert latencies == pytest.approx([0.5, 0.5, 0.5])
+    assert len(_SearchHandler.pages) == 2
@@ -0,0 +1,55 @@
+import pytest
+
+from src.utils.prometheus_config import load_rules, load_scrape_jobs, parse_duration
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("15s", 15), ("1m30s", 90), ("500ms", 0.5), ("2h", 7200), (5, 5)],
+)
+def test_parse_duration(value: str, seconds: float) -> None:
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", ["15", "s", "1m 30s", "-5s"])
+def test_parse_duration_rejects_invalid(value: str) -> None:
+    with pytest.raises(ValueError):
+        parse_duration(value)
+
+
+@pytest.mark.unit
+def test_job_settings_fall_back_to_global_defaults() -> None:
+    jobs = load_scrape_jobs(
+        config={
+            "global": {"scrape_interval": "30s"},
+            "scrape_configs": [
+                {"job_name": "a", "static_configs": [{"targets": ["a:1", "b:2"]}]},
+                {"job_name": "b", "scrape_interval": "5s", "metrics_path": "/probe"},
+            ],
+        }
+    )
+
+    assert (jobs["a"].scrape_interval, jobs["a"].scrape_timeout) == (30, 10)
+    assert jobs["a"].targets == ["a:1", "b:2"]
+    assert (jobs["b"].scrape_interval, jobs["b"].scrape_timeout) == (5, 5)
+    assert jobs["b"].metrics_path == "/probe"
+
+
+@pytest.mark.unit
+def test_repository_config_lists_every_job() -> None:
+    jobs = load_scrape_jobs()
+
+    assert jobs["cadvisor"].scrape_interval == 15
+    assert jobs["crud-users-api"].metrics_path == "/actuator/prometheus"
+    assert jobs["blackbox-exporter-icmp-ping"].params == {"module": ["icmp_ping"]}
+
+
+@pytest.mark.unit
+def test_repository_rules_are_loaded_in_order() -> None:
+    rules = load_rules()
+
+    assert rules[0].name == "Test_Always_Firing"
+    assert (rules[0].expr, rules[0].for_seconds) == ("vector(1)", 10)
+    assert all(rule.kind == "alert" and rule.expr for rule in rules)
@@ -0,0 +1,102 @@
+import math
+from typing import List
+
+import pytest
+
+from src.utils.prometheus_text import (
+    ExpositionError,
+    ExpositionParser,
+    iter_samples,
+    parse_families,
+    synthetic_cadvisor_text,
+)
+
+EXPOSITION = """# HELP http_requests_total Requests served.\\nPer handler.
+# TYPE http_requests_total counter
+http_requests_total{handler="/api",path="C:\\\\tmp",quote="say \\"hi\\"",multi="a\\nb"} 1027 1395066363000
+http_requests_total{handler="/é{x}"} 3
+# TYPE rpc_duration_seconds summary
+rpc_duration_seconds{quantile="0.5"} 4773
+rpc_duration_seconds_sum 1.7560473e+07
+rpc_duration_seconds_count 2693
+# TYPE request_latency histogram
+request_latency_bucket{le="0.1"} 10
+request_latency_bucket{ le = "+Inf" , } 12
+request_latency_sum 3.5
+request_latency_count 12
+untyped_metric NaN
+# plain comment
+negative_gauge -Inf
+"""
+
+
+def _chunked(payload: bytes, size: int) -> List[bytes]:
+    return [payload[i : i + size] for i in range(0, len(payload), size)]
+
+
+@pytest.mark.unit
+def test_parses_types_labels_escapes_and_timestamps() -> None:
+    families = parse_families(EXPOSITION, keep_samples=True)
+
+    requests_family = families["http_requests_total"]
+    first, second = requests_family.samples
+    assert requests_family.type == "counter"
+    assert requests_family.help == "Requests served.\nPer handler."
+    assert first.labels == {
+        "handler": "/api",
+        "path": "C:\\tmp",
+        "quote": 'say "hi"',
+        "multi": "a\nb",
+    }
+    assert (first.value, first.timestamp) == (1027, 1395066363000)
+    assert second.labels == {"handler": "/é{x}"} and second.timestamp is None
+
+    assert families["rpc_duration_seconds"].sample_names == {
+        "rpc_duration_seconds",
+        "rpc_duration_seconds_sum",
+        "rpc_duration_seconds_count",
+    }
+    assert families["request_latency"].sample_count == 4
+    assert families["request_latency"].samples[1].labels == {"le": "+Inf"}
+    assert math.isnan(families["untyped_metric"].samples[0].value)
+    assert families["negative_gauge"].samples[0].value == -math.inf
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [1, 5, 17, 4096])
+def test_chunked_feeding_matches_whole_body(chunk_size: int) -> None:
+    whole = list(iter_samples([EXPOSITION]))
+    chunked = list(iter_samples(_chunked(EXPOSITION.encode(), chunk_size)))
+
+    # repr() so NaN values compare equal
+    assert repr(chunked) == repr(whole)
+    assert len(whole) == 11
+
+
+@pytest.mark.unit
+def test_samples_are_yielded_before_the_body_ends() -> None:
+    parser = ExpositionParser()
+
+    assert parser.feed(b"# TYPE up gauge\nup 1\nup{job=") == [
+        ("up", {}, 1.0, None, "up")
+    ]
+    assert [sample.labels for sample in parser.feed(b'"a"} 0\n')] == [{"job": "a"}]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "line",
+    ['m{a="1" 1', "m", "m 1 2 3", "m abc", 'm{1a="x"} 1', "# TYPE m gaguge"],
+)
+def test_rejects_malformed_lines(line: str) -> None:
+    with pytest.raises(ExpositionError):
+        parse_families(line + "\n")
+
+
+@pytest.mark.unit
+def test_synthetic_cadvisor_body_parses_completely() -> None:
+    families = parse_families(synthetic_cadvisor_text(containers=20, seed_metrics=4))
+
+    assert families["container_metric_0_total"].sample_count == 20
+    assert families["container_latency_seconds"].type == "histogram"
+    assert families["container_latency_seconds"].sample_count == 20 * 6
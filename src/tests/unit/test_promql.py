@@ -0,0 +1,115 @@
+import json
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Union
+from urllib.parse import parse_qs
+
+import pytest
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.promql import (
+    PromQLExecutor,
+    PromQuery,
+    format_query_report,
+    query_stats,
+)
+
+CALLS: Counter = Counter()
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers["Content-Length"])
+        form = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode()).items()
+        }
+        CALLS[(self.path, form["query"])] += 1
+        time.sleep(0.2)
+
+        body: Dict[str, Any]
+        if form["query"] == "bad(":
+            status, body = 400, {"status": "error", "error": "parse error"}
+        elif self.path == "/api/v1/query_range":
+            values = [[float(form["start"]), "1"], [float(form["end"]), "2"]]
+            body = {
+                "status": "success",
+                "data": {
+                    "resultType": "matrix",
+                    "result": [{"metric": {"job": "a"}, "values": values}],
+                },
+            }
+            status = 200
+        else:
+            result = [{"metric": {"job": job}, "value": [0, "1"]} for job in "abc"]
+            data: Dict[str, Any] = {"resultType": "vector", "result": result}
+            if form.get("stats") == "all":
+                data["stats"] = {"samples": {"totalQueryableSamples": 42}}
+            status, body = 200, {"status": "success", "data": data}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def prometheus_url(http_server: Callable[..., str]) -> str:
+    CALLS.clear()
+    return http_server(_PrometheusHandler)
+
+
+@pytest.mark.unit
+def test_runs_distinct_queries_concurrently_once_each(prometheus_url: str) -> None:
+    range_query = PromQuery.range("rate(x[1m])", lookback=300, step=15, end=1000)
+    queries: List[Union[str, PromQuery]] = [
+        "up",
+        "up",
+        "sum(up)",
+        "bad(",
+        range_query,
+        range_query,
+    ]
+
+    with TimedSession("prometheus", recorder=TimingRecorder()) as session:
+        executor = PromQLExecutor(prometheus_url, session=session, stats=True)
+        started = time.perf_counter()
+        results = executor.run(queries)
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert list(results) == [
+        PromQuery("up"),
+        PromQuery("sum(up)"),
+        PromQuery("bad("),
+        range_query,
+    ]
+    assert all(count == 1 for count in CALLS.values())
+
+    up = results[PromQuery("up")]
+    assert (up.result_type, up.series, up.samples_touched) == ("vector", 3, 42)
+    assert results[PromQuery("bad(")].error == "parse error"
+
+    ranged = results[range_query]
+    assert (range_query.start, range_query.end) == (690, 990)
+    assert (ranged.result_type, ranged.series, ranged.samples) == ("matrix", 1, 2)
+
+    stats = query_stats(results.values())
+    assert (stats["queries"], stats["errors"], stats["series"]) == (4, 1, 7)
+    assert stats["latency"]["min"] >= 0.2
+    assert "ERROR" in format_query_report(results)
+
+
+@pytest.mark.unit
+def test_connection_failures_are_captured() -> None:
+    executor = PromQLExecutor("http://127.0.0.1:1", timeout=1)
+
+    result = executor.execute(PromQuery("up"))
+
+    assert not result.ok
+    assert result.error is not None and result.error.startswith("ConnectionError")
@@ -0,0 +1,158 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Callable, List
+from urllib.parse import parse_qs
+
+import pytest
+
+from src.utils.promql_benchmark import (
+    BenchmarkQuery,
+    QueryBenchmark,
+    benchmark_queries,
+    collect_queries,
+    expand_grafana_variables,
+    format_benchmark_report,
+    range_step,
+    recording_rule_candidates,
+)
+
+RULES = """
+groups:
+  - name: demo
+    rules:
+      - alert: Down
+        expr: up == 0
+        for: 1m
+      - record: job:up:sum
+        expr: sum by (job) (up)
+      - alert: AlsoDown
+        expr: up == 0
+"""
+
+DASHBOARD = {
+    "templating": {"list": [{"name": "job", "current": {"value": "node"}}]},
+    "panels": [
+        {
+            "title": "CPU",
+            "datasource": "Prometheus",
+            "targets": [{"expr": 'rate(cpu{job="$job"}[$__rate_interval])'}],
+        },
+        {"title": "Logs", "datasource": "Elasticsearch", "targets": [{"expr": "x"}]},
+        {
+            "type": "row",
+            "panels": [
+                {"title": "Up", "targets": [{"expr": "up == 0"}]},
+                {"title": "Empty", "targets": [{"refId": "A"}]},
+            ],
+        },
+    ],
+}
+
+
+@pytest.mark.unit
+def test_collects_distinct_expressions_with_their_sources(tmp_path: Path) -> None:
+    rules = tmp_path / "alerts.yml"
+    rules.write_text(RULES)
+    dashboards = tmp_path / "dashboards"
+    dashboards.mkdir()
+    (dashboards / "infra.json").write_text(json.dumps(DASHBOARD))
+
+    queries = {
+        query.expr: query.sources for query in collect_queries(rules, dashboards)
+    }
+
+    assert queries == {
+        "up == 0": ["alerts.yml:Down", "alerts.yml:AlsoDown", "infra.json:Up"],
+        "sum by (job) (up)": ["alerts.yml:job:up:sum"],
+        'rate(cpu{job="node"}[$__rate_interval])': ["infra.json:CPU"],
+    }
+
+
+@pytest.mark.unit
+def test_grafana_builtins_follow_the_step() -> None:
+    expr = "rate(x[$__rate_interval]) + ${job} + [[job]] + $unknown"
+
+    assert expand_grafana_variables(expr, {"job": "a"}, step=90) == (
+        "rate(x[105s]) + a + a + $unknown"
+    )
+    assert range_step(3600) == 15 and range_step(86400) == 345
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers["Content-Length"])
+        form = parse_qs(self.rfile.read(length).decode())
+        heavy = "rate" in form["query"][0]
+        result = [{"metric": {}, "values": [[0, "1"]], "value": [0, "1"]}]
+        data = {
+            "resultType": "matrix" if "step" in form else "vector",
+            "result": result,
+            "stats": {"samples": {"totalQueryableSamples": 5000 if heavy else 10}},
+        }
+        payload = json.dumps({"status": "success", "data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def prometheus_url(http_server: Callable[..., str]) -> str:
+    return http_server(_PrometheusHandler)
+
+
+@pytest.mark.unit
+def test_benchmark_runs_every_mode_and_flags_heavy_queries(
+    prometheus_url: str,
+) -> None:
+    queries = [
+        BenchmarkQuery("up", ["alerts.yml:Up"]),
+        BenchmarkQuery("sum(rate(x[$__rate_interval]))", ["d.json:X"]),
+    ]
+
+    benchmarks = benchmark_queries(
+        queries, prometheus_url, windows=[3600, 7200], repetitions=3
+    )
+
+    assert [(b.query.expr[:3], b.mode) for b in benchmarks] == [
+        ("up", "instant"),
+        ("up", "range 1h"),
+        ("up", "range 2h"),
+        ("sum", "instant"),
+        ("sum", "range 1h"),
+        ("sum", "range 2h"),
+    ]
+    assert all(len(b.latencies) == 3 and not b.errors for b in benchmarks)
+    assert benchmarks[1].samples_touched == 10 and benchmarks[1].samples == 1
+
+    candidates = recording_rule_candidates(benchmarks)
+    assert list(candidates) == ["sum(rate(x[$__rate_interval]))"]
+    assert "reads 5,000x the samples it returns" in candidates[queries[1].expr][0]
+    assert "Recording rule candidates" in format_benchmark_report(benchmarks)
+
+
+@pytest.mark.unit
+def test_expressions_expanding_to_one_query_share_its_runs(
+    prometheus_url: str,
+) -> None:
+    queries = [
+        BenchmarkQuery("sum(rate(x[$__rate_interval]))", ["d.json:X"]),
+        BenchmarkQuery("sum(rate(x[60s]))", ["alerts.yml:X"]),
+    ]
+
+    benchmarks = benchmark_queries(queries, prometheus_url, windows=[], repetitions=2)
+
+    assert [b.query.expr for b in benchmarks] == [q.expr for q in queries]
+    assert all(len(b.latencies) == 2 and not b.errors for b in benchmarks)
+
+
+@pytest.mark.unit
+def test_failed_queries_are_reported() -> None:
+    benchmark = QueryBenchmark(BenchmarkQuery("bad("), "instant", errors=["parse"])
+    report: List[QueryBenchmark] = [benchmark]
+
+    assert "❌ parse" in format_benchmark_report(report)
+    assert recording_rule_candidates(report) == {}
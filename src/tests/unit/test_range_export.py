@@ -0,0 +1,138 @@
+import json
+import math
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qs
+
+import numpy as np
+import pytest
+
+from src.utils.range_export import (
+    RangeExport,
+    RangeExportError,
+    SeriesArrays,
+    cache_path,
+    chunk_ranges,
+    decode_matrix,
+    export_range,
+)
+
+REQUESTS: List[Dict[str, str]] = []
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers["Content-Length"])
+        form = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode()).items()
+        }
+        REQUESTS.append(form)
+        start, end, step = (float(form[key]) for key in ("start", "end", "step"))
+        timestamps = np.arange(start, end + step / 2, step)
+
+        body: Dict[str, Any]
+        if form["query"] == "broken":
+            status, body = 422, {"status": "error", "error": "too many samples"}
+        else:
+            # Series "b" only exists from t=100 on
+            result = [
+                {
+                    "metric": {"job": job},
+                    "values": [
+                        [ts, str(ts * factor)] for ts in timestamps if ts >= first
+                    ],
+                }
+                for job, factor, first in (("a", 1, 0), ("b", 2, 100))
+            ]
+            result = [series for series in result if series["values"]]
+            data = {"resultType": "matrix", "result": result}
+            status, body = 200, {"status": "success", "data": data}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def prometheus_url(http_server: Callable[..., str]) -> str:
+    REQUESTS.clear()
+    return http_server(_RangeHandler)
+
+
+@pytest.mark.unit
+def test_chunks_cover_the_window_without_overlap() -> None:
+    chunks = chunk_ranges(0, 250, 10, max_points=10)
+
+    assert chunks == [(0, 90), (100, 190), (200, 250)]
+    assert chunk_ranges(0, 0, 10) == [(0, 0)]
+    with pytest.raises(RangeExportError):
+        chunk_ranges(10, 0, 10)
+
+
+@pytest.mark.unit
+def test_decodes_special_values() -> None:
+    result = [{"metric": {"job": "a"}, "values": [[1, "1.5"], [2, "NaN"], [3, "+Inf"]]}]
+
+    (series,) = decode_matrix(result)
+
+    assert series.timestamps.dtype == np.float64
+    assert series.timestamps.tolist() == [1, 2, 3]
+    assert series.values[0] == 1.5
+    assert math.isnan(series.values[1]) and math.isinf(series.values[2])
+
+
+@pytest.mark.unit
+def test_export_merges_chunks_per_series(prometheus_url: str) -> None:
+    export = export_range("x", 0, 250, 10, prometheus_url, max_points=10)
+
+    assert len(REQUESTS) == 3
+    by_job = {series.labels["job"]: series for series in export.series}
+    assert by_job["a"].timestamps.tolist() == list(range(0, 251, 10))
+    assert by_job["a"].values.flags["C_CONTIGUOUS"]
+    assert by_job["b"].timestamps[0] == 100
+    np.testing.assert_array_equal(by_job["b"].values, by_job["b"].timestamps * 2)
+    assert export.samples == 26 + 16
+
+
+@pytest.mark.unit
+def test_failed_chunk_raises(prometheus_url: str) -> None:
+    with pytest.raises(RangeExportError, match="too many samples"):
+        export_range("broken", 0, 100, 10, prometheus_url)
+
+
+@pytest.mark.unit
+def test_cache_is_reused(prometheus_url: str, tmp_path: Path) -> None:
+    first = export_range("x", 0, 250, 10, prometheus_url, cache_dir=tmp_path)
+    second = export_range("x", 0, 250, 10, prometheus_url, cache_dir=tmp_path)
+
+    assert len(REQUESTS) == 1
+    assert cache_path("x", 0, 250, 10, tmp_path).exists()
+    assert [series.labels for series in second.series] == [
+        series.labels for series in first.series
+    ]
+    for cached, fetched in zip(second.series, first.series):
+        np.testing.assert_array_equal(cached.values, fetched.values)
+
+
+@pytest.mark.unit
+def test_save_and_load_round_trip(tmp_path: Path) -> None:
+    export = RangeExport("up", 0, 30, 15)
+    export.series = [
+        SeriesArrays({"job": "a"}, np.array([0.0, 15.0]), np.array([1.0, np.nan])),
+        SeriesArrays({"job": "b"}, np.empty(0), np.empty(0)),
+    ]
+
+    loaded = RangeExport.load(export.save(tmp_path / "up.npz", compress=False))
+
+    assert (loaded.expr, loaded.start, loaded.end, loaded.step) == ("up", 0, 30, 15)
+    assert [series.labels for series in loaded.series] == [{"job": "a"}, {"job": "b"}]
+    assert loaded.series[0].timestamps.tolist() == [0.0, 15.0]
+    assert math.isnan(loaded.series[0].values[1])
+    assert len(loaded.series[1].values) == 0
@@ -0,0 +1,162 @@
+import subprocess
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+import yaml
+
+from src.utils.promql_benchmark import BenchmarkQuery, QueryBenchmark
+from src.utils.recording_rules import (
+    RecordingRuleError,
+    RewriteComparison,
+    expensive_subexpressions,
+    format_comparison_report,
+    install_rules,
+    propose_rules,
+    rule_name,
+    validate_rules,
+    write_rule_file,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "expr, expected",
+    [
+        (
+            "histogram_quantile(0.9, sum(rate(b[5m])) by (le, job))",
+            ["sum(rate(b[5m])) by (le, job)"],
+        ),
+        (
+            'rate(x{s="e"}[5m]) / rate(x[5m]) * 100',
+            ['rate(x{s="e"}[5m])', "rate(x[5m])"],
+        ),
+        (
+            "max by (job) (sum(increase(y[1h])))",
+            ["max by (job) (sum(increase(y[1h])))"],
+        ),
+        ('sum(up{job="a)"})', []),
+        (
+            "max_over_time(rate(x[5m])[30m:1m])",
+            ["max_over_time(rate(x[5m])[30m:1m])"],
+        ),
+        (
+            "max_over_time(sum(rate(x[5m]))[1h:]) > 1",
+            ["max_over_time(sum(rate(x[5m]))[1h:])"],
+        ),
+    ],
+)
+def test_finds_outermost_expensive_subexpressions(
+    expr: str, expected: List[str]
+) -> None:
+    assert expensive_subexpressions(expr) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "subexpr, name",
+    [
+        ("sum(rate(b[5m])) by (le, job)", "le_job:b:rate5m"),
+        ("sum by (job) (rate(b[5m]))", "job:b:rate5m"),
+        ("avg without (cpu) (irate(c[1m]))", "without_cpu:c:avg_irate1m"),
+        ("sum(rate(t[5m]))", "total:t:rate5m"),
+        ('rate(t{status="5xx"}[5m])', "series:t_status_5xx:rate5m"),
+    ],
+)
+def test_rule_names_follow_level_metric_operations(subexpr: str, name: str) -> None:
+    assert rule_name(subexpr) == name
+
+
+@pytest.mark.unit
+def test_unbalanced_expressions_are_rejected() -> None:
+    with pytest.raises(RecordingRuleError):
+        expensive_subexpressions("sum(rate(x[5m])")
+
+
+@pytest.mark.unit
+def test_shared_subexpressions_become_one_rule_and_queries_are_rewritten(
+    tmp_path: Path,
+) -> None:
+    exprs = [
+        f"histogram_quantile({q}, sum(rate(d_bucket[$__rate_interval])) by (le))"
+        for q in ("0.5", "0.99")
+    ] + ["up == 0"]
+
+    rules, rewrites = propose_rules(exprs)
+
+    assert [(rule.record, rule.expr) for rule in rules] == [
+        ("le:d_bucket:rate60s", "sum(rate(d_bucket[60s])) by (le)")
+    ]
+    assert rules[0].used_by == exprs[:2]
+    assert [rewrite.rewritten for rewrite in rewrites] == [
+        "histogram_quantile(0.5, le:d_bucket:rate60s)",
+        "histogram_quantile(0.99, le:d_bucket:rate60s)",
+    ]
+
+    content = yaml.safe_load(write_rule_file(rules, tmp_path / "r.yml").read_text())
+    assert content["groups"][0]["rules"] == [
+        {"record": "le:d_bucket:rate60s", "expr": "sum(rate(d_bucket[60s])) by (le)"}
+    ]
+
+
+@pytest.mark.unit
+def test_subqueries_become_one_rule() -> None:
+    expr = "max_over_time(rate(http_requests_total[5m])[30m:1m])"
+
+    rules, rewrites = propose_rules([expr])
+
+    assert [(rule.record, rule.expr) for rule in rules] == [
+        ("series:http_requests_total:max_over_time5m", expr)
+    ]
+    assert [rewrite.rewritten for rewrite in rewrites] == [
+        "series:http_requests_total:max_over_time5m"
+    ]
+
+
+class _Runner:
+    def __init__(self, failing: str = "") -> None:
+        self.failing = failing
+        self.commands: List[List[str]] = []
+
+    def __call__(self, command: List[str], **kwargs: Any) -> Any:
+        self.commands.append(command)
+        code = 1 if self.failing and self.failing in command else 0
+        return subprocess.CompletedProcess(command, code, "out", "err" if code else "")
+
+
+@pytest.mark.unit
+def test_promtool_validation_and_install_run_in_the_container() -> None:
+    runner = _Runner()
+    assert validate_rules("r.yml", runner=runner) == (True, "out\nout")
+    assert runner.commands[1][:6] == [
+        "docker",
+        "exec",
+        "infra-default-prometheus",
+        "promtool",
+        "check",
+        "rules",
+    ]
+
+    valid, output = validate_rules("r.yml", runner=_Runner(failing="promtool"))
+    assert not valid and "err" in output
+
+    install_rules("r.yml", runner=runner)
+    assert runner.commands[-1] == [
+        "docker",
+        "kill",
+        "--signal",
+        "HUP",
+        "infra-default-prometheus",
+    ]
+    with pytest.raises(RecordingRuleError):
+        install_rules("r.yml", runner=_Runner(failing="cp"))
+
+
+@pytest.mark.unit
+def test_comparison_reports_measured_speedup() -> None:
+    before = QueryBenchmark(BenchmarkQuery("sum(rate(x[5m]))"), "instant", [0.04] * 3)
+    after = QueryBenchmark(BenchmarkQuery("total:x:rate5m"), "instant", [0.01] * 3)
+    comparison = RewriteComparison(before, after)
+
+    assert comparison.speedup == pytest.approx(4)
+    assert "4.0x" in format_comparison_report([comparison])
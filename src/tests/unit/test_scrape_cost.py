@@ -0,0 +1,72 @@
+from typing import Dict, List
+
+import pytest
+
+from src.utils.promql import PromQuery, QueryResult
+from src.utils.scrape_cost import (
+    SCRAPE_METRICS,
+    build_profile,
+    format_scrape_cost_report,
+    scrape_cost_queries,
+)
+
+
+def _matrix(metric: str, series: Dict[str, List[float]]) -> QueryResult:
+    result = [
+        {
+            "metric": {"job": target.split("/")[0], "instance": target},
+            "values": [[index, str(value)] for index, value in enumerate(values)],
+        }
+        for target, values in series.items()
+    ]
+    return QueryResult(
+        PromQuery(metric), status="success", result_type="matrix", result=result
+    )
+
+
+@pytest.mark.unit
+def test_queries_cover_every_metric_for_configured_jobs() -> None:
+    queries = scrape_cost_queries(["node", "cadvisor"], window=600, step=15, end=1000)
+
+    assert list(queries) == list(SCRAPE_METRICS)
+    query = queries["scrape_duration_seconds"]
+    assert query.expr == 'scrape_duration_seconds{job=~"cadvisor|node"}'
+    assert (query.start, query.end, query.step) == (390, 990, 15)
+
+
+@pytest.mark.unit
+def test_job_names_are_matched_literally() -> None:
+    queries = scrape_cost_queries(["blackbox.http", "a+b"], window=60, step=15)
+
+    assert queries["scrape_duration_seconds"].expr == (
+        'scrape_duration_seconds{job=~"a\\\\+b|blackbox\\\\.http"}'
+    )
+
+
+@pytest.mark.unit
+def test_profile_ranks_targets_by_interval_usage() -> None:
+    results = {
+        "scrape_duration_seconds": _matrix(
+            "scrape_duration_seconds",
+            {
+                "node/a": [0.01, 0.02, 0.03],
+                "cadvisor/a": [1.0, 2.0, 3.0, float("nan")],
+                "cadvisor/b": [0.5, 0.5, 0.5],
+            },
+        ),
+        "scrape_samples_scraped": _matrix(
+            "scrape_samples_scraped", {"cadvisor/a": [9000, 11000]}
+        ),
+        "scrape_series_added": QueryResult(PromQuery("x"), error="timeout"),
+    }
+
+    profile = build_profile(results, {"node": 15, "cadvisor": 15}, window=600)
+
+    ranked = profile.ranked()
+    assert [cost.instance for cost in ranked] == ["cadvisor/a", "cadvisor/b", "node/a"]
+    assert ranked[0].stats["scrape_duration_seconds"]["count"] == 3
+    assert ranked[0].interval_usage == pytest.approx(2.9 / 15)
+    assert profile.jobs["cadvisor"].stats["scrape_duration_seconds"]["max"] == 3.0
+    assert profile.jobs["cadvisor"].stats["scrape_samples_scraped"]["p50"] == 10000
+    assert profile.errors == {"scrape_series_added": "timeout"}
+    assert "cadvisor/a" in format_scrape_cost_report(profile)
@@ -0,0 +1,99 @@
+import json
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.utils.scrape_wait import next_poll_delay, parse_scrape_time, wait_for_scrapes
+
+INTERVAL = 0.4
+POLLS: Counter = Counter()
+STARTED = time.time()
+
+
+def _rfc3339(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%S.%f123Z"
+    )
+
+
+def _target(job: str) -> dict:
+    """``fast`` is up at once, ``slow`` after its second scrape, ``down`` never."""
+    now = time.time()
+    rounds = int((now - STARTED) / INTERVAL)
+    last_scrape = STARTED + rounds * INTERVAL
+    healthy = job == "fast" or (job == "slow" and rounds >= 2)
+    return {
+        "scrapePool": job,
+        "labels": {"job": job},
+        "health": "up" if healthy else "down",
+        "lastScrape": _rfc3339(last_scrape),
+    }
+
+
+class _TargetsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        job = query["scrapePool"]
+        POLLS[job] += 1
+        # Another pool in the list, as an old Prometheus ignoring scrapePool would
+        targets = [_target(job), _target("other")]
+        body = json.dumps({"status": "success", "data": {"activeTargets": targets}})
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def prometheus_url(http_server: Callable[..., str]) -> str:
+    global STARTED
+    POLLS.clear()
+    STARTED = time.time()
+    return http_server(_TargetsHandler)
+
+
+@pytest.mark.unit
+def test_waits_for_all_jobs_with_adaptive_polling(prometheus_url: str) -> None:
+    intervals = {"fast": INTERVAL, "slow": INTERVAL, "down": INTERVAL}
+
+    result = wait_for_scrapes(
+        ["fast", "slow", "down", "fast"], prometheus_url, 2.0, intervals
+    )
+
+    assert list(result.healthy) == ["fast", "slow"]
+    assert result.timed_out == ["down"]
+    assert not result.all_healthy
+    assert result.healthy["fast"] == pytest.approx(STARTED, abs=0.01)
+    assert result.healthy["slow"] >= STARTED + 2 * INTERVAL - 0.01
+    assert result.waited["fast"] < 0.2
+    # Polled about once per interval, not in a tight loop
+    assert POLLS["fast"] == 1
+    assert POLLS["down"] <= 2.0 / INTERVAL + 2
+    assert "timed out: down" in result.describe()
+
+
+@pytest.mark.unit
+def test_next_poll_delay_targets_the_next_scrape() -> None:
+    assert next_poll_delay(100.0, 15, now=105.0) == pytest.approx(10.5)
+    assert next_poll_delay(100.0, 15, now=200.0) == 0.25
+    assert next_poll_delay(None, 15, now=0) == 3.75
+
+
+@pytest.mark.unit
+def test_parse_scrape_time() -> None:
+    assert parse_scrape_time("1970-01-01T00:00:10.123456789Z") == pytest.approx(
+        10.123456
+    )
+    assert parse_scrape_time("2017-01-17T15:07:44+01:00") == 1484662064
+    assert parse_scrape_time("1970-01-01T00:00:10.12Z") == pytest.approx(10.12)
+    assert parse_scrape_time("1970-01-01T00:00:10.1234Z") == pytest.approx(10.1234)
+    assert parse_scrape_time("0001-01-01T00:00:00Z") is None
@@ -0,0 +1,59 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Callable
+
+import pytest
+
+from src.utils.service_wait import backoff_delays, wait_for_urls
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(204)
+        self.end_headers()
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def late_server_port(http_server: Callable[..., str]) -> int:
+    """Port of a server that starts listening 200 ms from now."""
+    port = _free_port()
+    threading.Timer(0.2, http_server, (_OkHandler, port)).start()
+    return port
+
+
+@pytest.mark.unit
+def test_backoff_grows_from_milliseconds_to_cap() -> None:
+    delays = backoff_delays(initial=0.005, max_delay=0.1, rng=lambda low, high: high)
+
+    assert [next(delays) for _ in range(7)] == pytest.approx(
+        [0.005, 0.01, 0.02, 0.04, 0.08, 0.1, 0.1]
+    )
+
+
+@pytest.mark.unit
+def test_wait_for_urls_reports_ready_and_timed_out(late_server_port: int) -> None:
+    ready_url = f"http://127.0.0.1:{late_server_port}/"
+    dead_url = f"http://127.0.0.1:{_free_port()}/"
+
+    started = time.monotonic()
+    result = wait_for_urls([ready_url, dead_url], timeout=2.0)
+    elapsed = time.monotonic() - started
+
+    assert list(result.ready) == [ready_url]
+    assert 0.2 <= result.ready[ready_url] < 2.0
+    assert result.timed_out == [dead_url]
+    assert not result.all_ready
+    assert elapsed < 3.0
+
+    # A host that refused every probe is still polled until the deadline
+    started = time.monotonic()
+    assert wait_for_urls([dead_url], timeout=0.3).timed_out == [dead_url]
+    assert time.monotonic() - started >= 0.3
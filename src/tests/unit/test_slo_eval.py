@@ -0,0 +1,164 @@
+import math
+import time
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from src.utils.perf_stats import percentile
+from src.utils.range_export import RangeExport, SeriesArrays
+from src.utils.slo_eval import (
+    MetricHistory,
+    breach_windows,
+    burn_rate_alerts,
+    burn_rates,
+    evaluate_history,
+    format_evaluation_report,
+    rolling_percentile,
+)
+
+
+def _history(*rows: list, step: float = 60.0) -> MetricHistory:
+    values = np.array(rows, dtype=np.float64)
+    timestamps = np.arange(values.shape[1]) * step
+    labels = [{"name": f"c{index}"} for index in range(len(rows))]
+    return MetricHistory(timestamps, values, labels)
+
+
+@pytest.mark.unit
+def test_from_export_aligns_series_on_the_grid() -> None:
+    export = RangeExport("x", 0, 60, 15)
+    export.series = [
+        SeriesArrays({"name": "a"}, np.array([0.0, 15.0, 60.0]), np.array([1, 2, 5])),
+        SeriesArrays({"name": "b"}, np.array([30.0]), np.array([3.0])),
+    ]
+
+    history = MetricHistory.from_export(export)
+
+    assert history.timestamps.tolist() == [0, 15, 30, 45, 60]
+    assert history.step == 15 and history.samples_in(60) == 4
+    np.testing.assert_array_equal(
+        history.values,
+        [[1, 2, np.nan, np.nan, 5], [np.nan, np.nan, 3, np.nan, np.nan]],
+    )
+
+
+@pytest.mark.unit
+def test_rolling_percentile_matches_scalar_percentile() -> None:
+    values = np.random.default_rng(1).uniform(0, 100, (3, 40))
+    values[0, 5:12] = np.nan
+
+    rolled = rolling_percentile(values, 5, 0.95)
+
+    for row in range(3):
+        for column in range(40):
+            window = values[row, max(0, column - 4) : column + 1]
+            window = np.sort(window[~np.isnan(window)])
+            if len(window):
+                assert rolled[row, column] == pytest.approx(
+                    percentile(window.tolist(), 0.95)
+                )
+            else:
+                assert math.isnan(rolled[row, column])
+
+
+@pytest.mark.unit
+def test_breach_windows_are_inclusive_runs() -> None:
+    history = _history(
+        [10, 80, 95, 70, 85, 85, 85],
+        [90, 90, np.nan, 90, 10, 10, 10],
+    )
+
+    breaches = breach_windows(history, 80)
+
+    spans = [(b.labels["name"], b.start, b.end, b.peak) for b in breaches]
+    assert spans == [
+        ("c0", 60, 180, 95),
+        ("c0", 240, 420, 85),
+        ("c1", 0, 120, 90),
+        ("c1", 180, 240, 90),
+    ]
+    assert breaches.rows.tolist() == [0, 0, 1, 1]
+    assert breaches.durations.tolist() == [120, 180, 120, 60]
+    assert breaches.longest(2) == [breaches[1], breaches[0]]
+    assert list(breach_windows(history, 80, min_duration=150)) == [breaches[1]]
+    assert not len(breach_windows(history, 100))
+
+
+@pytest.mark.unit
+def test_burn_rates_over_trailing_windows() -> None:
+    history = _history([90, 10, 10, 10, np.nan, 90])
+
+    rates = burn_rates(history, 80, objective=0.5, windows=[120, 3600])
+
+    # Bad fraction over the trailing window, divided by a 50% budget
+    np.testing.assert_allclose(rates[120][0], [2, 1, 0, 0, 0, 2])
+    np.testing.assert_allclose(rates[3600][0], [2, 1, 2 / 3, 0.5, 0.5, 0.8])
+
+
+@pytest.mark.unit
+def test_multiwindow_alert_needs_both_windows() -> None:
+    # Hour-long breach that recovered: long window still burns, short does not
+    recovered = [90.0] * 60 + [10.0] * 10
+    ongoing = [10.0] * 60 + [90.0] * 10
+    history = _history(recovered, ongoing)
+
+    alerts = burn_rate_alerts(history, 80, 0.99, windows=[(3600, 300, 14.4)])
+
+    by_name = {alert.labels["name"]: alert for alert in alerts}
+    assert not by_name["c0"].firing_now
+    # Keeps firing until the 5-minute window holds no bad sample
+    assert by_name["c0"].firing_seconds == 64 * 60
+    assert by_name["c1"].firing_now
+    assert by_name["c1"].peak == pytest.approx(10 / 60 / 0.01)
+
+
+# A week of 15-second samples for 60 series
+WEEK_STEPS = 7 * 24 * 240
+WEEK_SERIES = 60
+
+
+def _smooth_week() -> MetricHistory:
+    steps = np.arange(WEEK_STEPS)
+    rows = 50 + 20 * np.sin(steps / 2880 + np.arange(WEEK_SERIES)[:, None])
+    rows[0, 4000:4240] = 99
+    return _history(*rows, step=15.0)
+
+
+def _noisy_week() -> MetricHistory:
+    rows = np.random.default_rng(2).uniform(0, 100, (WEEK_SERIES, WEEK_STEPS))
+    return _history(*rows, step=15.0)
+
+
+@pytest.mark.unit
+def test_week_of_history_finds_the_breach() -> None:
+    evaluation = evaluate_history(_smooth_week(), "cpu", 80)
+
+    assert [breach.labels["name"] for breach in evaluation.breaches] == ["c0"]
+    assert evaluation.breaches[0].duration == 3600
+    assert evaluation.compliance[0] == pytest.approx(1 - 240 / WEEK_STEPS)
+    assert evaluation.status()[0] in ("ok", "warning")
+    assert "🔥 c0" in format_evaluation_report({"cpu": evaluation})
+
+
+@pytest.mark.unit
+def test_week_of_noisy_history_reports_the_worst_breaches() -> None:
+    evaluation = evaluate_history(_noisy_week(), "cpu", 80)
+
+    # About one sample in five starts a breach
+    assert len(evaluation.breaches) > 300_000
+    assert format_evaluation_report({"cpu": evaluation}).count("🔥") == 5
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("week", [_smooth_week, _noisy_week])
+def test_week_of_history_evaluates_within_a_second(
+    week: Callable[[], MetricHistory],
+) -> None:
+    history = week()
+
+    started = time.perf_counter()
+    evaluate_history(history, "cpu", 80)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
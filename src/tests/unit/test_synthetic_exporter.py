@@ -0,0 +1,86 @@
+import threading
+from typing import Iterator, List
+
+import pytest
+import requests
+
+from src.utils.prometheus_text import parse_families
+from src.utils.synthetic_exporter import SyntheticConfig, SyntheticExporter, serve
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pods(body: str) -> List[str]:
+    families = parse_families(body, keep_samples=True)
+    return [
+        sample.labels["pod"] for sample in families["synthetic_metric_0_total"].samples
+    ]
+
+
+@pytest.mark.unit
+def test_body_has_the_configured_shape() -> None:
+    config = SyntheticConfig(metrics=4, series_per_metric=20, labels=2, histograms=1)
+    families = parse_families(SyntheticExporter(config).render(), keep_samples=True)
+
+    assert sum(family.sample_count for family in families.values()) == config.series
+    assert config.series == 4 * 20 + 20 * (10 + 3)
+    histogram = families["synthetic_latency_0_seconds"]
+    assert histogram.type == "histogram" and histogram.sample_count == 20 * 13
+    assert {
+        sample.labels["label_1"] for sample in families["synthetic_metric_1"].samples
+    } == {"value-0"}
+    assert SyntheticConfig.for_series(10_000, histograms=0).series_per_metric == 200
+
+
+@pytest.mark.unit
+def test_churn_replaces_series_round_robin_with_fresh_identities() -> None:
+    clock = _Clock()
+    config = SyntheticConfig(
+        metrics=2, series_per_metric=10, histograms=0, churn=0.3, churn_interval=60
+    )
+    exporter = SyntheticExporter(config, clock=clock)
+    initial = _pods(exporter.render())
+
+    clock.now += 60
+    after_one = _pods(exporter.render())
+    clock.now += 4 * 60
+    after_five = _pods(exporter.render())
+
+    assert initial == [f"pod-{index}" for index in range(10)]
+    assert after_one[3:] == initial[3:] and after_one[:3] == [
+        "pod-10",
+        "pod-11",
+        "pod-12",
+    ]
+    # 15 replacements: indices 0-4 were replaced twice, 5-9 once
+    assert after_five == [
+        f"pod-{index}" for index in [20, 21, 22, 23, 24, 15, 16, 17, 18, 19]
+    ]
+    assert len(set(after_five)) == 10
+
+
+@pytest.fixture
+def exporter_url() -> Iterator[str]:
+    exporter = SyntheticExporter(SyntheticConfig(metrics=2, series_per_metric=5))
+    server = serve(exporter, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_server_is_scrapeable_with_gzip(exporter_url: str) -> None:
+    response = requests.get(f"{exporter_url}/metrics", timeout=5)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "synthetic_latency_4_seconds" in parse_families(response.text)
+    assert requests.get(f"{exporter_url}/other", timeout=5).status_code == 404
@@ -0,0 +1,80 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict
+
+import pytest
+
+from src.utils.vault_benchmark import VaultBenchmarkError, benchmark_vault
+
+
+class _FakeVaultHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mounts: Dict[str, Any] = {}
+    secrets: Dict[str, Any] = {}
+
+    def _reply(self, status: int, document: Any = None) -> None:
+        body = json.dumps(document).encode() if document is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.headers.get("X-Vault-Token") != "root":
+            return self._reply(403, {"errors": ["permission denied"]})
+        if self.path == "/v1/sys/mounts":
+            return self._reply(200, {"data": self.mounts})
+        value = self.secrets.get(self.path.replace("/v1/bench-kv/data/", ""))
+        self._reply(200, {"data": {"data": {"value": value}}})
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.startswith("/v1/sys/mounts/"):
+            self.mounts[self.path.rsplit("/", 1)[1] + "/"] = payload
+        elif "/data/" in self.path:
+            key = self.path.replace("/v1/bench-kv/data/", "")
+            self.secrets[key] = payload["data"]["value"]
+        elif "/encrypt/" in self.path:
+            return self._reply(
+                200, {"data": {"ciphertext": "vault:v1:" + payload["plaintext"]}}
+            )
+        elif "/decrypt/" in self.path:
+            plaintext = payload["ciphertext"].replace("vault:v1:", "")
+            return self._reply(200, {"data": {"plaintext": plaintext}})
+        self._reply(204)
+
+
+@pytest.fixture
+def vault_url(http_server: Callable[..., str]) -> str:
+    _FakeVaultHandler.mounts = {}
+    _FakeVaultHandler.secrets = {}
+    return http_server(_FakeVaultHandler)
+
+
+@pytest.mark.unit
+def test_benchmark_vault_sweeps_operations(vault_url: str) -> None:
+    results = benchmark_vault(
+        vault_url,
+        "root",
+        concurrency_levels=[1, 2],
+        payload_sizes=[16],
+        duration=0.2,
+        key_space=4,
+    )
+
+    assert set(_FakeVaultHandler.mounts) == {"bench-kv/", "bench-transit/"}
+    assert [result.labels["op"] for result in results[::2]] == [
+        "kv_write",
+        "kv_read",
+        "transit_encrypt",
+        "transit_decrypt",
+    ]
+    assert all(result.operations and not result.errors for result in results)
+
+
+@pytest.mark.unit
+def test_benchmark_vault_requires_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("VAULT_DEV_ROOT_TOKEN_ID", raising=False)
+    with pytest.raises(VaultBenchmarkError):
+        benchmark_vault("http://127.0.0.1:1")
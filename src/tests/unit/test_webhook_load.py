@@ -0,0 +1,65 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, List
+
+import pytest
+
+from src.utils.webhook_load import (
+    benchmark_webhook_listener,
+    build_alertmanager_payload,
+)
+
+
+class _ListenerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received: List[int] = []
+
+    def do_POST(self) -> None:  # noqa: N802
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.received.append(len(payload["alerts"]))
+        self.send_response(200 if self.path == "/alert" else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def listener_url(http_server: Callable[..., str]) -> str:
+    _ListenerHandler.received = []
+    return http_server(_ListenerHandler)
+
+
+@pytest.mark.unit
+def test_payload_matches_alertmanager_group_shape() -> None:
+    payload = build_alertmanager_payload(3, alertname="HighCPU")
+
+    assert payload["version"] == "4"
+    assert payload["groupLabels"] == {"alertname": "HighCPU"}
+    assert len(payload["alerts"]) == 3
+    assert len({alert["fingerprint"] for alert in payload["alerts"]}) == 3
+    assert all(
+        alert["labels"].items() >= payload["commonLabels"].items()
+        for alert in payload["alerts"]
+    )
+
+
+@pytest.mark.unit
+def test_open_loop_rate_and_error_accounting(listener_url: str) -> None:
+    accepted = benchmark_webhook_listener(
+        f"{listener_url}/alert",
+        alerts_per_group=[5],
+        concurrency_levels=[4],
+        rate=50,
+        duration=0.5,
+    )[0]
+    rejected = benchmark_webhook_listener(
+        f"{listener_url}/missing",
+        alerts_per_group=[1],
+        concurrency_levels=[2],
+        duration=0.1,
+    )[0]
+
+    assert 20 <= accepted.operations <= 26
+    assert accepted.errors == 0
+    assert set(_ListenerHandler.received[: accepted.operations]) == {5}
+    assert rejected.operations == 0
+    assert rejected.error_rate == 1.0
@@ -0,0 +1,365 @@
+"""
+Alert pipeline latency: rule evaluation to webhook delivery.
+
+The ``Pipeline_Latency_Probe`` rule only exists while the harness measures:
+it is copied into the Prometheus container as ``latency_probe.yml`` (the
+``latency_probe*.yml`` glob in ``prometheus.yml``) and Prometheus reloads
+on SIGHUP, the way ``recording_rules --install`` does; afterwards the file
+is deleted and Prometheus reloads again. The rule is true for the first
+30 seconds of every 2-minute period (``(time() % 120) < 30``), so the moment
+its condition starts to hold is known in advance. For each onset the
+harness timestamps every stage of the pipeline:
+
+- evaluation: the rule's ``activeAt`` in Prometheus ``/api/v1/alerts``,
+  i.e. what ``evaluation_interval`` costs
+- receipt: the alert's ``updatedAt`` when it first shows up in
+  Alertmanager ``/api/v2/alerts``, i.e. the Prometheus notifier hop
+- delivery: when the webhook notification counter of the probe's own
+  receiver increases (``alertmanager.yml`` routes ``probe=pipeline-latency``
+  to ``pipeline-latency-probe``, which posts to ``webhook-listener``), i.e.
+  ``group_wait`` plus the webhook call; other alerts notify through other
+  receivers and do not count
+
+Repeated runs give a latency distribution per stage and end to end. A run
+takes up to one period, so three runs take about six minutes.
+
+Usage:
+    python -m src.utils.alert_latency --runs 5
+"""
+
+import argparse
+import math
+import subprocess  # nosec B404 - fixed docker commands
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import yaml
+
+from src.utils.alertmanager_benchmark import webhook_notifications
+from src.utils.http_timing import TimedSession
+from src.utils.perf_stats import summarize
+from src.utils.recording_rules import PROMETHEUS_CONTAINER, Runner
+from src.utils.scrape_wait import parse_scrape_time
+
+PROBE_ALERT = "Pipeline_Latency_Probe"
+PROBE_PERIOD = 120.0
+PROBE_ACTIVE = 30.0
+PROBE_RULES = {
+    "groups": [
+        {
+            "name": "pipeline-latency",
+            "rules": [
+                {
+                    "alert": PROBE_ALERT,
+                    "expr": f"(time() % {PROBE_PERIOD:g}) < {PROBE_ACTIVE:g}",
+                    "labels": {"severity": "info", "probe": "pipeline-latency"},
+                    "annotations": {
+                        "summary": "Alert pipeline latency probe",
+                        "description": "Installed by src/utils/alert_latency.py "
+                        "while it measures",
+                    },
+                }
+            ],
+        }
+    ]
+}
+# Matches the latency_probe*.yml glob in prometheus.yml
+CONTAINER_PROBE_FILE = "/etc/prometheus/latency_probe.yml"
+# Receiver that alertmanager.yml routes probe=pipeline-latency alerts to
+PROBE_RECEIVER = "pipeline-latency-probe"
+# Time for Prometheus to load the probe before the first measured onset
+RELOAD_GRACE = 5.0
+PROMETHEUS_URL = "http://localhost:9090"
+ALERTMANAGER_URL = "http://localhost:9093"
+DEFAULT_RUNS = 3
+POLL_INTERVAL = 0.25
+DEFAULT_TIMEOUT = 10
+# Delivery must happen before the next onset
+RUN_TIMEOUT = PROBE_PERIOD - 5
+STAGES = ("evaluation", "receipt", "delivery", "end_to_end")
+
+
+class AlertLatencyError(Exception):
+    """Custom exception for alert pipeline latency failures."""
+
+
+@dataclass
+class PipelineRun:
+    """Stage timestamps of one probe onset, in seconds after the onset."""
+
+    onset: float
+    evaluated: Optional[float] = None
+    received: Optional[float] = None
+    delivered: Optional[float] = None
+
+    @property
+    def complete(self) -> bool:
+        """Return whether every stage was observed."""
+        return None not in (self.evaluated, self.received, self.delivered)
+
+    def stage_latencies(self) -> Dict[str, Optional[float]]:
+        """
+        Return the time spent in each stage.
+
+        ``evaluation`` is onset to rule activation, ``receipt`` activation
+        to Alertmanager, ``delivery`` Alertmanager to webhook and
+        ``end_to_end`` onset to webhook; None where a stage was not seen.
+        """
+
+        def between(start: Optional[float], end: Optional[float]) -> Optional[float]:
+            return None if start is None or end is None else end - start
+
+        return {
+            "evaluation": self.evaluated,
+            "receipt": between(self.evaluated, self.received),
+            "delivery": between(self.received, self.delivered),
+            "end_to_end": self.delivered,
+        }
+
+
+def next_onset(now: float, period: float = PROBE_PERIOD) -> float:
+    """Return the next time the probe rule's condition starts to hold."""
+    return math.floor(now / period) * period + period
+
+
+def _docker(commands: Sequence[List[str]], runner: Runner) -> None:
+    for command in commands:
+        result = runner(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            raise AlertLatencyError(
+                f"{' '.join(command)} failed: {(result.stderr or result.stdout).strip()}"
+            )
+
+
+def install_probe(
+    container: str = PROMETHEUS_CONTAINER, runner: Runner = subprocess.run
+) -> None:
+    """
+    Copy the probe rule file into the container and make Prometheus reload it.
+
+    Raises:
+        AlertLatencyError: If a docker command fails
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "latency_probe.yml"
+        path.write_text(yaml.safe_dump(PROBE_RULES, sort_keys=False))
+        _docker(
+            [
+                ["docker", "cp", str(path), f"{container}:{CONTAINER_PROBE_FILE}"],
+                ["docker", "kill", "--signal", "HUP", container],
+            ],
+            runner,
+        )
+
+
+def remove_probe(
+    container: str = PROMETHEUS_CONTAINER, runner: Runner = subprocess.run
+) -> None:
+    """
+    Delete the probe rule file from the container and make Prometheus reload.
+
+    Raises:
+        AlertLatencyError: If a docker command fails
+    """
+    _docker(
+        [
+            ["docker", "exec", container, "rm", "-f", CONTAINER_PROBE_FILE],
+            ["docker", "kill", "--signal", "HUP", container],
+        ],
+        runner,
+    )
+
+
+def prometheus_activation(
+    session: TimedSession, prometheus_url: str, since: float
+) -> Optional[float]:
+    """
+    Return the ``activeAt`` epoch of the firing probe alert in Prometheus.
+
+    Alerts that became active before ``since`` belong to an earlier onset
+    and are ignored.
+    """
+    response = session.get(f"{prometheus_url}/api/v1/alerts", timeout=DEFAULT_TIMEOUT)
+    response.raise_for_status()
+    for alert in response.json().get("data", {}).get("alerts", []):
+        if alert.get("labels", {}).get("alertname") != PROBE_ALERT:
+            continue
+        active_at = parse_scrape_time(alert.get("activeAt"))
+        if alert.get("state") == "firing" and active_at and active_at >= since:
+            return active_at
+    return None
+
+
+def alertmanager_receipt(
+    session: TimedSession, alertmanager_url: str, since: float
+) -> Optional[float]:
+    """
+    Return when Alertmanager received the probe alert of the current onset.
+
+    ``updatedAt`` is when Alertmanager last stored the alert, which for the
+    first sighting is the receipt time (Prometheus resends only a minute
+    later).
+    """
+    response = session.get(
+        f"{alertmanager_url}/api/v2/alerts",
+        params={"filter": f'alertname="{PROBE_ALERT}"'},
+        timeout=DEFAULT_TIMEOUT,
+    )
+    response.raise_for_status()
+    for alert in response.json():
+        starts_at = parse_scrape_time(alert.get("startsAt"))
+        if starts_at is not None and starts_at >= since:
+            return parse_scrape_time(alert.get("updatedAt")) or time.time()
+    return None
+
+
+def measure_run(
+    session: TimedSession,
+    onset: float,
+    prometheus_url: str = PROMETHEUS_URL,
+    alertmanager_url: str = ALERTMANAGER_URL,
+    timeout: float = RUN_TIMEOUT,
+    clock: Callable[[], float] = time.time,
+) -> PipelineRun:
+    """
+    Observe the pipeline for one onset.
+
+    Call shortly before ``onset`` with the probe installed: the probe
+    receiver's webhook notification count is taken as the baseline first,
+    then every stage is polled until delivery or ``timeout`` seconds after
+    the onset.
+
+    Returns:
+        PipelineRun; stages not seen within the timeout stay None
+    """
+    run = PipelineRun(onset)
+    baseline = webhook_notifications(session, alertmanager_url, PROBE_RECEIVER)
+    # Prometheus timestamps have millisecond resolution
+    since = onset - 1
+    while clock() < onset + timeout:
+        if run.evaluated is None:
+            active_at = prometheus_activation(session, prometheus_url, since)
+            if active_at is not None:
+                run.evaluated = active_at - onset
+        if run.received is None:
+            received_at = alertmanager_receipt(session, alertmanager_url, since)
+            if received_at is not None:
+                run.received = received_at - onset
+        delivered = webhook_notifications(session, alertmanager_url, PROBE_RECEIVER)
+        if delivered > baseline:
+            run.delivered = clock() - onset
+            break
+        time.sleep(POLL_INTERVAL)
+    return run
+
+
+def measure_pipeline_latency(
+    runs: int = DEFAULT_RUNS,
+    prometheus_url: str = PROMETHEUS_URL,
+    alertmanager_url: str = ALERTMANAGER_URL,
+    session: Optional[TimedSession] = None,
+    container: str = PROMETHEUS_CONTAINER,
+    runner: Runner = subprocess.run,
+) -> List[PipelineRun]:
+    """
+    Measure the alert pipeline over several consecutive probe onsets.
+
+    The probe rule is installed first and removed again when done, also
+    after a failure.
+
+    Args:
+        runs: Number of onsets to observe
+        prometheus_url: Prometheus base URL
+        alertmanager_url: Alertmanager base URL
+        session: Session for all requests
+        container: Prometheus container the probe is installed in
+        runner: Runs the docker commands
+
+    Returns:
+        One PipelineRun per onset
+
+    Raises:
+        AlertLatencyError: If the probe cannot be installed or removed
+    """
+    owned = session is None
+    session = session or TimedSession()
+    results = []
+    try:
+        install_probe(container, runner)
+        for _ in range(runs):
+            onset = next_onset(time.time() + RELOAD_GRACE)
+            time.sleep(max(0.0, onset - 1 - time.time()))
+            results.append(
+                measure_run(session, onset, prometheus_url, alertmanager_url)
+            )
+    finally:
+        try:
+            remove_probe(container, runner)
+        finally:
+            if owned:
+                session.close()
+    return results
+
+
+def latency_summary(runs: List[PipelineRun]) -> Dict[str, Dict[str, float]]:
+    """Return the latency distribution of every stage over the observed runs."""
+    values: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    for run in runs:
+        for stage, latency in run.stage_latencies().items():
+            if latency is not None:
+                values[stage].append(latency)
+    return {stage: summarize(latencies) for stage, latencies in values.items()}
+
+
+def format_latency_report(runs: List[PipelineRun]) -> str:
+    """Render per-stage latency percentiles and incomplete runs."""
+    header = (
+        f"{'stage':<12} {'runs':>5} {'min s':>7} {'p50 s':>7} "
+        f"{'p95 s':>7} {'max s':>7}"
+    )
+    lines = ["🚨 Alert pipeline latency (from condition onset)", header]
+    lines.append("-" * len(header))
+    for stage, summary in latency_summary(runs).items():
+        lines.append(
+            f"{stage:<12} {summary['count']:>5.0f} {summary['min']:>7.2f} "
+            f"{summary['p50']:>7.2f} {summary['p95']:>7.2f} {summary['max']:>7.2f}"
+        )
+    for run in runs:
+        if not run.complete:
+            missing = [
+                stage
+                for stage, value in (
+                    ("evaluation", run.evaluated),
+                    ("receipt", run.received),
+                    ("delivery", run.delivered),
+                )
+                if value is None
+            ]
+            onset = time.strftime("%H:%M:%S", time.localtime(run.onset))
+            lines.append(f"⚠️  Run at {onset} never reached: {', '.join(missing)}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Measure the local stack's alert pipeline and print the report."""
+    parser = argparse.ArgumentParser(description="Measure alert pipeline latency")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--prometheus-url", default=PROMETHEUS_URL)
+    parser.add_argument("--alertmanager-url", default=ALERTMANAGER_URL)
+    args = parser.parse_args(argv)
+
+    print(
+        f"⏳ Observing {args.runs} probe onset(s), up to "
+        f"{args.runs * PROBE_PERIOD / 60:.0f} min"
+    )
+    runs = measure_pipeline_latency(
+        args.runs, args.prometheus_url, args.alertmanager_url
+    )
+    print(format_latency_report(runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+Alertmanager ingestion and notification latency benchmark.
+
+Posts synthetic alerts in batches to ``/api/v2/alerts`` and measures, per
+scenario:
+
+- ingestion throughput (alerts/s accepted by the v2 API)
+- time until the alerts show up aggregated in ``/api/v2/alerts/groups``
+- time until Alertmanager has delivered the grouped notifications to the
+  webhook receiver (``webhook-listener:5001/alert``), observed through its
+  ``alertmanager_notifications_total{integration="webhook"}`` counter
+
+Scenarios sweep alert cardinality, the number of groups the alerts fall into
+(distinct ``alertname`` values, the route's ``group_by`` key) and the number
+of extra labels per alert, which is what dedup fingerprints are computed
+from. Alerts carry ``benchmark=alertmanager``, which ``alertmanager.yml``
+routes to a webhook receiver of their own (``alertmanager-benchmark``), so
+only their notifications are counted: the counter is read per receiver
+(``receiver_name``, which ``docker-compose.yml`` enables with
+``--enable-feature=receiver-name-in-metrics``), not across the always-firing
+critical alerts. They are all resolved once the sweep is over.
+
+Note that delivery cannot be faster than the route's ``group_wait`` (10s in
+``alertmanager.yml``); the interesting part is how far beyond it each
+scenario lands.
+
+Usage:
+    python -m src.utils.alertmanager_benchmark --alerts 10,100,1000 --groups 1,10
+"""
+
+import argparse
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.load_testing import LoadResult, format_load_table, run_load
+
+DEFAULT_URL = "http://localhost:9093"
+DEFAULT_CARDINALITY = (10, 100, 1000)
+DEFAULT_GROUPS = (1, 10)
+DEFAULT_EXTRA_LABELS = (0, 10)
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 10
+# group_wait (10s) + group_interval (30s) leaves room for a late flush
+NOTIFICATION_TIMEOUT = 60.0
+POLL_INTERVAL = 0.1
+WEBHOOK_INTEGRATION = 'integration="webhook"'
+# Receiver that alertmanager.yml routes benchmark=alertmanager alerts to
+BENCHMARK_RECEIVER = "alertmanager-benchmark"
+
+
+class AlertmanagerBenchmarkError(Exception):
+    """Custom exception for Alertmanager benchmark failures."""
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def build_alerts(
+    run_id: str,
+    scenario: str,
+    cardinality: int,
+    groups: int,
+    extra_labels: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Build ``cardinality`` distinct alerts spread round-robin over ``groups``.
+
+    Args:
+        run_id: Value of the ``run`` label shared by the whole sweep
+        scenario: Value of the ``scenario`` label
+        cardinality: Number of distinct alerts
+        groups: Number of distinct ``alertname`` values
+        extra_labels: Additional constant labels per alert
+
+    Returns:
+        Alerts in the v2 API ``postableAlerts`` format
+    """
+    starts_at = _timestamp(datetime.now(timezone.utc))
+    alerts = []
+    for index in range(cardinality):
+        labels = {
+            "alertname": f"Bench_{scenario}_{index % groups}",
+            "severity": "critical",
+            "benchmark": "alertmanager",
+            "run": run_id,
+            "scenario": scenario,
+            "instance": f"bench-{index}",
+        }
+        labels.update({f"extra_{label}": "value" for label in range(extra_labels)})
+        alerts.append(
+            {
+                "labels": labels,
+                "annotations": {"summary": "Alertmanager ingestion benchmark"},
+                "startsAt": starts_at,
+                "generatorURL": "http://localhost/alertmanager-benchmark",
+            }
+        )
+    return alerts
+
+
+def webhook_notifications(
+    session: TimedSession, base_url: str, receiver: Optional[str] = None
+) -> float:
+    """
+    Return the number of webhook notifications Alertmanager has delivered.
+
+    Sums ``alertmanager_notifications_total`` minus
+    ``alertmanager_notifications_failed_total`` over the webhook integration,
+    of one receiver only when ``receiver`` is given. Without the
+    ``receiver_name`` label (feature flag off) a receiver counts nothing.
+
+    Raises:
+        AlertmanagerBenchmarkError: If the metrics endpoint cannot be read
+    """
+    response = session.get(f"{base_url}/metrics", timeout=DEFAULT_TIMEOUT)
+    if response.status_code != 200:
+        raise AlertmanagerBenchmarkError(
+            f"Alertmanager /metrics returned HTTP {response.status_code}"
+        )
+
+    wanted = f'receiver_name="{receiver}"' if receiver else ""
+    delivered = 0.0
+    for line in response.text.splitlines():
+        if WEBHOOK_INTEGRATION not in line or wanted not in line:
+            continue
+        if line.startswith("alertmanager_notifications_total{"):
+            delivered += float(line.rsplit(" ", 1)[1])
+        elif line.startswith("alertmanager_notifications_failed_total{"):
+            delivered -= float(line.rsplit(" ", 1)[1])
+    return delivered
+
+
+def _visible_groups(
+    session: TimedSession, base_url: str, run_id: str, scenario: str
+) -> List[Dict[str, Any]]:
+    response = session.get(
+        f"{base_url}/api/v2/alerts/groups",
+        params=[("filter", f'run="{run_id}"'), ("filter", f'scenario="{scenario}"')],
+        timeout=DEFAULT_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def post_alerts(
+    session: TimedSession,
+    base_url: str,
+    alerts: List[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> LoadResult:
+    """
+    Post ``alerts`` to the v2 API in concurrent batches.
+
+    Returns:
+        LoadResult with one operation per batch
+    """
+
+    def post(iteration: int) -> None:
+        batch = alerts[iteration * batch_size : (iteration + 1) * batch_size]
+        response = session.post(
+            f"{base_url}/api/v2/alerts", json=batch, timeout=DEFAULT_TIMEOUT
+        )
+        response.raise_for_status()
+
+    return run_load(
+        post,
+        concurrency=concurrency,
+        iterations=math.ceil(len(alerts) / batch_size),
+        name="alertmanager",
+    )
+
+
+def run_scenario(
+    session: TimedSession,
+    base_url: str,
+    run_id: str,
+    cardinality: int,
+    groups: int,
+    extra_labels: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = NOTIFICATION_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Ingest one scenario's alerts and wait for grouping and delivery.
+
+    Returns:
+        Dictionary with the ingestion LoadResult, ``alerts_per_second``,
+        ``groups_visible`` and ``first_notification``/``all_notifications``
+        latencies in seconds (None if not reached within ``timeout``), plus
+        the posted ``alerts`` so they can be resolved later
+    """
+    scenario = f"c{cardinality}g{groups}l{extra_labels}"
+    alerts = build_alerts(run_id, scenario, cardinality, groups, extra_labels)
+    groups = min(groups, cardinality)
+    baseline = webhook_notifications(session, base_url, BENCHMARK_RECEIVER)
+
+    started = time.monotonic()
+    ingest = post_alerts(session, base_url, alerts, batch_size, concurrency)
+    ingest.labels = {"alerts": cardinality, "groups": groups, "labels": extra_labels}
+
+    report: Dict[str, Any] = {
+        "scenario": scenario,
+        "ingest": ingest,
+        "alerts_per_second": cardinality / ingest.duration if ingest.duration else 0,
+        "groups_visible": None,
+        "first_notification": None,
+        "all_notifications": None,
+        "alerts": alerts,
+    }
+
+    deadline = started + timeout
+    while time.monotonic() < deadline:
+        elapsed = time.monotonic() - started
+        if report["groups_visible"] is None:
+            visible = _visible_groups(session, base_url, run_id, scenario)
+            if (
+                len(visible) >= groups
+                and sum(len(group["alerts"]) for group in visible) >= cardinality
+            ):
+                report["groups_visible"] = elapsed
+
+        delivered = (
+            webhook_notifications(session, base_url, BENCHMARK_RECEIVER) - baseline
+        )
+        if delivered >= 1 and report["first_notification"] is None:
+            report["first_notification"] = elapsed
+        if delivered >= groups:
+            report["all_notifications"] = elapsed
+            break
+        time.sleep(POLL_INTERVAL)
+
+    return report
+
+
+def resolve_alerts(
+    session: TimedSession, base_url: str, alerts: List[Dict[str, Any]]
+) -> None:
+    """Resolve previously posted alerts by re-posting them with ``endsAt``."""
+    ends_at = _timestamp(datetime.now(timezone.utc) - timedelta(seconds=1))
+    resolved = [{**alert, "endsAt": ends_at} for alert in alerts]
+    for start in range(0, len(resolved), DEFAULT_BATCH_SIZE):
+        response = session.post(
+            f"{base_url}/api/v2/alerts",
+            json=resolved[start : start + DEFAULT_BATCH_SIZE],
+            timeout=DEFAULT_TIMEOUT,
+        )
+        response.raise_for_status()
+
+
+def benchmark_alertmanager(
+    base_url: str = DEFAULT_URL,
+    cardinalities: Sequence[int] = DEFAULT_CARDINALITY,
+    group_counts: Sequence[int] = DEFAULT_GROUPS,
+    extra_label_counts: Sequence[int] = DEFAULT_EXTRA_LABELS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = NOTIFICATION_TIMEOUT,
+) -> List[Dict[str, Any]]:
+    """
+    Sweep alert cardinality, group count and label count.
+
+    Scenarios run one after another so notification counts are attributable.
+    Every posted alert is resolved when the sweep ends, even on failure.
+
+    Returns:
+        One ``run_scenario`` report per combination (without ``alerts``)
+    """
+    run_id = uuid.uuid4().hex[:12]
+    reports = []
+    posted: List[Dict[str, Any]] = []
+
+    with TimedSession(
+        "alertmanager", recorder=TimingRecorder(), pool_maxsize=concurrency
+    ) as session:
+        try:
+            for cardinality in cardinalities:
+                for groups in group_counts:
+                    for extra_labels in extra_label_counts:
+                        report = run_scenario(
+                            session,
+                            base_url,
+                            run_id,
+                            cardinality,
+                            groups,
+                            extra_labels,
+                            batch_size,
+                            concurrency,
+                            timeout,
+                        )
+                        posted.extend(report.pop("alerts"))
+                        reports.append(report)
+        finally:
+            resolve_alerts(session, base_url, posted)
+
+    return reports
+
+
+def format_alertmanager_report(reports: Sequence[Dict[str, Any]]) -> str:
+    """Render ``benchmark_alertmanager`` reports as text."""
+
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.2f}" if value is not None else "timeout"
+
+    lines = [
+        format_load_table(
+            [report["ingest"] for report in reports], "🚨 Alertmanager ingestion"
+        ),
+        "",
+        f"{'scenario':<16} {'alerts/s':>10} {'grouped s':>10} "
+        f"{'first notif s':>14} {'all notif s':>12}",
+    ]
+    for report in reports:
+        lines.append(
+            f"{report['scenario']:<16} {report['alerts_per_second']:>10.1f} "
+            f"{seconds(report['groups_visible']):>10} "
+            f"{seconds(report['first_notification']):>14} "
+            f"{seconds(report['all_notifications']):>12}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the benchmark from the command line and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--alerts", default="10,100,1000")
+    parser.add_argument("--groups", default="1,10")
+    parser.add_argument("--labels", default="0,10")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    reports = benchmark_alertmanager(
+        base_url=args.url,
+        cardinalities=[int(value) for value in args.alerts.split(",")],
+        group_counts=[int(value) for value in args.groups.split(",")],
+        extra_label_counts=[int(value) for value in args.labels.split(",")],
+        batch_size=args.batch,
+        concurrency=args.concurrency,
+    )
+    print(format_alertmanager_report(reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+On-demand blackbox exporter probe matrix.
+
+Prometheus only runs blackbox probes at its scrape interval and only for
+the targets in ``prometheus.yml``. ``run_probe_matrix`` calls the
+exporter's ``/probe`` endpoint directly for every service in
+``BLACKBOX_TARGETS`` and every prober kind (HTTP health path, TCP connect,
+ICMP ping) concurrently, parses the probe's own exposition output
+(``probe_success``, ``probe_duration_seconds`` and the per-phase
+``probe_http_duration_seconds`` / ``probe_icmp_duration_seconds``) and
+returns a target-by-prober latency matrix.
+
+The exporter resolves targets itself, so addresses are the container names
+on the compose network, not the ports published on localhost.
+
+Usage:
+    python -m src.utils.blackbox_probe
+    python -m src.utils.blackbox_probe --kinds http tcp --targets grafana redis
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import requests
+
+from src.utils.circuit_breaker import CIRCUIT_BREAKERS
+from src.utils.constants import BLACKBOX_TARGETS
+from src.utils.http_timing import TimedSession
+from src.utils.prometheus_text import ExpositionError, parse_families
+
+BLACKBOX_URL = "http://localhost:9115"
+# Prober kind to the module in blackbox.yml
+PROBE_MODULES = {"http": "http_2xx", "tcp": "tcp_connect", "icmp": "icmp_ping"}
+PHASE_METRICS = ("probe_http_duration_seconds", "probe_icmp_duration_seconds")
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_WORKERS = 16
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one ``/probe`` call."""
+
+    target: str
+    kind: str
+    address: str
+    success: bool = False
+    duration: Optional[float] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+    status_code: Optional[int] = None
+    latency: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class ProbeMatrix:
+    """Probe results of every target and prober kind."""
+
+    results: List[ProbeResult] = field(default_factory=list)
+
+    def latency(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Return ``probe_duration_seconds`` per target and kind; None on failure."""
+        matrix: Dict[str, Dict[str, Optional[float]]] = {}
+        for result in self.results:
+            matrix.setdefault(result.target, {})[result.kind] = (
+                result.duration if result.success else None
+            )
+        return matrix
+
+    def failures(self) -> List[ProbeResult]:
+        """Return the probes that did not succeed."""
+        return [result for result in self.results if not result.success]
+
+
+def probe_plan(
+    targets: Mapping[str, Mapping[str, Any]] = BLACKBOX_TARGETS,
+    kinds: Iterable[str] = tuple(PROBE_MODULES),
+) -> List[Tuple[str, str, str]]:
+    """
+    Expand targets into ``(target, kind, address)`` probes.
+
+    HTTP probes need an ``http`` path on the target; TCP probes use
+    ``host:port`` and ICMP probes the host.
+    """
+    plan = []
+    for name, config in targets.items():
+        host, port = config["host"], config.get("port")
+        for kind in kinds:
+            if kind == "http" and "http" in config:
+                plan.append((name, kind, f"http://{host}:{port}{config['http']}"))
+            elif kind == "tcp" and port is not None:
+                plan.append((name, kind, f"{host}:{port}"))
+            elif kind == "icmp":
+                plan.append((name, kind, host))
+    return plan
+
+
+def parse_probe_output(result: ProbeResult, body: str) -> ProbeResult:
+    """
+    Fill a result from the exposition body ``/probe`` returns.
+
+    Raises:
+        ExpositionError: If the body is not valid exposition format
+    """
+    for family in parse_families(body, keep_samples=True).values():
+        for sample in family.samples:
+            if sample.name == "probe_success":
+                result.success = sample.value == 1
+            elif sample.name == "probe_duration_seconds":
+                result.duration = sample.value
+            elif sample.name == "probe_http_status_code" and sample.value:
+                result.status_code = int(sample.value)
+            elif sample.name in PHASE_METRICS and "phase" in sample.labels:
+                result.phases[sample.labels["phase"]] = sample.value
+            elif sample.name == "probe_dns_lookup_time_seconds":
+                result.phases.setdefault("resolve", sample.value)
+    return result
+
+
+def run_probe(
+    session: requests.Session,
+    target: str,
+    kind: str,
+    address: str,
+    blackbox_url: str = BLACKBOX_URL,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> ProbeResult:
+    """
+    Run one probe through the exporter; failures are captured in the result.
+
+    The timeout is passed on the way Prometheus does, so the exporter gives
+    up on the target before the request itself times out.
+    """
+    result = ProbeResult(target, kind, address)
+    started = time.perf_counter()
+    try:
+        response = session.get(
+            f"{blackbox_url}/probe",
+            params={"target": address, "module": PROBE_MODULES[kind]},
+            headers={"X-Prometheus-Scrape-Timeout-Seconds": str(timeout)},
+            timeout=timeout + 5,
+        )
+        result.latency = time.perf_counter() - started
+        if response.status_code != 200:
+            result.error = f"HTTP {response.status_code}: {response.text[:100]}"
+            return result
+        parse_probe_output(result, response.text)
+        if not result.success:
+            result.error = "probe failed"
+    except (requests.RequestException, ExpositionError) as e:
+        result.latency = time.perf_counter() - started
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_probe_matrix(
+    targets: Mapping[str, Mapping[str, Any]] = BLACKBOX_TARGETS,
+    kinds: Iterable[str] = tuple(PROBE_MODULES),
+    blackbox_url: str = BLACKBOX_URL,
+    session: Optional[requests.Session] = None,
+    max_workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> ProbeMatrix:
+    """
+    Probe every target with every prober kind concurrently.
+
+    Args:
+        targets: Target name to ``host``, ``port`` and optional ``http`` path
+        kinds: Prober kinds to run (``http``, ``tcp``, ``icmp``)
+        blackbox_url: Blackbox exporter base URL
+        session: Session to share; one sized for ``max_workers`` is created
+            when omitted
+        max_workers: Probes in flight
+        timeout: Per-probe timeout in seconds
+
+    Returns:
+        ProbeMatrix with results in plan order
+    """
+    plan = probe_plan(targets, kinds)
+    owned = session is None
+    session = session or TimedSession(
+        "blackbox", pool_maxsize=max_workers, breakers=CIRCUIT_BREAKERS
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [
+                executor.submit(
+                    run_probe, session, target, kind, address, blackbox_url, timeout
+                )
+                for target, kind, address in plan
+            ]
+            return ProbeMatrix([future.result() for future in futures])
+    finally:
+        if owned:
+            session.close()
+
+
+def format_probe_matrix(matrix: ProbeMatrix) -> str:
+    """Render probe durations per target and kind, then HTTP phases and errors."""
+    kinds = [
+        kind for kind in PROBE_MODULES if any(r.kind == kind for r in matrix.results)
+    ]
+    header = f"{'target':<16}" + "".join(f"{kind + ' ms':>12}" for kind in kinds)
+    lines = ["🛰️  Blackbox probe matrix", header, "-" * len(header)]
+    for target, row in matrix.latency().items():
+        cells = []
+        for kind in kinds:
+            duration = row.get(kind)
+            if kind not in row:
+                cells.append(f"{'-':>12}")
+            elif duration is None:
+                cells.append(f"{'❌':>11}")
+            else:
+                cells.append(f"{duration * 1000:>12.1f}")
+        lines.append(f"{target[:16]:<16}" + "".join(cells))
+
+    phased = [r for r in matrix.results if r.success and r.kind == "http"]
+    if phased:
+        lines.append("")
+        lines.append("HTTP phases (ms):")
+    for result in phased:
+        phases = " ".join(
+            f"{phase}={seconds * 1000:.1f}" for phase, seconds in result.phases.items()
+        )
+        lines.append(f"  {result.target:<14} {result.status_code} {phases}")
+    for result in matrix.failures():
+        lines.append(
+            f"❌ {result.target} {result.kind} {result.address}: {result.error}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the probe matrix against the local stack and print it."""
+    parser = argparse.ArgumentParser(description="Run blackbox probes on demand")
+    parser.add_argument("--blackbox-url", default=BLACKBOX_URL)
+    parser.add_argument("--kinds", nargs="+", default=list(PROBE_MODULES))
+    parser.add_argument("--targets", nargs="+", help="subset of BLACKBOX_TARGETS")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="s")
+    args = parser.parse_args(argv)
+
+    targets = BLACKBOX_TARGETS
+    if args.targets:
+        targets = {name: BLACKBOX_TARGETS[name] for name in args.targets}
+    started = time.perf_counter()
+    matrix = run_probe_matrix(
+        targets, args.kinds, args.blackbox_url, timeout=args.timeout
+    )
+    print(format_probe_matrix(matrix))
+    print(f"⏱️  {len(matrix.results)} probes in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
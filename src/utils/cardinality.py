@@ -0,0 +1,350 @@
+"""
+Series cardinality analysis for the exporters and the Prometheus TSDB.
+
+Prometheus memory is driven by the number of active series, so this module
+counts them from two sides: every exporter configured in ``prometheus.yml``
+is scraped in full and its samples are grouped per metric, per label and
+per label value, and Prometheus' ``/api/v1/status/tsdb`` endpoint supplies
+the head block's view of the same. Per-job series counts are compared with
+the previous run so an exporter whose cardinality grew is flagged.
+
+Usage:
+    python -m src.utils.cardinality
+    python -m src.utils.cardinality --top 20 --growth-threshold 0.05
+"""
+
+import argparse
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+import requests
+
+from src.utils.constants import METRICS_EXPORTERS
+from src.utils.exporter_scrape import scrape_exporters
+from src.utils.http_timing import TimedSession
+from src.utils.prometheus_config import load_scrape_jobs
+from src.utils.prometheus_text import Sample
+from src.utils.promql import PromQLExecutor, PromQuery
+
+# Rule of thumb for the head block: index entry, label strings, the open
+# chunk and its bookkeeping come to a few KiB per active series
+HEAD_BYTES_PER_SERIES = 3 * 1024
+DEFAULT_TOP = 10
+DEFAULT_GROWTH_THRESHOLD = 0.10
+BASELINE_PATH = (
+    Path(__file__).resolve().parents[1] / "reports" / "cardinality" / "baseline.json"
+)
+# Series each job exposes per scrape, i.e. its active series in the head
+JOB_SERIES_QUERY = "sum by (job) (scrape_samples_post_metric_relabeling)"
+
+
+class CardinalityError(Exception):
+    """Custom exception for cardinality analysis failures."""
+
+
+@dataclass
+class CardinalityReport:
+    """Series counts of one exporter, or of the whole TSDB."""
+
+    source: str
+    series: int = 0
+    by_metric: Dict[str, int] = field(default_factory=dict)
+    label_values: Dict[str, int] = field(default_factory=dict)
+    top_label_values: List[Tuple[str, str, int]] = field(default_factory=list)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Return the estimated head block memory for these series."""
+        return self.series * HEAD_BYTES_PER_SERIES
+
+    def top_metrics(self, count: int = DEFAULT_TOP) -> List[Tuple[str, int]]:
+        """Return the metrics with the most series."""
+        return Counter(self.by_metric).most_common(count)
+
+
+@dataclass
+class CardinalityAnalysis:
+    """Exporter, job and TSDB cardinality plus growth since the last run."""
+
+    exporters: Dict[str, CardinalityReport] = field(default_factory=dict)
+    jobs: Dict[str, int] = field(default_factory=dict)
+    tsdb: Optional[CardinalityReport] = None
+    grown: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def profile_samples(
+    source: str, samples: Iterable[Sample], top: int = DEFAULT_TOP
+) -> CardinalityReport:
+    """
+    Count series per metric, per label and per label value.
+
+    Every sample line of a scrape is a distinct series, so counting samples
+    counts series.
+
+    Args:
+        source: Exporter or job name
+        samples: Parsed samples of one scrape
+        top: Number of label value pairs to keep, highest series count first
+
+    Returns:
+        CardinalityReport for the scrape
+    """
+    report = CardinalityReport(source)
+    by_metric: Counter = Counter()
+    pairs: Counter = Counter()
+    values: Dict[str, Set[str]] = defaultdict(set)
+
+    for sample in samples:
+        report.series += 1
+        by_metric[sample.name] += 1
+        for label, value in sample.labels.items():
+            pairs[(label, value)] += 1
+            values[label].add(value)
+
+    report.by_metric = dict(by_metric)
+    report.label_values = {label: len(seen) for label, seen in values.items()}
+    report.top_label_values = [
+        (label, value, count) for (label, value), count in pairs.most_common(top)
+    ]
+    return report
+
+
+def profile_tsdb(
+    session: requests.Session,
+    prometheus_url: str = "http://localhost:9090",
+    top: int = DEFAULT_TOP,
+    timeout: int = 10,
+) -> CardinalityReport:
+    """
+    Read the head block statistics from ``/api/v1/status/tsdb``.
+
+    Returns:
+        CardinalityReport with the head series count and Prometheus' top
+        metrics, label value counts and label value pairs
+
+    Raises:
+        CardinalityError: If the endpoint does not answer successfully
+    """
+    try:
+        response = session.get(
+            f"{prometheus_url}/api/v1/status/tsdb",
+            params={"limit": top},
+            timeout=timeout,
+        )
+        body = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise CardinalityError(f"TSDB status request failed: {e}") from e
+    if body.get("status") != "success":
+        raise CardinalityError(f"TSDB status failed: {body.get('error', body)}")
+
+    data = body["data"]
+    pairs = []
+    for entry in data.get("seriesCountByLabelValuePair", []):
+        label, _, value = entry["name"].partition("=")
+        pairs.append((label, value, int(entry["value"])))
+
+    return CardinalityReport(
+        source="tsdb",
+        series=int(data.get("headStats", {}).get("numSeries", 0)),
+        by_metric={
+            entry["name"]: int(entry["value"])
+            for entry in data.get("seriesCountByMetricName", [])
+        },
+        label_values={
+            entry["name"]: int(entry["value"])
+            for entry in data.get("labelValueCountByLabelName", [])
+        },
+        top_label_values=pairs,
+    )
+
+
+def series_per_job(executor: PromQLExecutor) -> Dict[str, int]:
+    """
+    Return the number of series each job exposes per scrape.
+
+    Raises:
+        CardinalityError: If the query fails
+    """
+    result = executor.execute(PromQuery(JOB_SERIES_QUERY))
+    if not result.ok:
+        raise CardinalityError(f"Per-job series query failed: {result.error}")
+    return {
+        series["metric"].get("job", ""): int(float(series["value"][1]))
+        for series in result.result
+    }
+
+
+def load_baseline(path: Union[str, Path] = BASELINE_PATH) -> Dict[str, int]:
+    """Return the per-job series counts of the previous run, if any."""
+    try:
+        with open(path, encoding="utf-8") as baseline:
+            return dict(json.load(baseline).get("series", {}))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(
+    counts: Mapping[str, int], path: Union[str, Path] = BASELINE_PATH
+) -> None:
+    """Store per-job series counts for the next run to compare against."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as baseline:
+        json.dump({"timestamp": time.time(), "series": dict(counts)}, baseline)
+
+
+def find_growth(
+    previous: Mapping[str, int],
+    current: Mapping[str, int],
+    threshold: float = DEFAULT_GROWTH_THRESHOLD,
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Return the sources whose series count grew by more than ``threshold``.
+
+    Sources without a previous count are not flagged.
+
+    Returns:
+        ``(previous, current)`` series counts per grown source
+    """
+    return {
+        name: (previous[name], count)
+        for name, count in current.items()
+        if name in previous and count > previous[name] * (1 + threshold)
+    }
+
+
+def analyze_cardinality(
+    prometheus_url: str = "http://localhost:9090",
+    exporters: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    host: str = "localhost",
+    top: int = DEFAULT_TOP,
+    baseline_path: Optional[Union[str, Path]] = None,
+    growth_threshold: float = DEFAULT_GROWTH_THRESHOLD,
+    session: Optional[requests.Session] = None,
+) -> CardinalityAnalysis:
+    """
+    Analyse series cardinality of the exporters and of Prometheus.
+
+    Args:
+        prometheus_url: Prometheus base URL
+        exporters: Exporters to scrape; by default those in
+            ``METRICS_EXPORTERS`` that are jobs in ``prometheus.yml``
+        host: Host the exporter ports are published on
+        top: Number of top metrics and label value pairs to keep
+        baseline_path: Where the previous run's counts are read from and
+            this run's are written to (the CLI uses ``BASELINE_PATH``); None
+            disables growth tracking
+        growth_threshold: Relative growth that flags an exporter
+        session: Session for Prometheus requests
+
+    Returns:
+        CardinalityAnalysis; unreachable sources are listed in ``errors``
+    """
+    if exporters is None:
+        jobs = load_scrape_jobs()
+        exporters = {
+            name: config for name, config in METRICS_EXPORTERS.items() if name in jobs
+        }
+    session = session or TimedSession("prometheus")
+    analysis = CardinalityAnalysis()
+
+    # Full bodies are needed to count every series
+    scrapes = scrape_exporters(
+        exporters, host=host, early_stop=False, keep_samples=True
+    )
+    for name, scrape in scrapes.items():
+        if scrape.error or scrape.status_code != 200:
+            analysis.errors[name] = scrape.error or f"HTTP {scrape.status_code}"
+            continue
+        samples = (
+            sample for family in scrape.families.values() for sample in family.samples
+        )
+        analysis.exporters[name] = profile_samples(name, samples, top)
+
+    try:
+        analysis.tsdb = profile_tsdb(session, prometheus_url, top)
+        analysis.jobs = series_per_job(PromQLExecutor(prometheus_url, session=session))
+    except CardinalityError as e:
+        analysis.errors["prometheus"] = str(e)
+
+    # Prometheus' per-job view, or the exporter's own count if it is down
+    current = {name: report.series for name, report in analysis.exporters.items()}
+    current.update(analysis.jobs)
+    if baseline_path is not None:
+        analysis.grown = find_growth(
+            load_baseline(baseline_path), current, growth_threshold
+        )
+        if current:
+            save_baseline(current, baseline_path)
+    return analysis
+
+
+def _megabytes(count: int) -> str:
+    return f"{count / 1024 / 1024:.1f} MiB"
+
+
+def format_cardinality_report(analysis: CardinalityAnalysis, top: int = 5) -> str:
+    """Render a cardinality analysis as text."""
+    header = f"{'source':<28} {'series':>9} {'memory':>10} {'top metric':<40}"
+    lines = ["🧮 Series cardinality", header, "-" * len(header)]
+
+    reports = list(analysis.exporters.values())
+    if analysis.tsdb is not None:
+        reports.append(analysis.tsdb)
+    for report in sorted(reports, key=lambda report: report.series, reverse=True):
+        metric, count = (report.top_metrics(1) or [("-", 0)])[0]
+        lines.append(
+            f"{report.source[:28]:<28} {report.series:>9,} "
+            f"{_megabytes(report.memory_bytes):>10} {metric[:32]} ({count:,})"
+        )
+
+    if analysis.jobs:
+        lines.append("")
+        lines.append("Series per job (Prometheus):")
+        for job, count in sorted(analysis.jobs.items(), key=lambda item: -item[1]):
+            lines.append(f"  {job:<32} {count:>9,}")
+
+    for report in reports:
+        if report.top_label_values:
+            pairs = ", ".join(
+                f"{label}={value[:40]} ({count:,})"
+                for label, value, count in report.top_label_values[:top]
+            )
+            lines.append(f"🔝 {report.source}: {pairs}")
+
+    for name, (previous, current) in analysis.grown.items():
+        lines.append(f"📈 {name}: cardinality grew {previous:,} → {current:,} series")
+    for name, error in analysis.errors.items():
+        lines.append(f"❌ {name}: {error[:100]}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the analysis against the local stack and print the report."""
+    parser = argparse.ArgumentParser(description="Analyse series cardinality")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument(
+        "--growth-threshold", type=float, default=DEFAULT_GROWTH_THRESHOLD
+    )
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    args = parser.parse_args(argv)
+
+    analysis = analyze_cardinality(
+        args.prometheus_url,
+        host=args.host,
+        top=args.top,
+        baseline_path=args.baseline,
+        growth_threshold=args.growth_threshold,
+    )
+    print(format_cardinality_report(analysis, top=args.top))
+
+
+if __name__ == "__main__":
+    main()
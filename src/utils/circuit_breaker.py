@@ -0,0 +1,155 @@
+"""
+Per-host circuit breaker shared by the probe utilities.
+
+When a service is down every probe against it would otherwise wait for its
+own connect/read timeout. The breaker for a host opens after
+``failure_threshold`` consecutive hard failures (one by default) (connection errors and
+timeouts, not HTTP error statuses); while open, calls fail immediately with
+``CircuitOpenError``. After ``cooldown`` seconds a single trial call is let
+through (half-open) and its outcome closes or re-opens the circuit.
+
+Every probe utility creates its sessions with ``breakers=CIRCUIT_BREAKERS``;
+load generators and readiness waits leave ``breakers`` unset and never fail
+fast.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv("PROBE_CIRCUIT_FAILURE_THRESHOLD", "1"))
+DEFAULT_COOLDOWN = float(os.getenv("PROBE_CIRCUIT_COOLDOWN", "30"))
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of issuing a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"circuit open for {host} (retry in {retry_in:.1f}s)")
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state machine for a single host."""
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Return the current state, moving open circuits to half-open."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == STATE_OPEN
+            and self._clock() - self._opened_at >= self.cooldown
+        ):
+            self._state = STATE_HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                trial call already in flight
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return
+            if state == STATE_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_in = max(0.0, self.cooldown - (self._clock() - self._opened_at))
+            raise CircuitOpenError(self.host, retry_in)
+
+    def record_success(self) -> None:
+        """Close the circuit after a call reached the host."""
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Let another half-open trial through after a call without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a hard failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == STATE_HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = STATE_OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """Thread-safe map of host to ``CircuitBreaker``."""
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        """Return the breaker for ``host`` (``hostname:port``), creating it."""
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host, self.failure_threshold, self.cooldown)
+                self._breakers[host] = breaker
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        """Return the current state of every known host."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.host: breaker.state for breaker in breakers}
+
+    def reset(self, host: Optional[str] = None) -> None:
+        """Forget one host's breaker, or all of them."""
+        with self._lock:
+            if host is None:
+                self._breakers.clear()
+            else:
+                self._breakers.pop(host, None)
+
+
+CIRCUIT_BREAKERS = CircuitBreakerRegistry()
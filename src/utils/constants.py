@@ -1,5 +1,7 @@
 """Constants used across the application."""
 
+from typing import Any, Dict
+
 # Container names
 CONTAINERS = [
     "infra-default-mongo",
@@ -58,10 +60,95 @@ WEB_SERVICES = {
     },
 }
 
-# Metrics exporter configurations
-METRICS_EXPORTERS = {
-    "node-exporter": {"port": 9100, "url": "http://localhost:9100/metrics"},
-    "cadvisor": {"port": 8080, "url": "http://localhost:8080/metrics"},
+# Metrics exporter configurations (the exporter jobs in prometheus.yml)
+# required_families: family name prefixes a healthy scrape must contain;
+# streamed scrapes stop reading once all of them have been seen
+METRICS_EXPORTERS: Dict[str, Dict[str, Any]] = {
+    "node-exporter": {
+        "port": 9100,
+        "url": "http://localhost:9100/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["node_cpu", "node_memory", "node_filesystem"],
+    },
+    "cadvisor": {
+        "port": 8080,
+        "url": "http://localhost:8080/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["container_cpu", "container_memory"],
+    },
+    "mongodb-exporter": {
+        "port": 9216,
+        "url": "http://localhost:9216/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["mongodb_"],
+    },
+    "postgres-exporter": {
+        "port": 9187,
+        "url": "http://localhost:9187/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["pg_up", "pg_stat"],
+    },
+    "mysql-exporter": {
+        "port": 9104,
+        "url": "http://localhost:9104/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["mysql_up"],
+    },
+    "redis-exporter": {
+        "port": 9121,
+        "url": "http://localhost:9121/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["redis_up"],
+    },
+    "rabbitmq-exporter": {
+        "port": 9419,
+        "url": "http://localhost:9419/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["rabbitmq_up"],
+    },
+    "blackbox-exporter": {
+        "port": 9115,
+        "url": "http://localhost:9115/metrics",
+        "endpoint": "/metrics",
+        "expected_status": 200,
+        "required_families": ["blackbox_exporter_"],
+    },
+}
+
+# Blackbox probe targets, addressed on the compose network the exporter runs in
+# http: health path probed with the http module; every target gets tcp and icmp
+BLACKBOX_TARGETS: Dict[str, Dict[str, Any]] = {
+    "grafana": {"host": "infra-default-grafana", "port": 3000, "http": "/api/health"},
+    "prometheus": {
+        "host": "infra-default-prometheus",
+        "port": 9090,
+        "http": "/-/healthy",
+    },
+    "alertmanager": {
+        "host": "infra-default-alertmanager",
+        "port": 9093,
+        "http": "/-/healthy",
+    },
+    "keycloak": {"host": "infra-default-keycloak", "port": 8080, "http": "/"},
+    "sonarqube": {
+        "host": "infra-default-sonarqube",
+        "port": 9000,
+        "http": "/api/system/status",
+    },
+    "vault": {"host": "infra-default-vault", "port": 8200, "http": "/v1/sys/health"},
+    "mailhog": {"host": "infra-default-mailhog", "port": 8025, "http": "/"},
+    "rabbitmq": {"host": "infra-default-rabbitmq", "port": 15672, "http": "/"},
+    "postgres": {"host": "infra-default-postgres", "port": 5432},
+    "mysql": {"host": "infra-default-mysql", "port": 3306},
+    "mongo": {"host": "infra-default-mongo", "port": 27017},
+    "redis": {"host": "infra-default-redis", "port": 6379},
 }
 
 # Security service configurations
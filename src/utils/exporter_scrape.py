@@ -0,0 +1,251 @@
+"""
+Streamed scraping of Prometheus exporters.
+
+``scrape_exporter`` requests an exporter's metrics with gzip allowed, feeds
+the body to the exposition parser chunk by chunk as it arrives and can stop
+reading as soon as the metric families a test needs have been seen, so a
+multi-megabyte cadvisor or node-exporter body is neither buffered nor, in
+the common case, fully downloaded. ``scrape_exporters`` does the same for a
+whole exporter set concurrently, so validating every exporter takes as long
+as the slowest one.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import requests
+
+from src.utils.circuit_breaker import CIRCUIT_BREAKERS
+from src.utils.http_timing import TimedSession, complete_transfer
+from src.utils.prometheus_text import ExpositionError, ExpositionParser, MetricFamily
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_TIMEOUT = 15
+
+
+@dataclass
+class ScrapeResult:
+    """Outcome of a streamed exporter scrape."""
+
+    url: str
+    status_code: int
+    families: Dict[str, MetricFamily] = field(default_factory=dict)
+    samples: int = 0
+    bytes_read: int = 0
+    total_bytes: Optional[int] = None
+    compressed: bool = False
+    stopped_early: bool = False
+    missing: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    parse_time: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def read_fraction(self) -> Optional[float]:
+        """Return the fraction of the body read, when its size is known."""
+        if not self.total_bytes:
+            return None
+        return self.bytes_read / self.total_bytes
+
+    def describe(self) -> str:
+        """Return a one-line summary of what was read."""
+        total = f"{self.total_bytes:,}" if self.total_bytes is not None else "?"
+        encoding = " gzip" if self.compressed else ""
+        early = ", stopped early" if self.stopped_early else ""
+        return (
+            f"{self.bytes_read:,}/{total} bytes{encoding}{early}, "
+            f"{len(self.families)} families, {self.samples} samples"
+        )
+
+
+def scrape_exporter(
+    session: requests.Session,
+    url: str,
+    required: Iterable[str] = (),
+    max_samples: Optional[int] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    chunk_size: int = CHUNK_SIZE,
+    stop_early: bool = True,
+    keep_samples: bool = False,
+) -> ScrapeResult:
+    """
+    Scrape an exporter, parsing the body while it streams in.
+
+    Args:
+        session: Session used for the request (a ``TimedSession`` records
+            phase timings, including partial transfers)
+        url: Exporter metrics URL
+        required: Family name prefixes (``node_cpu``, ``container_memory``);
+            reading stops once a sample of each has been parsed
+        max_samples: Also stop once this many samples have been parsed
+        timeout: Request timeout in seconds
+        chunk_size: Decoded chunk size fed to the parser
+        stop_early: Set to False to read the whole body even once
+            ``required``/``max_samples`` are satisfied
+        keep_samples: Keep every parsed sample on its family (for label
+            analysis); off by default so large bodies are not held in memory
+
+    Returns:
+        ScrapeResult with parsed families, wire bytes read versus the total
+        (``Content-Length``, or the bytes read when the body was consumed),
+        and the required prefixes that were never seen
+
+    Raises:
+        requests.RequestException: On connection errors
+        ExpositionError: If the body is not valid exposition format
+    """
+    started = time.perf_counter()
+    response = session.get(
+        url,
+        timeout=timeout,
+        stream=True,
+        headers={"Accept-Encoding": "gzip", "Accept": "text/plain;version=0.0.4"},
+    )
+    result = ScrapeResult(url=url, status_code=response.status_code)
+    remaining = list(dict.fromkeys(required))
+    parser = ExpositionParser(keep_samples=keep_samples)
+    seen_families = set()
+
+    try:
+        if response.status_code != 200:
+            result.missing = remaining
+            return result
+
+        result.compressed = response.headers.get("Content-Encoding") == "gzip"
+        length = response.headers.get("Content-Length")
+        result.total_bytes = int(length) if length is not None else None
+        wants_early_stop = stop_early and (bool(remaining) or max_samples is not None)
+
+        for chunk in response.iter_content(chunk_size):
+            parse_started = time.perf_counter()
+            samples = parser.feed(chunk)
+            result.samples += len(samples)
+            for sample in samples:
+                if sample.family not in seen_families:
+                    seen_families.add(sample.family)
+                    remaining = [
+                        prefix
+                        for prefix in remaining
+                        if not sample.family.startswith(prefix)
+                    ]
+            result.parse_time += time.perf_counter() - parse_started
+
+            if wants_early_stop and not remaining:
+                if max_samples is None or result.samples >= max_samples:
+                    result.stopped_early = True
+                    break
+        else:
+            parse_started = time.perf_counter()
+            result.samples += len(parser.close())
+            result.parse_time += time.perf_counter() - parse_started
+
+        # Wire bytes, i.e. compressed bytes for gzip bodies
+        result.bytes_read = response.raw.tell()
+        if not result.stopped_early and result.total_bytes is None:
+            result.total_bytes = result.bytes_read
+        result.families = parser.families
+        result.missing = remaining
+        complete_transfer(response, result.bytes_read)
+    finally:
+        response.close()
+        result.duration = time.perf_counter() - started
+
+    return result
+
+
+def scrape_exporters(
+    exporters: Mapping[str, Mapping[str, Any]],
+    host: str = "localhost",
+    early_stop: bool = True,
+    session: Optional[requests.Session] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    keep_samples: bool = False,
+) -> Dict[str, ScrapeResult]:
+    """
+    Scrape a set of exporters concurrently.
+
+    Args:
+        exporters: Exporter name to config with ``port``, ``endpoint`` and
+            optional ``required_families`` (see ``METRICS_EXPORTERS``)
+        host: Host the exporter ports are published on
+        early_stop: Stop each scrape once its required families are seen;
+            pass False to download and parse whole bodies (missing families
+            are reported either way)
+        session: Session to share; a ``TimedSession`` sized for the set is
+            created when omitted
+        timeout: Per-request timeout in seconds
+        keep_samples: Keep parsed samples on each result's families
+
+    Returns:
+        ScrapeResult per exporter, in input order; connection and format
+        failures are reported in ``error`` instead of raised
+    """
+    owned = session is None
+    session = session or TimedSession(
+        pool_maxsize=max(1, len(exporters)), breakers=CIRCUIT_BREAKERS
+    )
+
+    def scrape(config: Mapping[str, Any]) -> ScrapeResult:
+        url = f"http://{host}:{config['port']}{config.get('endpoint', '/metrics')}"
+        required = config.get("required_families", [])
+        started = time.perf_counter()
+        try:
+            return scrape_exporter(
+                session,
+                url,
+                required,
+                timeout=timeout,
+                stop_early=early_stop,
+                keep_samples=keep_samples,
+            )
+        except (requests.RequestException, ExpositionError) as e:
+            return ScrapeResult(
+                url=url,
+                status_code=0,
+                missing=list(required),
+                duration=time.perf_counter() - started,
+                error=f"{type(e).__name__}: {e}",
+            )
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, len(exporters))) as executor:
+            futures = {
+                name: executor.submit(scrape, config)
+                for name, config in exporters.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
+    finally:
+        if owned:
+            session.close()
+
+
+def format_scrape_report(results: Mapping[str, ScrapeResult]) -> str:
+    """
+    Render per-exporter scrape results as a text table.
+
+    Returns:
+        Table with status, scrape duration, bytes read versus payload size,
+        sample count and parse time per exporter
+    """
+    header = (
+        f"{'exporter':<20} {'status':>6} {'scrape ms':>10} {'bytes read':>12} "
+        f"{'payload':>12} {'samples':>8} {'parse ms':>9}"
+    )
+    lines = ["📥 Exporter scrapes", header, "-" * len(header)]
+
+    for name, result in results.items():
+        status = str(result.status_code) if not result.error else "ERR"
+        total = f"{result.total_bytes:,}" if result.total_bytes is not None else "?"
+        lines.append(
+            f"{name[:20]:<20} {status:>6} {result.duration * 1000:>10.1f} "
+            f"{result.bytes_read:>12,} {total:>12} {result.samples:>8} "
+            f"{result.parse_time * 1000:>9.1f}"
+        )
+        if result.error:
+            lines.append(f"{'':<20} ↳ {result.error[:100]}")
+
+    slowest = max((result.duration for result in results.values()), default=0.0)
+    lines.append(f"Wall time bounded by slowest exporter: {slowest * 1000:.1f} ms")
+    return "\n".join(lines)
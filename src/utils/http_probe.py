@@ -0,0 +1,173 @@
+"""
+Bounded-read HTTP probing for heavy endpoints.
+
+Many health probes only need a status code, a few headers or one JSON field,
+yet the endpoints they hit (SonarQube web service listings, MailHog message
+dumps, Prometheus target lists) can return megabytes. A ``ProbeSpec`` declares
+what a probe actually needs and ``fetch_probe`` picks the cheapest way to get
+it: ``HEAD`` for status/headers, or a streamed ``GET`` that stops reading as
+soon as enough of the body (or the requested JSON value) has arrived.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+
+from src.utils.http_timing import complete_transfer
+from src.utils.json_stream import JsonStreamError, iter_json_path
+
+READ_STATUS = "status"
+READ_HEADERS = "headers"
+READ_BYTES = "bytes"
+READ_JSON = "json"
+
+DEFAULT_MAX_BYTES = 64 * 1024
+CHUNK_SIZE = 8 * 1024
+
+# Servers that do not route HEAD answer with one of these; retry with GET
+HEAD_UNSUPPORTED_STATUSES = {404, 405, 501}
+
+
+class ProbeError(Exception):
+    """Raised when a probe response cannot satisfy its ``ProbeSpec``."""
+
+
+@dataclass(frozen=True)
+class ProbeSpec:
+    """
+    Declaration of what a probe needs from an endpoint.
+
+    Attributes:
+        path: Endpoint path, appended to the service base URL
+        read: One of ``READ_STATUS``, ``READ_HEADERS``, ``READ_BYTES`` or
+            ``READ_JSON``
+        max_bytes: Upper bound on body bytes read for ``READ_BYTES``/``READ_JSON``
+        json_path: Dotted path of the value to extract for ``READ_JSON``; the
+            body is parsed incrementally and reading stops at the first match
+        params: Query parameters, typically used to request a small page
+    """
+
+    path: str
+    read: str = READ_STATUS
+    max_bytes: int = DEFAULT_MAX_BYTES
+    json_path: Optional[str] = None
+    params: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of a bounded probe request."""
+
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes = b""
+    value: Any = None
+    bytes_read: int = 0
+    truncated: bool = False
+
+
+class _BoundedChunks:
+    """Chunk iterator that stops once ``max_bytes`` have been read."""
+
+    def __init__(self, response: requests.Response, max_bytes: int) -> None:
+        self.bytes_read = 0
+        self.truncated = False
+        self._response = response
+        self._max_bytes = max_bytes
+
+    def __iter__(self) -> Iterator[bytes]:
+        chunk_size = min(CHUNK_SIZE, self._max_bytes)
+        for chunk in self._response.iter_content(chunk_size=chunk_size):
+            if self.bytes_read + len(chunk) > self._max_bytes:
+                chunk = chunk[: self._max_bytes - self.bytes_read]
+                self.truncated = True
+            self.bytes_read += len(chunk)
+            yield chunk
+            if self.truncated:
+                return
+
+
+def _read_bounded(response: requests.Response, max_bytes: int) -> ProbeResult:
+    """Read at most ``max_bytes`` of a streamed response body."""
+    chunks = _BoundedChunks(response, max_bytes)
+    body = b"".join(chunks)
+    return ProbeResult(
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        body=body,
+        bytes_read=chunks.bytes_read,
+        truncated=chunks.truncated,
+    )
+
+
+def _read_json_path(response: requests.Response, spec: ProbeSpec) -> ProbeResult:
+    """Stream the body only until the first value at ``spec.json_path``."""
+    chunks = _BoundedChunks(response, spec.max_bytes)
+    result = ProbeResult(response.status_code, dict(response.headers))
+
+    try:
+        for value in iter_json_path(chunks, spec.json_path or ""):
+            result.value = value
+            break
+        else:
+            raise ProbeError(f"JSON path '{spec.json_path}' not found")
+    except JsonStreamError as e:
+        if chunks.truncated:
+            raise ProbeError(
+                f"JSON path '{spec.json_path}' not found in the first "
+                f"{spec.max_bytes} bytes; narrow the response with spec.params"
+            )
+        raise ProbeError(f"Invalid JSON response: {e}")
+    finally:
+        result.bytes_read = chunks.bytes_read
+
+    return result
+
+
+def fetch_probe(
+    session: requests.Session,
+    base_url: str,
+    spec: ProbeSpec,
+    timeout: float = 10,
+    **kwargs: Any,
+) -> ProbeResult:
+    """
+    Execute a probe reading only what its spec declares.
+
+    Args:
+        session: Session used to issue the request (usually a ``TimedSession``)
+        base_url: Service base URL
+        spec: Probe declaration
+        timeout: Request timeout in seconds
+        **kwargs: Extra arguments forwarded to ``session.request``
+
+    Returns:
+        ProbeResult with status, headers and, when requested, the bounded
+        body or extracted JSON value
+
+    Raises:
+        RequestException: If the request fails
+        ProbeError: If a JSON probe's path is not found within ``max_bytes``
+    """
+    url = f"{base_url}{spec.path}"
+    params = spec.params or None
+
+    if spec.read in (READ_STATUS, READ_HEADERS):
+        response = session.head(url, params=params, timeout=timeout, **kwargs)
+        if response.status_code not in HEAD_UNSUPPORTED_STATUSES:
+            return ProbeResult(response.status_code, dict(response.headers))
+
+    response = session.get(url, params=params, timeout=timeout, stream=True, **kwargs)
+    with response:
+        if spec.read in (READ_STATUS, READ_HEADERS):
+            complete_transfer(response, 0)
+            return ProbeResult(response.status_code, dict(response.headers))
+
+        if spec.read == READ_JSON and response.status_code == 200:
+            result = _read_json_path(response, spec)
+        else:
+            result = _read_bounded(response, spec.max_bytes)
+        complete_transfer(response, result.bytes_read)
+
+    return result
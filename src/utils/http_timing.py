@@ -0,0 +1,436 @@
+"""
+Per-phase HTTP timing for infrastructure probes.
+
+This module provides a drop-in ``requests`` session that records, for every
+request, how long was spent in DNS resolution, TCP connect, TLS handshake,
+waiting for the first byte (TTFB) and transferring the body. Timings are
+aggregated per service and endpoint and can be rendered as a text report or
+as Prometheus exposition text.
+"""
+
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util import connection as urllib3_connection
+
+from src.utils.circuit_breaker import CircuitBreakerRegistry
+from src.utils.perf_stats import summarize
+
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer", "total")
+
+# Connection set-up phases are measured deep inside urllib3, so they are handed
+# back to the adapter through a thread-local slot.
+_connection_phases = threading.local()
+
+
+@dataclass
+class PhaseTimings:
+    """Timing breakdown of a single HTTP request, in seconds."""
+
+    service: str
+    endpoint: str
+    method: str
+    status_code: int = 0
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    transfer: float = 0.0
+    bytes_read: int = 0
+    error: Optional[str] = None
+    headers_received_at: float = 0.0
+
+    @property
+    def total(self) -> float:
+        """Return the end-to-end duration of the request."""
+        return self.dns + self.connect + self.tls + self.ttfb + self.transfer
+
+
+def _reset_connection_phases() -> None:
+    _connection_phases.dns = 0.0
+    _connection_phases.connect = 0.0
+    _connection_phases.tls = 0.0
+
+
+def _timed_new_conn(conn: HTTPConnection) -> socket.socket:
+    """
+    Open a socket for ``conn`` while timing DNS and TCP connect separately.
+
+    Mirrors ``HTTPConnection._new_conn`` but resolves the host explicitly so
+    both phases can be measured without resolving twice. Like urllib3's
+    ``create_connection``, every resolved address is tried in order (e.g.
+    ``::1`` then ``127.0.0.1``) within ``allowed_gai_family``; the connect
+    phase is the attempt that succeeded.
+    """
+    started = time.perf_counter()
+    try:
+        address_info = socket.getaddrinfo(
+            conn._dns_host.strip("[]"),
+            conn.port,
+            urllib3_connection.allowed_gai_family(),
+            socket.SOCK_STREAM,
+        )
+    except socket.gaierror as e:
+        raise NewConnectionError(conn, f"Failed to resolve '{conn.host}': {e}") from e
+    _connection_phases.dns = time.perf_counter() - started
+
+    error: Optional[OSError] = None
+    for *_, address in address_info:
+        attempt = time.perf_counter()
+        try:
+            sock = urllib3_connection.create_connection(
+                (str(address[0]), conn.port),
+                conn.timeout,
+                source_address=conn.source_address,
+                socket_options=conn.socket_options,
+            )
+        except OSError as e:
+            error = e
+            continue
+        _connection_phases.connect = time.perf_counter() - attempt
+        return sock
+
+    if isinstance(error, socket.timeout):
+        raise ConnectTimeoutError(
+            conn,
+            f"Connection to {conn.host} timed out. (connect timeout={conn.timeout})",
+        ) from error
+    raise NewConnectionError(
+        conn, f"Failed to establish a new connection: {error}"
+    ) from error
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self) -> socket.socket:
+        return _timed_new_conn(self)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self) -> socket.socket:
+        return _timed_new_conn(self)
+
+    def connect(self) -> None:
+        started = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - started
+        _connection_phases.tls = max(
+            0.0, elapsed - _connection_phases.dns - _connection_phases.connect
+        )
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingRecorder:
+    """Thread-safe collector and aggregator of ``PhaseTimings`` entries."""
+
+    def __init__(self) -> None:
+        self._entries: List[PhaseTimings] = []
+        self._lock = threading.Lock()
+
+    def record(self, timings: PhaseTimings) -> None:
+        """Store a timing entry."""
+        with self._lock:
+            self._entries.append(timings)
+
+    def clear(self) -> None:
+        """Drop all recorded entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def entries(self) -> List[PhaseTimings]:
+        """Return a snapshot of the recorded entries."""
+        with self._lock:
+            return list(self._entries)
+
+    def summary(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Aggregate recorded timings per service and endpoint.
+
+        Returns:
+            Mapping of ``(service, endpoint)`` to request/error counts and
+            per-phase summary statistics
+        """
+        grouped: Dict[Tuple[str, str], List[PhaseTimings]] = {}
+        for entry in self.entries():
+            grouped.setdefault((entry.service, entry.endpoint), []).append(entry)
+
+        summary: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for key, entries in sorted(grouped.items()):
+            summary[key] = {
+                "requests": len(entries),
+                "errors": sum(1 for entry in entries if entry.error),
+                "bytes_read": sum(entry.bytes_read for entry in entries),
+                "phases": {
+                    phase: summarize(getattr(entry, phase) for entry in entries)
+                    for phase in PHASES
+                },
+            }
+        return summary
+
+    def format_report(self) -> str:
+        """
+        Render the aggregated timings as a human-readable table.
+
+        Returns:
+            Report text with mean/p95 milliseconds per phase
+        """
+        header = f"{'service':<18} {'endpoint':<42} {'n':>4} " + " ".join(
+            f"{phase:>14}" for phase in PHASES
+        )
+        lines = ["📊 HTTP phase timings (mean/p95 ms)", header, "-" * len(header)]
+
+        for (service, endpoint), data in self.summary().items():
+            cells = " ".join(
+                f"{data['phases'][phase]['mean'] * 1000:>6.1f}/"
+                f"{data['phases'][phase]['p95'] * 1000:<7.1f}"
+                for phase in PHASES
+            )
+            lines.append(
+                f"{service:<18} {endpoint[:42]:<42} {data['requests']:>4} {cells}"
+            )
+
+        return "\n".join(lines)
+
+    def to_prometheus_text(self) -> str:
+        """
+        Render the aggregated timings in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text with a ``probe_http_phase_seconds`` summary and a
+            ``probe_http_requests_total``/``probe_http_errors_total`` pair
+        """
+        lines = [
+            "# HELP probe_http_phase_seconds Per-phase duration of probe HTTP requests.",
+            "# TYPE probe_http_phase_seconds summary",
+        ]
+        counters = [
+            "# HELP probe_http_requests_total Probe HTTP requests issued.",
+            "# TYPE probe_http_requests_total counter",
+        ]
+        errors = [
+            "# HELP probe_http_errors_total Probe HTTP requests that failed.",
+            "# TYPE probe_http_errors_total counter",
+        ]
+
+        for (service, endpoint), data in self.summary().items():
+            base = f'service="{_escape(service)}",endpoint="{_escape(endpoint)}"'
+            for phase in PHASES:
+                stats = data["phases"][phase]
+                labels = f'{base},phase="{phase}"'
+                for quantile in ("0.5", "0.9", "0.99"):
+                    value = stats[f"p{float(quantile) * 100:g}"]
+                    lines.append(
+                        f'probe_http_phase_seconds{{{labels},quantile="{quantile}"}} '
+                        f"{value:.6f}"
+                    )
+                lines.append(
+                    f"probe_http_phase_seconds_sum{{{labels}}} "
+                    f"{stats['mean'] * stats['count']:.6f}"
+                )
+                lines.append(
+                    f"probe_http_phase_seconds_count{{{labels}}} {int(stats['count'])}"
+                )
+            counters.append(f"probe_http_requests_total{{{base}}} {data['requests']}")
+            errors.append(f"probe_http_errors_total{{{base}}} {data['errors']}")
+
+        return "\n".join(lines + counters + errors) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Atomically write the metrics for node-exporter's textfile collector.
+
+        Args:
+            path: Destination ``.prom`` file
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(self.to_prometheus_text())
+        os.replace(tmp_path, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+HTTP_TIMINGS = TimingRecorder()
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter that records a ``PhaseTimings`` entry per request.
+
+    When a circuit breaker registry is given, requests to hosts whose circuit
+    is open fail immediately with ``CircuitOpenError`` and are not recorded.
+    Every call that passed the breaker settles it, whatever it raised, so a
+    half-open trial can never be left in flight.
+    """
+
+    def __init__(
+        self,
+        service: Optional[str] = None,
+        recorder: TimingRecorder = HTTP_TIMINGS,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        **kwargs: Any,
+    ) -> None:
+        self.service = service
+        self.recorder = recorder
+        self.breakers = breakers
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        url = urlsplit(request.url or "")
+        timings = PhaseTimings(
+            service=self.service or url.netloc,
+            endpoint=url.path or "/",
+            method=request.method or "GET",
+        )
+
+        breaker = self.breakers.get(url.netloc) if self.breakers else None
+        if breaker:
+            breaker.before_call()
+
+        _reset_connection_phases()
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException as e:
+            timings.error = type(e).__name__
+            if breaker:
+                # Only unreachable hosts count; other errors mean it answered
+                if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            raise
+        except BaseException as e:
+            timings.error = type(e).__name__
+            if breaker:
+                # No verdict on the host, but a half-open trial is over
+                breaker.release()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.dns = _connection_phases.dns
+            timings.connect = _connection_phases.connect
+            timings.tls = _connection_phases.tls
+            timings.ttfb = max(
+                0.0, elapsed - timings.dns - timings.connect - timings.tls
+            )
+            timings.headers_received_at = time.perf_counter()
+            self.recorder.record(timings)
+
+        if breaker:
+            breaker.record_success()
+        timings.status_code = response.status_code
+        response.timings = timings  # type: ignore[attr-defined]
+        return response
+
+
+class TimedSession(requests.Session):
+    """
+    ``requests.Session`` that records per-phase timings for every request.
+
+    Pass ``breakers=CIRCUIT_BREAKERS`` to make requests fail fast once a
+    host's circuit is open; by default no breaker is involved. Concurrent
+    callers should raise ``pool_maxsize`` to their thread count so
+    connections are reused.
+
+    Example:
+        >>> with TimedSession("keycloak") as session:
+        ...     session.get("http://localhost:8099/health", timeout=5)
+    """
+
+    def __init__(
+        self,
+        service: Optional[str] = None,
+        recorder: TimingRecorder = HTTP_TIMINGS,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+    ) -> None:
+        super().__init__()
+        self.service = service
+        self.recorder = recorder
+        adapter = TimingHTTPAdapter(
+            service=service,
+            recorder=recorder,
+            breakers=breakers,
+            pool_maxsize=pool_maxsize,
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        stream = kwargs.get("stream") or self.stream
+        kwargs["stream"] = True
+        response = super().send(request, **kwargs)
+
+        if not stream:
+            # Read the body here so transfer time is attributed to the request
+            complete_transfer(response, len(response.content))
+
+        return response
+
+
+def complete_transfer(response: requests.Response, bytes_read: int) -> None:
+    """
+    Mark the body transfer of a timed response as finished.
+
+    Streaming callers call this once they stop reading so that partial reads
+    are still attributed to the transfer phase.
+
+    Args:
+        response: Response returned by a ``TimedSession``
+        bytes_read: Number of body bytes consumed
+    """
+    timings: Optional[PhaseTimings] = getattr(response, "timings", None)
+    if timings is None:
+        return
+
+    timings.transfer = time.perf_counter() - timings.headers_received_at
+    timings.bytes_read = bytes_read
+
+
+def emit_report(recorder: TimingRecorder = HTTP_TIMINGS) -> str:
+    """
+    Build the timing report and export metrics when configured.
+
+    Metrics are written to the file named by ``PROBE_TIMINGS_TEXTFILE`` (for
+    node-exporter's textfile collector) when that variable is set.
+
+    Args:
+        recorder: Recorder to report on
+
+    Returns:
+        Human-readable report text
+    """
+    textfile = os.getenv("PROBE_TIMINGS_TEXTFILE")
+    if textfile:
+        recorder.write_textfile(textfile)
+    return recorder.format_report()
@@ -0,0 +1,286 @@
+"""
+Incremental JSON path extraction over a byte stream.
+
+``response.json()`` materialises the whole document, which is wasteful when a
+caller only wants to walk ``data.activeTargets`` of a large Prometheus target
+list or the ``items`` of a MailHog message dump. ``iter_json_path`` scans the
+raw bytes chunk by chunk, yields each value at the requested path as soon as
+it is complete and keeps only the value being captured in memory. Subtrees
+that cannot contain a match are skimmed without tokenising their contents.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Union
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(
+    r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null"
+)
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_DELIMITERS = frozenset(" \t\n\r,]}")
+_DECODER = json.JSONDecoder()
+
+_OPEN_OBJECT, _OPEN_ARRAY, _CLOSE_OBJECT, _CLOSE_ARRAY = "{", "[", "}", "]"
+_QUOTE, _COLON, _COMMA = '"', ":", ","
+
+# Parser expectations
+_VALUE, _VALUE_OR_END, _KEY, _KEY_OR_END, _COLON_NEXT, _COMMA_OR_END, _DONE = range(7)
+
+
+class JsonStreamError(ValueError):
+    """Raised when the byte stream is not valid JSON."""
+
+
+class _ChunkBuffer:
+    """Sliding window of decoded text that keeps only unconsumed characters."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.data = ""
+        self.pos = 0
+        self.mark = -1
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def more(self) -> bool:
+        """Append the next chunk, dropping text before ``pos`` (or ``mark``)."""
+        for raw in self._chunks:
+            chunk = self._utf8.decode(raw)
+            if not chunk:
+                continue
+            keep = self.mark if self.mark >= 0 else self.pos
+            self.data = self.data[keep:] + chunk
+            self.pos -= keep
+            if self.mark >= 0:
+                self.mark = 0
+            return True
+        return False
+
+
+def _parse_path(path: str) -> List[str]:
+    return [part for part in path.split(".") if part] if path else []
+
+
+def _key_matches(pattern: str, key: Union[str, int]) -> bool:
+    return pattern == "*" or pattern == (key if isinstance(key, str) else str(key))
+
+
+def iter_json_path(chunks: Iterable[bytes], path: str) -> Iterator[Any]:
+    """
+    Yield every value found at ``path`` while reading JSON incrementally.
+
+    Args:
+        chunks: Iterable of raw JSON byte chunks (any chunk boundaries)
+        path: Dotted path; ``*`` matches any object key or array index and
+            numbers address array items, e.g. ``data.activeTargets.*``
+
+    Yields:
+        Decoded values at the path, in document order
+
+    Raises:
+        JsonStreamError: If the stream is not valid JSON
+    """
+    target = _parse_path(path)
+    target_depth = len(target)
+    buffer = _ChunkBuffer(chunks)
+    # Each frame is [key, is_array]; arrays track the current index as key
+    stack: List[List[Any]] = []
+    expect = _VALUE
+
+    while True:
+        buffer.pos = _WHITESPACE.match(buffer.data, buffer.pos).end()  # type: ignore
+        if buffer.pos >= len(buffer.data):
+            if buffer.more():
+                continue
+            if expect != _DONE:
+                raise JsonStreamError("Unexpected end of JSON stream")
+            return
+
+        data = buffer.data
+        char = data[buffer.pos]
+
+        if expect in (_VALUE, _VALUE_OR_END):
+            if char == _CLOSE_ARRAY and expect == _VALUE_OR_END:
+                stack.pop()
+                buffer.pos += 1
+                expect = _COMMA_OR_END if stack else _DONE
+                continue
+
+            depth = len(stack)
+            wanted = depth == target_depth and all(
+                _key_matches(pattern, frame[0]) for pattern, frame in zip(target, stack)
+            )
+
+            if char in (_OPEN_OBJECT, _OPEN_ARRAY):
+                prefix = depth < target_depth and all(
+                    _key_matches(pattern, frame[0])
+                    for pattern, frame in zip(target, stack)
+                )
+                if prefix:
+                    stack.append(
+                        [0 if char == _OPEN_ARRAY else None, char == _OPEN_ARRAY]
+                    )
+                    buffer.pos += 1
+                    expect = _VALUE_OR_END if char == _OPEN_ARRAY else _KEY_OR_END
+                    continue
+
+                if wanted:
+                    yield _capture_container(buffer)
+                else:
+                    buffer.pos = _skim_container(buffer)
+                expect = _COMMA_OR_END if stack else _DONE
+                continue
+
+            if char == _QUOTE:
+                match = _STRING.match(data, buffer.pos)
+            else:
+                match = _SCALAR.match(data, buffer.pos)
+                if match and (
+                    match.end() == len(data) or data[match.end()] not in _DELIMITERS
+                ):
+                    match = None  # e.g. "-25" + ".0e3" split across chunks
+            if match is None:
+                if buffer.more():
+                    continue
+                match = _SCALAR.match(buffer.data, buffer.pos)
+                if match is None:
+                    raise JsonStreamError(f"Invalid JSON value at offset {buffer.pos}")
+
+            if wanted:
+                yield _decode(buffer.data[buffer.pos : match.end()])
+            buffer.pos = match.end()
+            expect = _COMMA_OR_END if stack else _DONE
+
+        elif expect in (_KEY, _KEY_OR_END):
+            if char == _CLOSE_OBJECT and expect == _KEY_OR_END:
+                stack.pop()
+                buffer.pos += 1
+                expect = _COMMA_OR_END if stack else _DONE
+                continue
+            if char != _QUOTE:
+                raise JsonStreamError(f"Expected object key at offset {buffer.pos}")
+            match = _STRING.match(data, buffer.pos)
+            if match is None:
+                if not buffer.more():
+                    raise JsonStreamError("Unterminated object key")
+                continue
+            raw_key = match.group()
+            stack[-1][0] = json.loads(raw_key) if "\\" in raw_key else raw_key[1:-1]
+            buffer.pos = match.end()
+            expect = _COLON_NEXT
+
+        elif expect == _COLON_NEXT:
+            if char != _COLON:
+                raise JsonStreamError(f"Expected ':' at offset {buffer.pos}")
+            buffer.pos += 1
+            expect = _VALUE
+
+        elif expect == _COMMA_OR_END:
+            buffer.pos += 1
+            frame = stack[-1]
+            if char == _COMMA:
+                if frame[1]:
+                    frame[0] += 1
+                    expect = _VALUE
+                else:
+                    expect = _KEY
+            elif char == (_CLOSE_ARRAY if frame[1] else _CLOSE_OBJECT):
+                stack.pop()
+                expect = _COMMA_OR_END if stack else _DONE
+            else:
+                raise JsonStreamError(f"Unexpected byte at offset {buffer.pos - 1}")
+
+        else:
+            raise JsonStreamError(f"Trailing data at offset {buffer.pos}")
+
+
+def _skim_container(buffer: _ChunkBuffer) -> int:
+    """
+    Skip over the object or array starting at ``buffer.pos``.
+
+    Only brackets and strings are inspected, so large subtrees are passed over
+    at regex speed. Returns the offset just past the closing bracket; the
+    buffer may have been refilled (and shifted) in the meantime.
+    """
+    level = 1
+    buffer.pos += 1
+
+    while True:
+        match = _STRUCTURE.search(buffer.data, buffer.pos)
+        if match is None:
+            buffer.pos = len(buffer.data)
+            if not buffer.more():
+                raise JsonStreamError("Unexpected end of JSON stream")
+            continue
+
+        char = buffer.data[match.start()]
+        if char == _QUOTE:
+            tail = _STRING_TAIL.match(buffer.data, match.start() + 1)
+            if tail is None:
+                buffer.pos = match.start()
+                if not buffer.more():
+                    raise JsonStreamError("Unterminated string")
+                continue
+            buffer.pos = tail.end()
+        elif char in (_OPEN_OBJECT, _OPEN_ARRAY):
+            level += 1
+            buffer.pos = match.end()
+        else:
+            level -= 1
+            buffer.pos = match.end()
+            if level == 0:
+                return buffer.pos
+
+
+def _capture_container(buffer: _ChunkBuffer) -> Any:
+    """Decode the object or array at ``buffer.pos`` and move past it."""
+    try:
+        # Fast path: the whole value is already buffered
+        value, buffer.pos = _DECODER.raw_decode(buffer.data, buffer.pos)
+        return value
+    except ValueError:
+        pass
+
+    buffer.mark = buffer.pos
+    end = _skim_container(buffer)
+    value = _decode(buffer.data[buffer.mark : end])
+    buffer.mark = -1
+    buffer.pos = end
+    return value
+
+
+def _decode(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise JsonStreamError(f"Invalid JSON value: {e}")
+
+
+def iter_response_json_path(
+    response: requests.Response, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Stream values at ``path`` out of a ``stream=True`` response.
+
+    The response is closed when the iterator is exhausted or closed, so a
+    caller that breaks out early does not download the rest of the body.
+
+    Args:
+        response: Response obtained with ``stream=True``
+        path: Dotted JSON path, see ``iter_json_path``
+        chunk_size: Bytes per read
+
+    Yields:
+        Decoded values at the path
+    """
+    try:
+        yield from iter_json_path(response.iter_content(chunk_size=chunk_size), path)
+    finally:
+        response.close()
@@ -0,0 +1,314 @@
+"""
+Keycloak token endpoint throughput benchmark.
+
+Drives ``/realms/<realm>/protocol/openid-connect/token`` with the
+client-credentials and password grants at several concurrency levels and
+compares how services could obtain and validate tokens:
+
+- ``fresh``: request a new token for every call
+- ``cached``: reuse a token until it is close to expiry
+- ``jwks``: cached token verified locally against a cached JWKS
+- ``introspect``: cached token validated remotely via token introspection
+
+Configuration comes from the environment:
+
+- ``KEYCLOAK_URL`` (default ``http://localhost:8099``), ``KEYCLOAK_REALM``
+  (default ``master``) and ``KEYCLOAK_BASE_PATH`` (``/auth`` for legacy
+  distributions)
+- ``KEYCLOAK_CLIENT_ID``/``KEYCLOAK_CLIENT_SECRET`` for the client-credentials
+  grant and introspection
+- ``KEYCLOAK_ADMIN``/``KEYCLOAK_ADMIN_PASSWORD`` for the password grant, via
+  ``KEYCLOAK_PASSWORD_CLIENT_ID`` (default ``admin-cli``)
+
+Usage:
+    python -m src.utils.keycloak_benchmark --concurrency 1,8,32 --duration 10
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import jwt
+from dotenv import load_dotenv  # type: ignore[import-untyped]
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.load_testing import LoadResult, format_load_table, run_load
+
+load_dotenv()
+
+MODES = ("fresh", "cached", "jwks", "introspect")
+DEFAULT_CONCURRENCY = (1, 4, 16)
+DEFAULT_DURATION = 10.0
+DEFAULT_TIMEOUT = 10
+# Refresh cached tokens this many seconds before they expire
+REFRESH_MARGIN = 30.0
+
+
+class KeycloakBenchmarkError(Exception):
+    """Custom exception for Keycloak benchmark failures."""
+
+
+class KeycloakTokenClient:
+    """Thin client for the realm's OpenID Connect token endpoints."""
+
+    def __init__(
+        self,
+        base_url: str,
+        realm: str = "master",
+        base_path: str = "",
+        session: Optional[TimedSession] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> None:
+        oidc = f"{base_url}{base_path}/realms/{realm}/protocol/openid-connect"
+        self.token_url = f"{oidc}/token"
+        self.introspect_url = f"{oidc}/token/introspect"
+        self.certs_url = f"{oidc}/certs"
+        self.session = session or TimedSession("keycloak", recorder=TimingRecorder())
+        self.timeout = timeout
+        self.token_requests = 0
+        self._lock = threading.Lock()
+
+    def request_token(self, grant: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Request a new token from the token endpoint.
+
+        Args:
+            grant: Form fields, including ``grant_type``
+
+        Returns:
+            Token response document
+
+        Raises:
+            KeycloakBenchmarkError: If Keycloak does not issue a token
+        """
+        with self._lock:
+            self.token_requests += 1
+        response = self.session.post(self.token_url, data=grant, timeout=self.timeout)
+        if response.status_code != 200:
+            raise KeycloakBenchmarkError(
+                f"Token request failed: HTTP {response.status_code} {response.text[:200]}"
+            )
+        return response.json()
+
+    def introspect(self, token: str, client_id: str, client_secret: str) -> bool:
+        """
+        Validate a token remotely via the introspection endpoint.
+
+        Returns:
+            True if Keycloak reports the token as active
+
+        Raises:
+            KeycloakBenchmarkError: If the introspection call fails
+        """
+        response = self.session.post(
+            self.introspect_url,
+            data={"token": token},
+            auth=(client_id, client_secret),
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise KeycloakBenchmarkError(
+                f"Introspection failed: HTTP {response.status_code}"
+            )
+        active = response.json().get("active", False)
+        if not active:
+            raise KeycloakBenchmarkError("Introspection reported an inactive token")
+        return True
+
+
+class TokenCache:
+    """Thread-safe single token cache that refreshes close to expiry."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Dict[str, Any]],
+        refresh_margin: float = REFRESH_MARGIN,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._refresh_at = 0.0
+
+    def get(self) -> str:
+        """Return a cached access token, fetching a new one when needed."""
+        with self._lock:
+            if self._token is None or self._clock() >= self._refresh_at:
+                document = self._fetch()
+                lifetime = float(document.get("expires_in", 60))
+                # Short-lived tokens refresh at half-life instead of going stale
+                margin = min(self._refresh_margin, lifetime / 2)
+                self._token = document["access_token"]
+                self._refresh_at = self._clock() + lifetime - margin
+            return self._token
+
+
+class JwksVerifier:
+    """Local JWT signature verification against a cached JWKS."""
+
+    def __init__(self, certs_url: str) -> None:
+        self._client = jwt.PyJWKClient(certs_url, cache_keys=True)
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token's signature and expiry without calling Keycloak.
+
+        Returns:
+            Decoded token claims
+        """
+        signing_key = self._client.get_signing_key_from_jwt(token)
+        return jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=["RS256", "RS384", "RS512", "ES256", "PS256"],
+            options={"verify_aud": False},
+        )
+
+
+def configured_grants() -> Dict[str, Dict[str, str]]:
+    """
+    Build the grants that can be exercised with the current environment.
+
+    Returns:
+        Mapping of grant name to token request form fields
+    """
+    grants = {}
+
+    client_id = os.getenv("KEYCLOAK_CLIENT_ID")
+    client_secret = os.getenv("KEYCLOAK_CLIENT_SECRET")
+    if client_id and client_secret:
+        grants["client_credentials"] = {
+            "grant_type": "client_credentials",
+            "client_id": client_id,
+            "client_secret": client_secret,
+        }
+
+    username = os.getenv("KEYCLOAK_ADMIN")
+    password = os.getenv("KEYCLOAK_ADMIN_PASSWORD")
+    if username and password:
+        grants["password"] = {
+            "grant_type": "password",
+            "client_id": os.getenv("KEYCLOAK_PASSWORD_CLIENT_ID", "admin-cli"),
+            "username": username,
+            "password": password,
+        }
+
+    return grants
+
+
+def _mode_operation(
+    mode: str, client: KeycloakTokenClient, grant: Dict[str, str]
+) -> Optional[Callable[[int], Any]]:
+    """Build the per-call operation for a mode, or None if it cannot run."""
+    if mode == "fresh":
+        return lambda _: client.request_token(grant)
+
+    cache = TokenCache(lambda: client.request_token(grant))
+    if mode == "cached":
+        return lambda _: cache.get()
+
+    if mode == "jwks":
+        verifier = JwksVerifier(client.certs_url)
+        verifier.verify(cache.get())  # warm the JWKS cache outside the run
+        return lambda _: verifier.verify(cache.get())
+
+    if mode == "introspect":
+        client_id = os.getenv("KEYCLOAK_CLIENT_ID")
+        client_secret = os.getenv("KEYCLOAK_CLIENT_SECRET")
+        if not (client_id and client_secret):
+            return None
+        return lambda _: client.introspect(cache.get(), client_id, client_secret)
+
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def benchmark_keycloak_tokens(
+    base_url: Optional[str] = None,
+    realm: Optional[str] = None,
+    grants: Optional[Dict[str, Dict[str, str]]] = None,
+    modes: Sequence[str] = MODES,
+    concurrency_levels: Sequence[int] = DEFAULT_CONCURRENCY,
+    duration: float = DEFAULT_DURATION,
+) -> List[LoadResult]:
+    """
+    Benchmark token issuance and validation modes at several concurrencies.
+
+    Args:
+        base_url: Keycloak URL (defaults to ``KEYCLOAK_URL``)
+        realm: Realm name (defaults to ``KEYCLOAK_REALM``)
+        grants: Grants to exercise (defaults to ``configured_grants()``)
+        modes: Modes to compare, see module docstring
+        concurrency_levels: Worker counts to sweep
+        duration: Seconds per scenario
+
+    Returns:
+        One LoadResult per grant/mode/concurrency, labelled with the number
+        of token endpoint requests actually issued
+
+    Raises:
+        KeycloakBenchmarkError: If no grant is configured
+    """
+    base_url = base_url or os.getenv("KEYCLOAK_URL") or "http://localhost:8099"
+    realm = realm or os.getenv("KEYCLOAK_REALM") or "master"
+    grants = grants if grants is not None else configured_grants()
+    if not grants:
+        raise KeycloakBenchmarkError(
+            "No grant configured: set KEYCLOAK_CLIENT_ID/KEYCLOAK_CLIENT_SECRET "
+            "or KEYCLOAK_ADMIN/KEYCLOAK_ADMIN_PASSWORD"
+        )
+
+    results = []
+    for grant_name, grant in grants.items():
+        for mode in modes:
+            for concurrency in concurrency_levels:
+                with TimedSession(
+                    "keycloak", recorder=TimingRecorder(), pool_maxsize=concurrency
+                ) as session:
+                    client = KeycloakTokenClient(
+                        base_url,
+                        realm,
+                        base_path=os.getenv("KEYCLOAK_BASE_PATH", ""),
+                        session=session,
+                    )
+                    operation = _mode_operation(mode, client, grant)
+                    if operation is None:
+                        continue
+                    issued_before = client.token_requests
+                    result = run_load(
+                        operation,
+                        concurrency=concurrency,
+                        duration=duration,
+                        name="keycloak",
+                    )
+                result.labels = {
+                    "grant": grant_name,
+                    "mode": mode,
+                    "token_requests": client.token_requests - issued_before,
+                }
+                results.append(result)
+
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the benchmark from the command line and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args(argv)
+
+    results = benchmark_keycloak_tokens(
+        modes=args.modes.split(","),
+        concurrency_levels=[int(level) for level in args.concurrency.split(",")],
+        duration=args.duration,
+    )
+    print(format_load_table(results, "🔐 Keycloak token benchmark"))
+
+
+if __name__ == "__main__":
+    main()
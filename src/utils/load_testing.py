@@ -0,0 +1,184 @@
+"""
+Minimal load generator shared by the service benchmarks.
+
+``run_load`` drives an operation from a pool of worker threads, either for a
+fixed number of iterations or for a fixed duration, and collects per-call
+latencies and errors into a ``LoadResult``. Without a ``rate`` the workers
+run closed-loop (each issues its next call as soon as the previous one
+returns); with a ``rate`` calls are started on a fixed schedule, open-loop.
+"""
+
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.utils.perf_stats import summarize
+
+MAX_ERROR_SAMPLES = 5
+
+
+@dataclass
+class LoadResult:
+    """Outcome of a load run."""
+
+    name: str
+    concurrency: int
+    duration: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    error_samples: List[str] = field(default_factory=list)
+    labels: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def operations(self) -> int:
+        """Return the number of successful operations."""
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Return successful operations per second."""
+        return self.operations / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Return the fraction of attempted operations that failed."""
+        attempts = self.operations + self.errors
+        return self.errors / attempts if attempts else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the run for reports.
+
+        Returns:
+            Dictionary with labels, throughput, error rate and latency
+            percentiles in milliseconds
+        """
+        latency = summarize(self.latencies)
+        return {
+            "name": self.name,
+            **self.labels,
+            "concurrency": self.concurrency,
+            "operations": self.operations,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "throughput": round(self.throughput, 2),
+            "latency_ms": {
+                key: round(value * 1000, 3)
+                for key, value in latency.items()
+                if key != "count"
+            },
+            "error_samples": list(self.error_samples),
+        }
+
+
+def run_load(
+    operation: Callable[[int], Any],
+    concurrency: int,
+    iterations: Optional[int] = None,
+    duration: Optional[float] = None,
+    name: str = "load",
+    rate: Optional[float] = None,
+) -> LoadResult:
+    """
+    Run ``operation`` concurrently and measure it.
+
+    Args:
+        operation: Callable receiving the global iteration number; raising
+            any exception counts as an error
+        concurrency: Number of worker threads
+        iterations: Total number of calls (across all workers)
+        duration: Wall-clock limit in seconds
+        name: Label for the result
+        rate: Target calls per second across all workers. Call ``i`` is
+            due at ``i / rate`` seconds into the run and its latency is
+            measured from that due time, so queueing behind a slow target
+            shows up in the percentiles instead of silently lowering the
+            offered load
+
+    Returns:
+        LoadResult with latencies, errors and run duration
+
+    Raises:
+        ValueError: If neither ``iterations`` nor ``duration`` is given
+    """
+    if iterations is None and duration is None:
+        raise ValueError("run_load needs iterations or duration")
+
+    result = LoadResult(name=name, concurrency=concurrency)
+    counter = itertools.count()
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration if duration is not None else None
+
+    def worker() -> None:
+        while True:
+            iteration = next(counter)
+            if iterations is not None and iteration >= iterations:
+                return
+            if rate is not None:
+                call_started = started + iteration / rate
+                if deadline is not None and call_started >= deadline:
+                    return
+                time.sleep(max(0.0, call_started - time.perf_counter()))
+            else:
+                call_started = time.perf_counter()
+                if deadline is not None and call_started >= deadline:
+                    return
+
+            try:
+                operation(iteration)
+            except Exception as e:
+                with lock:
+                    result.errors += 1
+                    if len(result.error_samples) < MAX_ERROR_SAMPLES:
+                        result.error_samples.append(f"{type(e).__name__}: {e}")
+                continue
+            elapsed = time.perf_counter() - call_started
+            with lock:
+                result.latencies.append(elapsed)
+
+    threads = [
+        threading.Thread(target=worker, name=f"{name}-{i}", daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def format_load_table(results: Sequence[LoadResult], title: str) -> str:
+    """
+    Render load results as a text table.
+
+    Args:
+        results: Results to render
+        title: Table heading
+
+    Returns:
+        Table text with throughput, error rate and p50/p95/p99 latency
+    """
+    header = (
+        f"{'scenario':<44} {'conc':>5} {'ops/s':>10} {'err%':>7} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    lines = [title, header, "-" * len(header)]
+
+    for result in results:
+        latency = summarize(result.latencies)
+        scenario = " ".join(
+            [result.name] + [f"{key}={value}" for key, value in result.labels.items()]
+        )
+        lines.append(
+            f"{scenario[:44]:<44} {result.concurrency:>5} "
+            f"{result.throughput:>10.1f} {result.error_rate * 100:>6.2f}% "
+            f"{latency['p50'] * 1000:>9.2f} {latency['p95'] * 1000:>9.2f} "
+            f"{latency['p99'] * 1000:>9.2f}"
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,374 @@
+"""
+Counter rates computed locally from successive exporter scrapes.
+
+For a quick look at what an exporter is doing right now, without waiting
+for Prometheus to ingest a few scrapes: ``measure_rates`` scrapes the same
+endpoint two or more times a few seconds apart, indexes every parsed sample
+by series (name plus sorted labels), and diffs consecutive snapshots with
+one dict lookup per series. Each series is timed by its own sample
+timestamps where the exporter exposes them (cAdvisor does, and may serve
+the same cached sample twice), otherwise by when the response arrived.
+Counter resets are handled the way ``rate()`` handles them (a drop means
+the counter restarted from zero), and histogram bucket rates are turned
+into quantiles with the same interpolation as ``histogram_quantile()``.
+
+Usage:
+    python -m src.utils.local_rates cadvisor --match container_cpu_usage
+    python -m src.utils.local_rates postgres-exporter --match pg_stat --top 20
+    python -m src.utils.local_rates http://localhost:9100/metrics --scrapes 3
+"""
+
+import argparse
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import requests
+
+from src.utils.constants import METRICS_EXPORTERS
+from src.utils.exporter_scrape import scrape_exporter
+from src.utils.http_timing import TimedSession
+from src.utils.prometheus_text import MetricFamily, Sample
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+# Series of these family types that only ever increase
+_COUNTER_SUFFIXES = {
+    "counter": ("",),
+    "histogram": ("_bucket", "_sum", "_count"),
+    "summary": ("_sum", "_count"),
+}
+
+
+class LocalRateError(Exception):
+    """Custom exception for local rate computation failures."""
+
+
+def series_key(sample: Sample) -> SeriesKey:
+    """Return the identity of a sample's series, independent of label order."""
+    return sample.name, tuple(sorted(sample.labels.items()))
+
+
+def is_counter(sample: Sample, family_type: str) -> bool:
+    """
+    Return whether a sample belongs to a monotonically increasing series.
+
+    Counters, histogram buckets/sums/counts and summary sums/counts are;
+    untyped series are when named like a counter (``_total``).
+    """
+    if family_type == "untyped":
+        return sample.name.endswith("_total")
+    suffixes = _COUNTER_SUFFIXES.get(family_type, ())
+    return any(sample.name == sample.family + suffix for suffix in suffixes)
+
+
+@dataclass
+class Snapshot:
+    """
+    Counter values of one scrape, indexed by series.
+
+    Attributes:
+        url: Scraped URL
+        taken: When the response arrived, in Unix seconds
+        values: Value of every counter series
+        types: Family type of every counter sample name
+        times: Explicit sample timestamps in Unix seconds, where exposed
+    """
+
+    url: str
+    taken: float
+    values: Dict[SeriesKey, float] = field(default_factory=dict)
+    types: Dict[str, str] = field(default_factory=dict)
+    times: Dict[SeriesKey, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_families(
+        cls, url: str, taken: float, families: Dict[str, MetricFamily]
+    ) -> "Snapshot":
+        """Index the counter samples of parsed families (kept samples)."""
+        snapshot = cls(url, taken)
+        for family in families.values():
+            for sample in family.samples:
+                if is_counter(sample, family.type):
+                    key = series_key(sample)
+                    snapshot.values[key] = sample.value
+                    snapshot.types[sample.name] = family.type
+                    if sample.timestamp is not None:
+                        snapshot.times[key] = sample.timestamp / 1000
+        return snapshot
+
+    def time_of(self, key: SeriesKey) -> float:
+        """Return when a series was sampled: its timestamp, else ``taken``."""
+        return self.times.get(key, self.taken)
+
+
+def take_snapshot(session: requests.Session, url: str, timeout: int = 15) -> Snapshot:
+    """
+    Scrape an exporter completely and index its counter samples.
+
+    Raises:
+        LocalRateError: If the exporter does not answer with 200
+    """
+    result = scrape_exporter(
+        session, url, timeout=timeout, stop_early=False, keep_samples=True
+    )
+    if result.status_code != 200:
+        raise LocalRateError(f"{url} returned HTTP {result.status_code}")
+    return Snapshot.from_families(url, time.time(), result.families)
+
+
+@dataclass
+class SeriesRate:
+    """Per-second rate of one counter series over the time its samples span."""
+
+    name: str
+    labels: Dict[str, str]
+    increase: float
+    rate: float
+    resets: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class HistogramRate:
+    """Observation rate and quantiles of one histogram series."""
+
+    family: str
+    labels: Dict[str, str]
+    rate: float
+    quantiles: Dict[float, float] = field(default_factory=dict)
+
+
+@dataclass
+class LocalRates:
+    """Rates over successive scrapes of one exporter."""
+
+    url: str
+    elapsed: float
+    scrapes: int
+    rates: List[SeriesRate] = field(default_factory=list)
+    histograms: List[HistogramRate] = field(default_factory=list)
+
+    def top(self, count: int = 10, match: str = "") -> List[SeriesRate]:
+        """Return the busiest series whose name contains ``match``."""
+        matching = (rate for rate in self.rates if match in rate.name)
+        return sorted(matching, key=lambda rate: rate.rate, reverse=True)[:count]
+
+
+def histogram_quantile(
+    quantile: float, buckets: Sequence[Tuple[float, float]]
+) -> float:
+    """
+    Estimate a quantile from cumulative bucket counts, like PromQL does.
+
+    The rank is located in the first bucket whose cumulative count reaches
+    it and interpolated linearly inside that bucket (the lowest bucket
+    starts at 0). Ranks in the ``+Inf`` bucket return the highest finite
+    bound.
+
+    Args:
+        quantile: Quantile between 0.0 and 1.0
+        buckets: ``(upper bound, cumulative count)`` pairs, any order
+
+    Returns:
+        Estimated value, or NaN without observations or a ``+Inf`` bucket
+    """
+    ordered = sorted(buckets)
+    if len(ordered) < 2 or not math.isinf(ordered[-1][0]) or ordered[-1][1] <= 0:
+        return math.nan
+    # Rates from separate diffs can be slightly non-monotonic
+    counts: List[float] = []
+    for _, count in ordered:
+        counts.append(max(count, counts[-1]) if counts else count)
+
+    rank = quantile * counts[-1]
+    index = next(i for i, count in enumerate(counts) if count >= rank)
+    if index == len(ordered) - 1:
+        return ordered[-2][0]
+    upper = ordered[index][0]
+    lower, below = (ordered[index - 1][0], counts[index - 1]) if index else (0.0, 0.0)
+    if index == 0 and upper <= 0:
+        return upper
+    in_bucket = counts[index] - below
+    if in_bucket <= 0:
+        return upper
+    return lower + (upper - lower) * (rank - below) / in_bucket
+
+
+def compute_rates(
+    snapshots: Sequence[Snapshot], quantiles: Iterable[float] = DEFAULT_QUANTILES
+) -> LocalRates:
+    """
+    Compute per-series rates and histogram quantiles from snapshots.
+
+    Increases are summed over each pair of consecutive snapshots; a value
+    lower than the previous one counts as a reset, so the increase is the
+    new value. Each rate divides by the time the series' own samples span
+    (``Snapshot.time_of``). Series missing from a snapshot only contribute
+    the pairs they appear in, and pairs in which a series' timestamp did
+    not advance (the exporter served the same sample again) are skipped,
+    so a series never resampled gets no rate.
+
+    Args:
+        snapshots: Scrapes of one exporter, oldest first
+        quantiles: Quantiles estimated for every histogram
+
+    Returns:
+        LocalRates over the time between the first and last snapshot
+
+    Raises:
+        LocalRateError: With fewer than two snapshots or no time between them
+    """
+    if len(snapshots) < 2:
+        raise LocalRateError("At least two scrapes are needed to compute rates")
+    elapsed = snapshots[-1].taken - snapshots[0].taken
+    if elapsed <= 0:
+        raise LocalRateError("Scrapes must be taken at increasing times")
+
+    increases: Dict[SeriesKey, float] = {}
+    resets: Dict[SeriesKey, int] = {}
+    spans: Dict[SeriesKey, float] = {}
+    for previous, current in zip(snapshots, snapshots[1:]):
+        earlier = previous.values
+        for key, value in current.values.items():
+            before = earlier.get(key)
+            if before is None:
+                continue
+            span = current.time_of(key) - previous.time_of(key)
+            if span <= 0:
+                continue
+            spans[key] = spans.get(key, 0.0) + span
+            if value < before:
+                resets[key] = resets.get(key, 0) + 1
+                increase = value
+            else:
+                increase = value - before
+            increases[key] = increases.get(key, 0.0) + increase
+
+    local = LocalRates(snapshots[0].url, elapsed, len(snapshots))
+    buckets: Dict[SeriesKey, List[Tuple[float, float]]] = {}
+    for (name, labels), increase in increases.items():
+        span = spans[(name, labels)]
+        local.rates.append(
+            SeriesRate(
+                name,
+                dict(labels),
+                increase,
+                increase / span,
+                resets.get((name, labels), 0),
+                span,
+            )
+        )
+        if name.endswith("_bucket") and snapshots[-1].types.get(name) == "histogram":
+            bound = dict(labels).get("le")
+            if bound is None:
+                continue
+            rest = tuple(pair for pair in labels if pair[0] != "le")
+            buckets.setdefault((name[: -len("_bucket")], rest), []).append(
+                (float(bound), increase / span)
+            )
+
+    wanted = list(quantiles)
+    for (family, labels), pairs in buckets.items():
+        histogram = HistogramRate(family, dict(labels), max(rate for _, rate in pairs))
+        histogram.quantiles = {q: histogram_quantile(q, pairs) for q in wanted}
+        local.histograms.append(histogram)
+    return local
+
+
+def measure_rates(
+    url: str,
+    scrapes: int = 2,
+    interval: float = DEFAULT_INTERVAL,
+    session: Optional[requests.Session] = None,
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+) -> LocalRates:
+    """
+    Scrape an exporter several times and compute rates locally.
+
+    Args:
+        url: Exporter metrics URL
+        scrapes: Number of scrapes (at least two)
+        interval: Seconds between scrape starts
+        session: Session for the scrapes
+        quantiles: Quantiles estimated for every histogram
+
+    Returns:
+        LocalRates between the first and last scrape
+    """
+    owned = session is None
+    session = session or TimedSession()
+    snapshots: List[Snapshot] = []
+    started = time.monotonic()
+    try:
+        for index in range(max(2, scrapes)):
+            if index:
+                time.sleep(max(0.0, started + index * interval - time.monotonic()))
+            snapshots.append(take_snapshot(session, url))
+    finally:
+        if owned:
+            session.close()
+    return compute_rates(snapshots, quantiles)
+
+
+def _format_labels(labels: Dict[str, str], width: int = 60) -> str:
+    text = ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+    return text[:width]
+
+
+def format_rate_report(local: LocalRates, top: int = 10, match: str = "") -> str:
+    """Render the busiest series and the busiest histograms' quantiles."""
+    lines = [
+        f"⚡ Local rates for {local.url} "
+        f"({local.scrapes} scrapes over {local.elapsed:.1f}s)",
+        f"{'rate/s':>14} {'resets':>6}  series",
+    ]
+    for rate in local.top(top, match):
+        lines.append(
+            f"{rate.rate:>14,.3f} {rate.resets:>6}  "
+            f"{rate.name}{{{_format_labels(rate.labels)}}}"
+        )
+
+    histograms = [
+        histogram for histogram in local.histograms if match in histogram.family
+    ]
+    histograms.sort(key=lambda histogram: histogram.rate, reverse=True)
+    if histograms:
+        lines.append("")
+        lines.append("📊 Histogram quantiles (busiest first):")
+    for histogram in histograms[:top]:
+        values = " ".join(
+            f"p{quantile * 100:g}={value:.4g}"
+            for quantile, value in histogram.quantiles.items()
+        )
+        lines.append(
+            f"  {histogram.family}{{{_format_labels(histogram.labels)}}} "
+            f"{histogram.rate:,.2f}/s {values}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Measure local rates of one exporter and print the busiest series."""
+    parser = argparse.ArgumentParser(description="Compute exporter rates locally")
+    parser.add_argument("exporter", help="name from METRICS_EXPORTERS or a URL")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--scrapes", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="s")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--match", default="", help="only series containing this")
+    args = parser.parse_args(argv)
+
+    url = args.exporter
+    if url in METRICS_EXPORTERS:
+        config = METRICS_EXPORTERS[url]
+        url = f"http://{args.host}:{config['port']}{config.get('endpoint', '/metrics')}"
+    local = measure_rates(url, args.scrapes, args.interval)
+    print(format_rate_report(local, args.top, args.match))
+
+
+if __name__ == "__main__":
+    main()
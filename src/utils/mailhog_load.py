@@ -0,0 +1,304 @@
+"""
+MailHog mail-pipeline throughput test.
+
+Sends messages concurrently over SMTP (port 1025) in batches and verifies
+each batch through the v2 search API, page by page, instead of listing the
+whole mailbox. For every batch it reports the SMTP send rate, end-to-end
+delivery latency (``X-Load-Sent-At`` header vs MailHog's ``Created``
+timestamp) and how long API queries take at the current mailbox size.
+
+Usage:
+    python -m src.utils.mailhog_load --messages 2000 --batch 250 --concurrency 8
+"""
+
+import argparse
+import re
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.load_testing import LoadResult, format_load_table, run_load
+from src.utils.perf_stats import summarize
+
+SMTP_PORT = 1025
+API_PORT = 8025
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_TIMEOUT = 10
+SENT_AT_HEADER = "X-Load-Sent-At"
+# Fractions of any length; Python 3.10's fromisoformat takes only 3 or 6 digits
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+class MailLoadError(Exception):
+    """Custom exception for mail pipeline load test failures."""
+
+
+def parse_mailhog_time(value: str) -> float:
+    """
+    Convert a MailHog ``Created`` timestamp (RFC 3339, nanoseconds) to epoch.
+
+    The fraction is padded or trimmed to microseconds and ``Z`` becomes
+    ``+00:00``, which ``datetime.fromisoformat`` needs before Python 3.11.
+
+    Args:
+        value: Timestamp such as ``2024-01-01T10:00:00.123456789Z``
+
+    Returns:
+        Seconds since the epoch
+    """
+    value = _FRACTION.sub(lambda match: "." + match[1][:6].ljust(6, "0"), value)
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def send_messages(
+    run_id: str,
+    start: int,
+    count: int,
+    concurrency: int,
+    host: str = "localhost",
+    port: int = SMTP_PORT,
+    sent: Optional[Set[str]] = None,
+) -> LoadResult:
+    """
+    Send ``count`` messages over SMTP, one connection per worker.
+
+    Subjects are ``<run_id> #<index>`` so the batch can be searched for;
+    subjects accepted by the server are added to ``sent`` if given.
+
+    Returns:
+        LoadResult for the SMTP transactions
+    """
+    local = threading.local()
+    connections: List[smtplib.SMTP] = []
+    lock = threading.Lock()
+
+    def send(iteration: int) -> None:
+        if not hasattr(local, "smtp"):
+            local.smtp = smtplib.SMTP(host, port, timeout=DEFAULT_TIMEOUT)
+            with lock:
+                connections.append(local.smtp)
+        message = EmailMessage()
+        message["From"] = "load@example.com"
+        message["To"] = "inbox@example.com"
+        message["Subject"] = f"{run_id} #{start + iteration}"
+        message[SENT_AT_HEADER] = f"{time.time():.6f}"
+        message.set_content("mail pipeline load test\n")
+        local.smtp.send_message(message)
+        if sent is not None:
+            with lock:
+                sent.add(message["Subject"])
+
+    try:
+        return run_load(send, concurrency=concurrency, iterations=count, name="smtp")
+    finally:
+        for connection in connections:
+            try:
+                connection.quit()
+            except smtplib.SMTPException:
+                pass
+
+
+def search_messages(
+    session: TimedSession,
+    base_url: str,
+    query: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield messages matching ``query`` via paginated ``/api/v2/search``.
+
+    Raises:
+        MailLoadError: If a page cannot be fetched
+    """
+    start = 0
+    while True:
+        params: Dict[str, Any] = {
+            "kind": "containing",
+            "query": query,
+            "start": start,
+            "limit": page_size,
+        }
+        response = session.get(
+            f"{base_url}/api/v2/search", params=params, timeout=DEFAULT_TIMEOUT
+        )
+        if response.status_code != 200:
+            raise MailLoadError(f"MailHog search returned HTTP {response.status_code}")
+        page = response.json()
+        yield from page.get("items") or []
+        start += page.get("count", 0)
+        if not page.get("count") or start >= page.get("total", 0):
+            return
+
+
+def mailbox_size(session: TimedSession, base_url: str) -> int:
+    """Return the number of stored messages using a one-item page."""
+    response = session.get(
+        f"{base_url}/api/v2/messages", params={"limit": 1}, timeout=DEFAULT_TIMEOUT
+    )
+    if response.status_code != 200:
+        raise MailLoadError(f"MailHog messages returned HTTP {response.status_code}")
+    return int(response.json().get("total", 0))
+
+
+def wait_for_delivery(
+    session: TimedSession,
+    base_url: str,
+    run_id: str,
+    expected: Set[str],
+    timeout: float = 60.0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> List[float]:
+    """
+    Poll the search API until every expected subject has been captured.
+
+    Returns:
+        End-to-end delivery latencies in seconds, one per message
+
+    Raises:
+        MailLoadError: If messages are still missing after ``timeout``
+    """
+    latencies: Dict[str, float] = {}
+    deadline = time.monotonic() + timeout
+
+    while True:
+        for message in search_messages(session, base_url, run_id, page_size):
+            headers = message.get("Content", {}).get("Headers", {})
+            subject = (headers.get("Subject") or [""])[0]
+            if subject not in expected or subject in latencies:
+                continue
+            sent_at = float(headers.get(SENT_AT_HEADER, ["nan"])[0])
+            latencies[subject] = parse_mailhog_time(message["Created"]) - sent_at
+            # Search results are newest first: stop paging once the batch is seen
+            if len(latencies) == len(expected):
+                break
+
+        if len(latencies) == len(expected):
+            return list(latencies.values())
+        if time.monotonic() >= deadline:
+            raise MailLoadError(
+                f"{len(expected) - len(latencies)} of {len(expected)} messages "
+                f"not delivered within {timeout}s"
+            )
+        time.sleep(0.5)
+
+
+def _timed_query(session: TimedSession, base_url: str, params: Dict[str, Any]) -> float:
+    started = time.perf_counter()
+    response = session.get(
+        f"{base_url}/api/v2/search", params=params, timeout=DEFAULT_TIMEOUT
+    )
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def benchmark_mailhog(
+    messages: int = 1000,
+    batch_size: int = 250,
+    concurrency: int = 8,
+    host: str = "localhost",
+    smtp_port: int = SMTP_PORT,
+    api_port: int = API_PORT,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Run the send/verify loop in batches while the mailbox grows.
+
+    Args:
+        messages: Total messages to send
+        batch_size: Messages per batch; query cost is sampled after each
+        concurrency: Concurrent SMTP connections
+        host: MailHog host
+        smtp_port: MailHog SMTP port
+        api_port: MailHog HTTP API port
+        page_size: Search page size used for verification
+
+    Returns:
+        Dictionary with ``run_id``, per-batch ``send`` results, overall
+        ``delivery_latency`` summary and per-batch ``queries`` timings
+        (``mailbox_size``, ``search_first_page``, ``search_last_page``)
+
+    Raises:
+        MailLoadError: If a batch is not fully delivered
+    """
+    run_id = f"mailload-{uuid.uuid4().hex[:12]}"
+    base_url = f"http://{host}:{api_port}"
+    report: Dict[str, Any] = {"run_id": run_id, "send": [], "queries": []}
+    latencies: List[float] = []
+
+    with TimedSession("mailhog", recorder=TimingRecorder()) as session:
+        for start in range(0, messages, batch_size):
+            count = min(batch_size, messages - start)
+            expected: Set[str] = set()
+            result = send_messages(
+                run_id, start, count, concurrency, host, smtp_port, sent=expected
+            )
+            result.labels = {"batch": start // batch_size, "messages": count}
+            report["send"].append(result)
+
+            latencies.extend(
+                wait_for_delivery(
+                    session, base_url, run_id, expected, page_size=page_size
+                )
+            )
+
+            search = {"kind": "containing", "query": run_id, "limit": page_size}
+            report["queries"].append(
+                {
+                    "mailbox_size": mailbox_size(session, base_url),
+                    "search_first_page": _timed_query(session, base_url, search),
+                    "search_last_page": _timed_query(
+                        session,
+                        base_url,
+                        {**search, "start": max(0, start + count - page_size)},
+                    ),
+                }
+            )
+
+    report["delivery_latency"] = summarize(latencies)
+    return report
+
+
+def format_mailhog_report(report: Dict[str, Any]) -> str:
+    """Render a ``benchmark_mailhog`` report as text."""
+    lines = [
+        format_load_table(report["send"], f"📧 MailHog SMTP send ({report['run_id']})")
+    ]
+    latency = report["delivery_latency"]
+    lines.append(
+        f"\nDelivery latency: p50 {latency['p50'] * 1000:.1f} ms, "
+        f"p95 {latency['p95'] * 1000:.1f} ms, max {latency['max'] * 1000:.1f} ms"
+    )
+    lines.append(f"\n{'mailbox':>8} {'first page ms':>14} {'last page ms':>13}")
+    for query in report["queries"]:
+        lines.append(
+            f"{query['mailbox_size']:>8} {query['search_first_page'] * 1000:>14.1f} "
+            f"{query['search_last_page'] * 1000:>13.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the test from the command line and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=250)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--host", default="localhost")
+    args = parser.parse_args(argv)
+
+    report = benchmark_mailhog(
+        messages=args.messages,
+        batch_size=args.batch,
+        concurrency=args.concurrency,
+        host=args.host,
+    )
+    print(format_mailhog_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Small statistics helpers shared by the probe and benchmark utilities.
+
+Latency samples are kept as plain lists of floats (seconds); these helpers
+turn them into the summary dictionaries used in reports and metrics.
+"""
+
+from typing import Dict, Iterable, List, Sequence
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def percentile(sorted_values: Sequence[float], quantile: float) -> float:
+    """
+    Compute a percentile using linear interpolation between closest ranks.
+
+    Args:
+        sorted_values: Values sorted in ascending order
+        quantile: Quantile between 0.0 and 1.0
+
+    Returns:
+        Interpolated percentile value, or 0.0 for an empty sequence
+    """
+    if not sorted_values:
+        return 0.0
+
+    rank = quantile * (len(sorted_values) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = rank - lower
+
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * weight
+
+
+def summarize(
+    values: Iterable[float], quantiles: Sequence[float] = DEFAULT_QUANTILES
+) -> Dict[str, float]:
+    """
+    Summarize a set of samples into count, mean, min, max and percentiles.
+
+    Args:
+        values: Sample values
+        quantiles: Quantiles to include, reported as ``p50``, ``p95``...
+
+    Returns:
+        Dictionary with summary statistics
+    """
+    ordered: List[float] = sorted(values)
+    count = len(ordered)
+
+    summary = {
+        "count": float(count),
+        "mean": sum(ordered) / count if count else 0.0,
+        "min": ordered[0] if count else 0.0,
+        "max": ordered[-1] if count else 0.0,
+    }
+    for quantile in quantiles:
+        summary[f"p{quantile * 100:g}"] = percentile(ordered, quantile)
+
+    return summary
@@ -0,0 +1,144 @@
+"""
+Read scrape settings and rules from the repository's Prometheus files.
+
+Tests and benchmarks use this to know which jobs Prometheus scrapes, how
+often, from which path, and which rule expressions it evaluates, without
+hard-coding the values that already live in ``prometheus.yml`` and
+``alerts.yml``.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import yaml
+
+PROMETHEUS_CONFIG = Path(__file__).resolve().parents[2] / "prometheus.yml"
+ALERT_RULES = PROMETHEUS_CONFIG.parent / "alerts.yml"
+DEFAULT_SCRAPE_INTERVAL = 60.0  # Prometheus' own default
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|y|w|d|h|m|s)")
+_UNIT_SECONDS = {
+    "ms": 0.001,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+    "y": 31536000,
+}
+
+
+@dataclass
+class ScrapeJob:
+    """Scrape settings of one ``scrape_configs`` entry."""
+
+    name: str
+    scrape_interval: float
+    scrape_timeout: float
+    metrics_path: str = "/metrics"
+    targets: List[str] = field(default_factory=list)
+    params: Dict[str, List[str]] = field(default_factory=dict)
+
+
+@dataclass
+class Rule:
+    """An alerting or recording rule from a rule file."""
+
+    name: str
+    expr: str
+    group: str
+    kind: str = "alert"
+    labels: Dict[str, str] = field(default_factory=dict)
+    for_seconds: float = 0.0
+
+
+def parse_duration(value: Union[str, int, float]) -> float:
+    """
+    Convert a Prometheus duration (``15s``, ``1m30s``, ``500ms``) to seconds.
+
+    Raises:
+        ValueError: If the value is not a valid duration
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = value.strip()
+    matches = list(_DURATION.finditer(text))
+    if not matches or "".join(match.group(0) for match in matches) != text:
+        raise ValueError(f"Invalid Prometheus duration: {value!r}")
+    return sum(
+        float(match.group(1)) * _UNIT_SECONDS[match.group(2)] for match in matches
+    )
+
+
+def load_scrape_jobs(
+    path: Union[str, Path] = PROMETHEUS_CONFIG,
+    config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, ScrapeJob]:
+    """
+    Load the scrape jobs of a Prometheus configuration.
+
+    Args:
+        path: Configuration file, the repository's ``prometheus.yml`` by default
+        config: Already parsed configuration (``path`` is then ignored)
+
+    Returns:
+        ScrapeJob per job name, in file order, with global defaults applied
+    """
+    if config is None:
+        with open(path, encoding="utf-8") as config_file:
+            config = yaml.safe_load(config_file) or {}
+
+    defaults = config.get("global") or {}
+    interval = parse_duration(defaults.get("scrape_interval", DEFAULT_SCRAPE_INTERVAL))
+    timeout = parse_duration(defaults.get("scrape_timeout", min(interval, 10.0)))
+
+    jobs = {}
+    for entry in config.get("scrape_configs") or []:
+        job_interval = parse_duration(entry.get("scrape_interval", interval))
+        jobs[entry["job_name"]] = ScrapeJob(
+            name=entry["job_name"],
+            scrape_interval=job_interval,
+            scrape_timeout=parse_duration(
+                entry.get("scrape_timeout", min(timeout, job_interval))
+            ),
+            metrics_path=entry.get("metrics_path", "/metrics"),
+            targets=[
+                target
+                for static in entry.get("static_configs") or []
+                for target in static.get("targets") or []
+            ],
+            params=entry.get("params") or {},
+        )
+    return jobs
+
+
+def load_rules(path: Union[str, Path] = ALERT_RULES) -> List[Rule]:
+    """
+    Load the alerting and recording rules of a rule file.
+
+    Args:
+        path: Rule file, the repository's ``alerts.yml`` by default
+
+    Returns:
+        Rules in file order
+    """
+    with open(path, encoding="utf-8") as rules_file:
+        content = yaml.safe_load(rules_file) or {}
+
+    rules = []
+    for group in content.get("groups") or []:
+        for entry in group.get("rules") or []:
+            kind = "record" if "record" in entry else "alert"
+            rules.append(
+                Rule(
+                    name=entry[kind],
+                    expr=str(entry["expr"]).strip(),
+                    group=group["name"],
+                    kind=kind,
+                    labels=entry.get("labels") or {},
+                    for_seconds=parse_duration(entry.get("for", 0)),
+                )
+            )
+    return rules
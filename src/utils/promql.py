@@ -0,0 +1,226 @@
+"""
+Concurrent PromQL execution.
+
+``PromQLExecutor`` runs many instant and range queries against the
+Prometheus HTTP API from a thread pool over one pooled session. Identical
+queries are executed once, and every result carries its latency, series and
+sample counts (and, when requested, the samples Prometheus had to touch).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import requests
+
+from src.utils.http_timing import TimedSession
+from src.utils.perf_stats import summarize
+
+DEFAULT_PROMETHEUS_URL = "http://localhost:9090"
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 10
+
+
+@dataclass(frozen=True)
+class PromQuery:
+    """
+    An instant or range query.
+
+    Attributes:
+        expr: PromQL expression
+        time: Evaluation time for instant queries (default: now)
+        start: Range start (Unix seconds); set with ``end`` and ``step``
+        end: Range end (Unix seconds)
+        step: Range resolution in seconds
+    """
+
+    expr: str
+    time: Optional[float] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+    step: Optional[float] = None
+
+    @property
+    def is_range(self) -> bool:
+        """Return True for range queries."""
+        return self.step is not None
+
+    @classmethod
+    def range(
+        cls, expr: str, lookback: float, step: float, end: Optional[float] = None
+    ) -> "PromQuery":
+        """
+        Build a range query covering the last ``lookback`` seconds.
+
+        ``end`` is aligned down to ``step`` so that repeated calls build the
+        same query (and hit Prometheus' step-aligned caches).
+        """
+        end = end if end is not None else time.time()
+        end -= end % step
+        return cls(expr, start=end - lookback, end=end, step=step)
+
+    def params(self) -> Dict[str, Any]:
+        """Return the API form parameters for this query."""
+        if self.is_range:
+            return {
+                "query": self.expr,
+                "start": self.start,
+                "end": self.end,
+                "step": self.step,
+            }
+        return {"query": self.expr, **({"time": self.time} if self.time else {})}
+
+
+@dataclass
+class QueryResult:
+    """Outcome and cost of one query."""
+
+    query: PromQuery
+    latency: float = 0.0
+    status: str = "error"
+    result_type: Optional[str] = None
+    result: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    samples_touched: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if Prometheus answered with ``status: success``."""
+        return self.status == "success"
+
+    @property
+    def series(self) -> int:
+        """Return the number of series (or 1 for scalar/string results)."""
+        if self.result_type in ("scalar", "string"):
+            return 1
+        return len(self.result)
+
+    @property
+    def samples(self) -> int:
+        """Return the number of returned samples."""
+        if self.result_type == "matrix":
+            return sum(len(series.get("values", [])) for series in self.result)
+        return self.series
+
+
+class PromQLExecutor:
+    """
+    Runs PromQL queries concurrently over a pooled session.
+
+    Args:
+        base_url: Prometheus base URL
+        session: Session to reuse; a ``TimedSession`` is created by default
+        max_workers: Concurrent queries in flight
+        timeout: Per-request timeout in seconds
+        stats: Ask Prometheus for query statistics (``samples_touched``)
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_PROMETHEUS_URL,
+        session: Optional[requests.Session] = None,
+        max_workers: int = DEFAULT_WORKERS,
+        timeout: int = DEFAULT_TIMEOUT,
+        stats: bool = False,
+    ) -> None:
+        self.base_url = base_url
+        self.session = session or TimedSession("prometheus", pool_maxsize=max_workers)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.stats = stats
+
+    def execute(self, query: PromQuery) -> QueryResult:
+        """
+        Execute one query; failures are captured in the result.
+
+        Queries are POSTed as forms so long dashboard expressions do not hit
+        URL length limits.
+        """
+        endpoint = "query_range" if query.is_range else "query"
+        data = query.params()
+        if self.stats:
+            data["stats"] = "all"
+
+        result = QueryResult(query)
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/v1/{endpoint}", data=data, timeout=self.timeout
+            )
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            result.error = f"{type(e).__name__}: {e}"
+            return result
+        finally:
+            result.latency = time.perf_counter() - started
+
+        result.status = body.get("status", "error")
+        if not result.ok:
+            result.error = body.get("error") or f"HTTP {response.status_code}"
+            return result
+
+        payload = body.get("data", {})
+        result.result_type = payload.get("resultType")
+        raw = payload.get("result", [])
+        result.result = raw if isinstance(raw, list) else [{"value": raw}]
+        samples = payload.get("stats", {}).get("samples", {})
+        if "totalQueryableSamples" in samples:
+            result.samples_touched = int(samples["totalQueryableSamples"])
+        return result
+
+    def run(
+        self, queries: Iterable[Union[str, PromQuery]]
+    ) -> Dict[PromQuery, QueryResult]:
+        """
+        Execute queries concurrently, running identical ones only once.
+
+        Args:
+            queries: Expressions (instant, evaluated now) or ``PromQuery``s
+
+        Returns:
+            Result per distinct query, in first-seen order
+        """
+        unique = list(
+            dict.fromkeys(
+                query if isinstance(query, PromQuery) else PromQuery(query)
+                for query in queries
+            )
+        )
+        if not unique:
+            return {}
+
+        workers = min(self.max_workers, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(unique, executor.map(self.execute, unique)))
+
+
+def query_stats(results: Iterable[QueryResult]) -> Dict[str, Any]:
+    """
+    Aggregate latency and result size over a batch of query results.
+
+    Returns:
+        Dictionary with ``queries``, ``errors``, ``series``, ``samples`` and
+        a ``latency`` summary in seconds
+    """
+    results = list(results)
+    return {
+        "queries": len(results),
+        "errors": sum(1 for result in results if not result.ok),
+        "series": sum(result.series for result in results),
+        "samples": sum(result.samples for result in results),
+        "latency": summarize([result.latency for result in results]),
+    }
+
+
+def format_query_report(results: Dict[PromQuery, QueryResult]) -> str:
+    """Render per-query latency and series counts as a text table."""
+    header = f"{'query':<60} {'kind':>5} {'ms':>8} {'series':>7} {'samples':>8}"
+    lines = ["🔎 PromQL queries", header, "-" * len(header)]
+    for query, result in results.items():
+        kind = "range" if query.is_range else "inst"
+        status = f"{result.series:>7} {result.samples:>8}" if result.ok else " ERROR"
+        lines.append(
+            f"{query.expr[:60]:<60} {kind:>5} {result.latency * 1000:>8.1f} {status}"
+        )
+    return "\n".join(lines)
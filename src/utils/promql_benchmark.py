@@ -0,0 +1,322 @@
+"""
+PromQL benchmark built from the queries the stack actually runs.
+
+Alert rules in ``alerts.yml`` are evaluated every 15 s and dashboard panels
+in ``grafana/dashboards`` are re-run on every refresh, so their expressions
+are the workload worth measuring. Every distinct expression is run as an
+instant query and as range queries over several lookback windows, a few
+times each, and the report gives latency percentiles, samples touched
+(from Prometheus' query statistics) and result size per query. Expressions
+that are slow or touch many samples to return a small result are flagged as
+recording rule candidates.
+
+Usage:
+    python -m src.utils.promql_benchmark
+    python -m src.utils.promql_benchmark --windows 3600 86400 --repetitions 10
+"""
+
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+import requests
+
+from src.utils.perf_stats import summarize
+from src.utils.prometheus_config import ALERT_RULES, load_rules
+from src.utils.promql import PromQLExecutor, PromQuery
+
+DASHBOARDS_DIR = ALERT_RULES.parent / "grafana" / "dashboards"
+DEFAULT_WINDOWS = (3600, 6 * 3600, 24 * 3600)
+DEFAULT_REPETITIONS = 5
+# Grafana asks for roughly one point per pixel column of a panel
+RANGE_POINTS = 250
+MIN_STEP = 15
+# Recording rule thresholds: slow, expensive, or mostly aggregation work
+SLOW_QUERY_SECONDS = 0.1
+HEAVY_SAMPLES = 1_000_000
+REDUCTION_RATIO = 1000
+
+_VARIABLE = re.compile(r"\$\{(\w+)(?::\w+)?\}|\$(\w+)|\[\[(\w+)\]\]")
+
+
+@dataclass
+class BenchmarkQuery:
+    """A distinct expression and where it is used."""
+
+    expr: str
+    sources: List[str] = field(default_factory=list)
+
+
+@dataclass
+class QueryBenchmark:
+    """Measurements of one expression in one mode (instant or a window)."""
+
+    query: BenchmarkQuery
+    mode: str
+    latencies: List[float] = field(default_factory=list)
+    samples_touched: int = 0
+    series: int = 0
+    samples: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, float]:
+        """Return latency count, mean, min, max and percentiles in seconds."""
+        return summarize(self.latencies)
+
+
+def expand_grafana_variables(
+    expr: str, variables: Mapping[str, str], step: Optional[float] = None
+) -> str:
+    """
+    Replace Grafana template variables with concrete values.
+
+    Dashboard variables take their given value. With a ``step``, the
+    built-in ``$__interval`` follows it and ``$__rate_interval`` is at
+    least four scrape intervals, as Grafana does. Unknown variables are
+    left as-is.
+    """
+    values = dict(variables)
+    if step is not None:
+        values.setdefault("__interval", f"{int(step)}s")
+        values.setdefault(
+            "__rate_interval", f"{int(max(4 * MIN_STEP, step + MIN_STEP))}s"
+        )
+
+    def replace(match: "re.Match[str]") -> str:
+        name = next(group for group in match.groups() if group)
+        return values.get(name, match.group(0))
+
+    return _VARIABLE.sub(replace, expr)
+
+
+def _walk_panels(panels: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for panel in panels:
+        yield panel
+        # Collapsed rows keep their panels nested
+        yield from _walk_panels(panel.get("panels", []))
+
+
+def _is_prometheus(datasource: Any) -> bool:
+    if datasource is None:
+        return True  # Default data source
+    if isinstance(datasource, dict):
+        return datasource.get("type", "prometheus") == "prometheus"
+    return "prometheus" in str(datasource).lower()
+
+
+def load_dashboard_queries(
+    directory: Union[str, Path] = DASHBOARDS_DIR,
+) -> Dict[str, List[str]]:
+    """
+    Extract the Prometheus panel targets of every dashboard in a directory.
+
+    Returns:
+        Sources (``<dashboard>:<panel title>``) per expression, with
+        dashboard variables expanded to their current values (built-ins
+        such as ``$__rate_interval`` depend on the step and are kept)
+    """
+    queries: Dict[str, List[str]] = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        with open(path, encoding="utf-8") as dashboard_file:
+            dashboard = json.load(dashboard_file)
+        variables = {
+            variable["name"]: str(variable.get("current", {}).get("value", ""))
+            for variable in dashboard.get("templating", {}).get("list", [])
+            if variable.get("current")
+        }
+        for panel in _walk_panels(dashboard.get("panels", [])):
+            for target in panel.get("targets", []):
+                datasource = target.get("datasource") or panel.get("datasource")
+                if not target.get("expr") or not _is_prometheus(datasource):
+                    continue
+                expr = expand_grafana_variables(target["expr"], variables)
+                source = f"{path.name}:{panel.get('title', panel.get('id'))}"
+                queries.setdefault(expr, []).append(source)
+    return queries
+
+
+def collect_queries(
+    rules_path: Optional[Union[str, Path]] = ALERT_RULES,
+    dashboards_dir: Optional[Union[str, Path]] = DASHBOARDS_DIR,
+) -> List[BenchmarkQuery]:
+    """
+    Collect the distinct expressions of the rule file and the dashboards.
+
+    Returns:
+        One BenchmarkQuery per expression, listing every rule and panel
+        that uses it
+    """
+    queries: Dict[str, BenchmarkQuery] = {}
+    if rules_path is not None:
+        for rule in load_rules(rules_path):
+            query = queries.setdefault(rule.expr, BenchmarkQuery(rule.expr))
+            query.sources.append(f"{Path(rules_path).name}:{rule.name}")
+    if dashboards_dir is not None:
+        for expr, sources in load_dashboard_queries(dashboards_dir).items():
+            queries.setdefault(expr, BenchmarkQuery(expr)).sources.extend(sources)
+    return list(queries.values())
+
+
+def range_step(window: float) -> float:
+    """Return a Grafana-like step for a window, a multiple of ``MIN_STEP``."""
+    points = max(1, round(window / RANGE_POINTS / MIN_STEP))
+    return float(points * MIN_STEP)
+
+
+def benchmark_queries(
+    queries: List[BenchmarkQuery],
+    prometheus_url: str = "http://localhost:9090",
+    windows: Iterable[float] = DEFAULT_WINDOWS,
+    repetitions: int = DEFAULT_REPETITIONS,
+    concurrency: int = 1,
+    session: Optional[requests.Session] = None,
+) -> List[QueryBenchmark]:
+    """
+    Run every query instantly and over each window, several times.
+
+    Args:
+        queries: Expressions to benchmark
+        prometheus_url: Prometheus base URL
+        windows: Range query lookbacks in seconds
+        repetitions: Runs per query and mode
+        concurrency: Queries in flight; 1 measures each in isolation
+        session: Session for the queries
+
+    Returns:
+        One QueryBenchmark per expression and mode
+    """
+    executor = PromQLExecutor(
+        prometheus_url, session=session, max_workers=concurrency, stats=True
+    )
+    # Fixed end so every repetition reads the same data
+    end = time.time()
+    benchmarks = []
+    # Expressions that expand to the same query share its runs
+    plan: Dict[PromQuery, List[QueryBenchmark]] = {}
+    for query in queries:
+        instant = QueryBenchmark(query, "instant")
+        benchmarks.append(instant)
+        promql = PromQuery(expand_grafana_variables(query.expr, {}, MIN_STEP))
+        plan.setdefault(promql, []).append(instant)
+        for window in windows:
+            step = range_step(window)
+            ranged = QueryBenchmark(query, f"range {window / 3600:g}h")
+            benchmarks.append(ranged)
+            expr = expand_grafana_variables(query.expr, {}, step)
+            plan.setdefault(PromQuery.range(expr, window, step, end), []).append(ranged)
+
+    for _ in range(repetitions):
+        for promql, result in executor.run(plan).items():
+            for benchmark in plan[promql]:
+                if not result.ok:
+                    benchmark.errors.append(result.error or "query failed")
+                    continue
+                benchmark.latencies.append(result.latency)
+                benchmark.samples_touched = max(
+                    benchmark.samples_touched, result.samples_touched or 0
+                )
+                benchmark.series = result.series
+                benchmark.samples = result.samples
+    return benchmarks
+
+
+def recording_rule_reasons(benchmark: QueryBenchmark) -> List[str]:
+    """
+    Return why an expression should be precomputed, if it should.
+
+    An expression is a candidate when its p95 latency reaches
+    ``SLOW_QUERY_SECONDS``, when it touches ``HEAVY_SAMPLES`` samples, or
+    when it reads ``REDUCTION_RATIO`` times more samples than it returns
+    (aggregation work a recording rule would do once per evaluation).
+    """
+    reasons = []
+    if benchmark.latencies and benchmark.summary()["p95"] >= SLOW_QUERY_SECONDS:
+        reasons.append(f"p95 {benchmark.summary()['p95'] * 1000:.0f} ms")
+    if benchmark.samples_touched >= HEAVY_SAMPLES:
+        reasons.append(f"{benchmark.samples_touched:,} samples touched")
+    if (
+        benchmark.samples
+        and benchmark.samples_touched / benchmark.samples >= REDUCTION_RATIO
+    ):
+        ratio = benchmark.samples_touched / benchmark.samples
+        reasons.append(f"reads {ratio:,.0f}x the samples it returns")
+    return reasons
+
+
+def recording_rule_candidates(
+    benchmarks: Iterable[QueryBenchmark],
+) -> Dict[str, List[str]]:
+    """Return the reasons per expression that should become a recording rule."""
+    candidates: Dict[str, List[str]] = {}
+    for benchmark in benchmarks:
+        reasons = recording_rule_reasons(benchmark)
+        if reasons:
+            candidates.setdefault(benchmark.query.expr, []).extend(
+                f"{benchmark.mode}: {reason}" for reason in reasons
+            )
+    return candidates
+
+
+def format_benchmark_report(benchmarks: List[QueryBenchmark]) -> str:
+    """Render the benchmark as a table plus the recording rule candidates."""
+    header = (
+        f"{'query':<50} {'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'touched':>10} {'series':>7} {'samples':>8}"
+    )
+    lines = ["⏱️  PromQL benchmark", header, "-" * len(header)]
+    for benchmark in benchmarks:
+        if not benchmark.latencies:
+            error = benchmark.errors[0][:60] if benchmark.errors else "no runs"
+            lines.append(
+                f"{benchmark.query.expr[:50]:<50} {benchmark.mode:<10} ❌ {error}"
+            )
+            continue
+        summary = benchmark.summary()
+        lines.append(
+            f"{benchmark.query.expr[:50]:<50} {benchmark.mode:<10} "
+            f"{summary['p50'] * 1000:>8.1f} {summary['p95'] * 1000:>8.1f} "
+            f"{summary['p99'] * 1000:>8.1f} {benchmark.samples_touched:>10,} "
+            f"{benchmark.series:>7} {benchmark.samples:>8,}"
+        )
+
+    candidates = recording_rule_candidates(benchmarks)
+    if candidates:
+        lines.append("")
+        lines.append("📼 Recording rule candidates:")
+        for expr, reasons in candidates.items():
+            lines.append(f"  {expr}")
+            lines.extend(f"    ↳ {reason}" for reason in reasons)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Benchmark the alert and dashboard queries against the local stack."""
+    parser = argparse.ArgumentParser(description="Benchmark alert/dashboard PromQL")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090")
+    parser.add_argument(
+        "--windows", type=float, nargs="+", default=list(DEFAULT_WINDOWS), help="s"
+    )
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rules", default=str(ALERT_RULES))
+    parser.add_argument("--dashboards", default=str(DASHBOARDS_DIR))
+    args = parser.parse_args(argv)
+
+    queries = collect_queries(args.rules, args.dashboards)
+    print(f"🔎 {len(queries)} distinct expressions from rules and dashboards")
+    benchmarks = benchmark_queries(
+        queries,
+        args.prometheus_url,
+        args.windows,
+        args.repetitions,
+        args.concurrency,
+    )
+    print(format_benchmark_report(benchmarks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Range query export into NumPy arrays.
+
+``export_range`` pulls a long window from ``/api/v1/query_range`` in
+step-aligned chunks that stay under Prometheus' 11,000 points-per-series
+limit, runs the chunks concurrently, and decodes each series straight into
+contiguous ``float64`` timestamp and value arrays, so analysis code works
+on whole arrays instead of looping over ``[ts, "value"]`` pairs. Exports
+can be cached on disk as ``.npz`` files (all series concatenated, with an
+offsets array and the label sets as JSON) for repeated offline analysis.
+
+Usage:
+    python -m src.utils.range_export 'rate(node_cpu_seconds_total[1m])' \\
+        --window 86400 --step 15
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import requests
+
+from src.utils.promql import PromQLExecutor, PromQuery
+
+# Prometheus rejects range queries above 11,000 points per series
+MAX_POINTS = 10_000
+CACHE_DIR = Path(__file__).resolve().parents[1] / "reports" / "range-cache"
+
+
+class RangeExportError(Exception):
+    """Custom exception for range export failures."""
+
+
+@dataclass
+class SeriesArrays:
+    """One series as contiguous timestamp and value arrays."""
+
+    labels: Dict[str, str]
+    timestamps: np.ndarray
+    values: np.ndarray
+
+
+@dataclass
+class RangeExport:
+    """All series of a range query over a window."""
+
+    expr: str
+    start: float
+    end: float
+    step: float
+    series: List[SeriesArrays] = field(default_factory=list)
+
+    @property
+    def samples(self) -> int:
+        """Return the number of samples across all series."""
+        return sum(len(series.values) for series in self.series)
+
+    def save(self, path: Union[str, Path], compress: bool = True) -> Path:
+        """
+        Store the export as a single ``.npz`` file.
+
+        Returns:
+            The path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lengths = [len(series.values) for series in self.series]
+        meta = {
+            "expr": self.expr,
+            "start": self.start,
+            "end": self.end,
+            "step": self.step,
+            "labels": [series.labels for series in self.series],
+        }
+        writer = np.savez_compressed if compress else np.savez
+        with open(path, "wb") as output:
+            writer(
+                output,
+                meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                offsets=np.cumsum([0] + lengths, dtype=np.int64),
+                timestamps=_concatenate([series.timestamps for series in self.series]),
+                values=_concatenate([series.values for series in self.series]),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RangeExport":
+        """Load an export written by ``save``."""
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode())
+            offsets = data["offsets"]
+            timestamps, values = data["timestamps"], data["values"]
+        export = cls(meta["expr"], meta["start"], meta["end"], meta["step"])
+        for index, labels in enumerate(meta["labels"]):
+            window = slice(offsets[index], offsets[index + 1])
+            export.series.append(
+                SeriesArrays(labels, timestamps[window], values[window])
+            )
+        return export
+
+
+def _concatenate(arrays: List[np.ndarray]) -> np.ndarray:
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float64)
+
+
+def decode_matrix(result: List[Dict[str, Any]]) -> List[SeriesArrays]:
+    """
+    Decode a ``matrix`` result into arrays, one per series.
+
+    Values arrive as strings (``"1.5"``, ``"NaN"``, ``"+Inf"``); NumPy
+    converts each column in one call.
+    """
+    decoded = []
+    for series in result:
+        pairs = series.get("values", [])
+        timestamps = np.fromiter(
+            (pair[0] for pair in pairs), dtype=np.float64, count=len(pairs)
+        )
+        values = np.array([pair[1] for pair in pairs], dtype=np.float64)
+        decoded.append(SeriesArrays(series.get("metric", {}), timestamps, values))
+    return decoded
+
+
+def chunk_ranges(
+    start: float, end: float, step: float, max_points: int = MAX_POINTS
+) -> List[Tuple[float, float]]:
+    """
+    Split ``[start, end]`` into step-aligned chunks of at most ``max_points``.
+
+    Consecutive chunks do not overlap: each starts one step after the
+    previous one ended.
+    """
+    if step <= 0 or end < start:
+        raise RangeExportError(f"Invalid range {start}..{end} step {step}")
+    span = step * (max_points - 1)
+    chunks = []
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + span, end)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + step
+    return chunks
+
+
+def cache_path(
+    expr: str,
+    start: float,
+    end: float,
+    step: float,
+    cache_dir: Union[str, Path],
+) -> Path:
+    """Return the cache file for a query and absolute window under ``cache_dir``."""
+    key = json.dumps([expr, start, end, step]).encode()
+    return Path(cache_dir) / f"{hashlib.sha256(key).hexdigest()[:32]}.npz"
+
+
+def export_range(
+    expr: str,
+    start: float,
+    end: float,
+    step: float,
+    prometheus_url: str = "http://localhost:9090",
+    session: Optional[requests.Session] = None,
+    max_points: int = MAX_POINTS,
+    max_workers: int = 4,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> RangeExport:
+    """
+    Export a range query over a long window into NumPy arrays.
+
+    Args:
+        expr: PromQL expression
+        start: Window start (Unix seconds)
+        end: Window end (Unix seconds)
+        step: Resolution in seconds
+        prometheus_url: Prometheus base URL
+        session: Session for the queries
+        max_points: Points per series per request
+        max_workers: Chunks fetched concurrently
+        cache_dir: Directory of ``.npz`` exports to reuse and fill; None
+            disables caching
+
+    Returns:
+        RangeExport with one SeriesArrays per series, samples in time order
+
+    Raises:
+        RangeExportError: If any chunk fails
+    """
+    cached = cache_path(expr, start, end, step, cache_dir) if cache_dir else None
+    if cached is not None and cached.exists():
+        return RangeExport.load(cached)
+
+    chunks = [
+        PromQuery(expr, start=chunk_start, end=chunk_end, step=step)
+        for chunk_start, chunk_end in chunk_ranges(start, end, step, max_points)
+    ]
+    executor = PromQLExecutor(
+        prometheus_url, session=session, max_workers=max_workers, timeout=60
+    )
+    results = executor.run(chunks)
+
+    parts: Dict[Tuple[Tuple[str, str], ...], List[SeriesArrays]] = {}
+    for chunk in chunks:
+        result = results[chunk]
+        if not result.ok:
+            raise RangeExportError(
+                f"Chunk {chunk.start}..{chunk.end} failed: {result.error}"
+            )
+        for series in decode_matrix(result.result):
+            parts.setdefault(tuple(sorted(series.labels.items())), []).append(series)
+
+    export = RangeExport(expr, start, end, step)
+    for pieces in parts.values():
+        export.series.append(
+            SeriesArrays(
+                pieces[0].labels,
+                _concatenate([piece.timestamps for piece in pieces]),
+                _concatenate([piece.values for piece in pieces]),
+            )
+        )
+    if cached is not None:
+        export.save(cached)
+    return export
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Export a range query and print its size and timing."""
+    parser = argparse.ArgumentParser(description="Export a range query to NumPy")
+    parser.add_argument("expr")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090")
+    parser.add_argument("--window", type=float, default=86400, help="s")
+    parser.add_argument("--step", type=float, default=15, help="s")
+    parser.add_argument("--output", help="write the export to this .npz file")
+    parser.add_argument(
+        "--cache", action="store_true", help=f"reuse exports in {CACHE_DIR}"
+    )
+    args = parser.parse_args(argv)
+
+    end = time.time() // args.step * args.step
+    started = time.perf_counter()
+    export = export_range(
+        args.expr,
+        end - args.window,
+        end,
+        args.step,
+        args.prometheus_url,
+        cache_dir=CACHE_DIR if args.cache else None,
+    )
+    print(
+        f"📦 {len(export.series)} series, {export.samples:,} samples "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    if args.output:
+        print(f"💾 Saved to {export.save(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+Recording rule generator for expensive alert and dashboard queries.
+
+``propose_rules`` finds the sub-expressions of a query that do the heavy
+lifting (aggregations over range functions such as
+``sum(rate(x[5m])) by (job)``, or bare ``rate(...)`` calls), names them
+after the ``level:metric:operations`` convention and rewrites the query to
+read the recorded series instead. The rule file is checked with ``promtool``
+inside the Prometheus container, and, once the rules are installed and have
+produced data, the rewritten queries are benchmarked against the originals
+so the speedup is measured.
+
+Usage:
+    python -m src.utils.recording_rules                # propose + promtool check
+    python -m src.utils.recording_rules --all --install --compare
+"""
+
+import argparse
+import re
+import subprocess  # nosec B404 - fixed docker/promtool commands
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import yaml
+
+from src.utils.promql import PromQLExecutor, PromQuery
+from src.utils.promql_benchmark import (
+    MIN_STEP,
+    BenchmarkQuery,
+    QueryBenchmark,
+    benchmark_queries,
+    collect_queries,
+    expand_grafana_variables,
+    recording_rule_candidates,
+)
+
+PROMETHEUS_CONTAINER = "infra-default-prometheus"
+# Matched by the ``rule_files`` glob in prometheus.yml
+CONTAINER_RULE_FILE = "/etc/prometheus/recording_rules.generated.yml"
+RULE_GROUP = "generated_recording_rules"
+OUTPUT_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "reports"
+    / "recording-rules"
+    / "recording_rules.generated.yml"
+)
+DEFAULT_COMPARE_WINDOWS = (300.0,)
+
+RANGE_FUNCTIONS = (
+    "rate",
+    "irate",
+    "increase",
+    "delta",
+    "idelta",
+    "deriv",
+    "avg_over_time",
+    "max_over_time",
+    "min_over_time",
+    "sum_over_time",
+    "count_over_time",
+)
+AGGREGATIONS = ("sum", "avg", "min", "max", "count")
+
+_RANGE_CALL = re.compile(r"\b(" + "|".join(RANGE_FUNCTIONS) + r")\s*\(")
+_AGGREGATION = re.compile(
+    r"\b(" + "|".join(AGGREGATIONS) + r")\s*(?:(by|without)\s*\(([^)]*)\)\s*)?\("
+)
+_TRAILING_GROUPING = re.compile(r"\s*(by|without)\s*\(([^)]*)\)")
+_RANGE_SELECTOR = re.compile(
+    r"([a-zA-Z_:][a-zA-Z0-9_:]*)\s*(\{[^}]*\})?\s*\[\s*([0-9a-z]+)\s*\]"
+)
+_MATCHER = re.compile(r'(\w+)\s*(?:=~|!~|!=|=)\s*"([^"]*)"')
+
+Runner = Callable[..., "subprocess.CompletedProcess[str]"]
+
+
+class RecordingRuleError(Exception):
+    """Custom exception for recording rule generation failures."""
+
+
+@dataclass
+class RecordingRule:
+    """A proposed recording rule and the queries it speeds up."""
+
+    record: str
+    expr: str
+    used_by: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Rewrite:
+    """A query rewritten to read recorded series."""
+
+    original: str
+    rewritten: str
+    records: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RewriteComparison:
+    """Benchmark of an original query next to its rewrite."""
+
+    original: QueryBenchmark
+    rewritten: QueryBenchmark
+
+    @property
+    def speedup(self) -> Optional[float]:
+        """Return original p50 latency over rewritten p50, when both ran."""
+        if not self.original.latencies or not self.rewritten.latencies:
+            return None
+        rewritten = self.rewritten.summary()["p50"]
+        return self.original.summary()["p50"] / rewritten if rewritten else None
+
+
+def _closing_paren(expr: str, opening: int) -> int:
+    """Return the index of the parenthesis closing the one at ``opening``."""
+    depth = 0
+    quote = None
+    for index in range(opening, len(expr)):
+        char = expr[index]
+        if quote:
+            if char == "\\":
+                continue
+            if char == quote and expr[index - 1] != "\\":
+                quote = None
+        elif char in "\"'`":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise RecordingRuleError(f"Unbalanced parentheses in {expr!r}")
+
+
+def _expensive_spans(expr: str) -> List[Tuple[int, int]]:
+    """
+    Return the spans of the sub-expressions of a query worth recording.
+
+    These are the aggregations (with their ``by``/``without`` clause) that
+    contain a range function, and the range function calls themselves, of
+    which only the outermost are kept: a subquery such as
+    ``max_over_time(rate(x[5m])[30m:1m])`` is recorded whole.
+
+    Raises:
+        RecordingRuleError: If the expression has unbalanced parentheses
+    """
+    range_calls = []
+    for match in _RANGE_CALL.finditer(expr):
+        range_calls.append((match.start(), _closing_paren(expr, match.end() - 1) + 1))
+
+    aggregations = []
+    for match in _AGGREGATION.finditer(expr):
+        end = _closing_paren(expr, match.end() - 1) + 1
+        if not match.group(2):
+            trailing = _TRAILING_GROUPING.match(expr, end)
+            end = trailing.end() if trailing else end
+        if any(match.start() < start and stop <= end for start, stop in range_calls):
+            aggregations.append((match.start(), end))
+
+    candidates = set(aggregations + range_calls)
+    spans = [
+        span
+        for span in candidates
+        if not any(
+            other != span and other[0] <= span[0] and span[1] <= other[1]
+            for other in candidates
+        )
+    ]
+    return sorted(spans)
+
+
+def expensive_subexpressions(expr: str) -> List[str]:
+    """Return the sub-expressions of a query worth recording, in order."""
+    return [expr[start:end] for start, end in _expensive_spans(expr)]
+
+
+def rule_name(subexpr: str) -> str:
+    """
+    Name a recorded sub-expression as ``level:metric:operations``.
+
+    The level is the ``by`` labels (``without_<labels>`` for ``without``,
+    ``total`` for a full aggregation, ``series`` when nothing is
+    aggregated); the metric carries its label matchers; the operations are
+    the range function and window, prefixed by the aggregation unless it is
+    ``sum``.
+    """
+    selector = _RANGE_SELECTOR.search(subexpr)
+    function = _RANGE_CALL.search(subexpr)
+    if selector is None or function is None:
+        raise RecordingRuleError(f"No range selector in {subexpr!r}")
+
+    metric = selector.group(1)
+    for label, value in _MATCHER.findall(selector.group(2) or ""):
+        metric += f"_{label}_{re.sub(r'[^a-zA-Z0-9_]', '_', value)}"
+    operations = f"{function.group(1)}{selector.group(3)}"
+
+    level = "series"
+    aggregation = _AGGREGATION.match(subexpr)
+    if aggregation is not None:
+        grouping = aggregation.group(2), aggregation.group(3)
+        if not grouping[0]:
+            trailing = re.search(r"(by|without)\s*\(([^)]*)\)\s*$", subexpr)
+            grouping = (trailing.group(1), trailing.group(2)) if trailing else grouping
+        labels = "_".join(label.strip() for label in (grouping[1] or "").split(","))
+        labels = labels.strip("_")
+        if grouping[0] == "without":
+            level = f"without_{labels}"
+        else:
+            level = labels or "total"
+        if aggregation.group(1) != "sum":
+            operations = f"{aggregation.group(1)}_{operations}"
+    return f"{level}:{metric}:{operations}"
+
+
+def propose_rules(exprs: Iterable[str]) -> Tuple[List[RecordingRule], List[Rewrite]]:
+    """
+    Propose recording rules for the expensive parts of ``exprs``.
+
+    Grafana variables are expanded for the smallest step first, since rule
+    expressions cannot contain them. Identical sub-expressions shared by
+    several queries (the p50/p95/p99 panels of one histogram, say) become
+    one rule.
+
+    Returns:
+        The rules, and every query that changed with its rewrite
+    """
+    rules: Dict[str, RecordingRule] = {}
+    names: Dict[str, str] = {}
+    rewrites = []
+
+    for original in dict.fromkeys(exprs):
+        expr = expand_grafana_variables(original, {}, MIN_STEP)
+        pieces = []
+        records = []
+        position = 0
+        for start, end in _expensive_spans(expr):
+            subexpr = expr[start:end]
+            rule = rules.get(subexpr)
+            if rule is None:
+                name = base = rule_name(subexpr)
+                suffix = 2
+                while name in names:
+                    name = f"{base}_{suffix}"
+                    suffix += 1
+                names[name] = subexpr
+                rule = rules[subexpr] = RecordingRule(name, subexpr)
+            rule.used_by.append(original)
+            records.append(rule.record)
+            pieces += [expr[position:start], rule.record]
+            position = end
+        rewritten = "".join(pieces) + expr[position:]
+        if records and rewritten != original:
+            rewrites.append(Rewrite(original, rewritten, records))
+    return list(rules.values()), rewrites
+
+
+def render_rule_file(
+    rules: Sequence[RecordingRule], group: str = RULE_GROUP, interval: str = "15s"
+) -> str:
+    """Render the rules as a Prometheus rule file."""
+    content = {
+        "groups": [
+            {
+                "name": group,
+                "interval": interval,
+                "rules": [{"record": rule.record, "expr": rule.expr} for rule in rules],
+            }
+        ]
+    }
+    return yaml.safe_dump(content, sort_keys=False, allow_unicode=True)
+
+
+def write_rule_file(rules: Sequence[RecordingRule], path: Union[str, Path]) -> Path:
+    """Write the rule file and return its path (the CLI uses ``OUTPUT_PATH``)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render_rule_file(rules), encoding="utf-8")
+    return path
+
+
+def validate_rules(
+    path: Union[str, Path],
+    container: str = PROMETHEUS_CONTAINER,
+    runner: Runner = subprocess.run,
+) -> Tuple[bool, str]:
+    """
+    Check a rule file with ``promtool check rules`` inside the container.
+
+    Returns:
+        Whether promtool accepted the file, and its output
+    """
+    staged = "/tmp/recording_rules.check.yml"  # nosec B108 - container path
+    commands = [
+        ["docker", "cp", str(path), f"{container}:{staged}"],
+        ["docker", "exec", container, "promtool", "check", "rules", staged],
+    ]
+    output = []
+    for command in commands:
+        result = runner(command, capture_output=True, text=True, check=False)
+        output.append((result.stdout + result.stderr).strip())
+        if result.returncode != 0:
+            return False, "\n".join(output)
+    return True, "\n".join(output)
+
+
+def install_rules(
+    path: Union[str, Path],
+    container: str = PROMETHEUS_CONTAINER,
+    runner: Runner = subprocess.run,
+) -> None:
+    """
+    Copy the rule file into the container and make Prometheus reload it.
+
+    Raises:
+        RecordingRuleError: If a docker command fails
+    """
+    commands = [
+        ["docker", "cp", str(path), f"{container}:{CONTAINER_RULE_FILE}"],
+        ["docker", "kill", "--signal", "HUP", container],
+    ]
+    for command in commands:
+        result = runner(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            raise RecordingRuleError(
+                f"{' '.join(command)} failed: {(result.stderr or result.stdout).strip()}"
+            )
+
+
+def wait_for_records(
+    executor: PromQLExecutor, records: Iterable[str], timeout: float = 120
+) -> List[str]:
+    """
+    Wait until every recorded series has data.
+
+    Returns:
+        The records still without data when the timeout expired
+    """
+    pending = list(dict.fromkeys(records))
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        results = executor.run(PromQuery(f"count({record})") for record in pending)
+        pending = [
+            record
+            for record in pending
+            if not results[PromQuery(f"count({record})")].series
+        ]
+        if pending:
+            time.sleep(MIN_STEP / 3)
+    return pending
+
+
+def compare_rewrites(
+    rewrites: Sequence[Rewrite],
+    prometheus_url: str = "http://localhost:9090",
+    windows: Iterable[float] = DEFAULT_COMPARE_WINDOWS,
+    repetitions: int = 10,
+) -> List[RewriteComparison]:
+    """
+    Benchmark every rewritten query next to its original.
+
+    Recorded series only exist from the moment the rules were loaded, so
+    range windows should not reach further back than that; the default
+    compares instant queries and a five-minute window.
+    """
+    windows = list(windows)
+    queries = []
+    for rewrite in rewrites:
+        queries.append(BenchmarkQuery(rewrite.original, ["original"]))
+        queries.append(BenchmarkQuery(rewrite.rewritten, ["rewritten"]))
+    benchmarks = benchmark_queries(queries, prometheus_url, windows, repetitions)
+
+    modes = len(windows) + 1
+    comparisons: List[RewriteComparison] = []
+    for index in range(len(rewrites)):
+        originals = benchmarks[2 * index * modes : (2 * index + 1) * modes]
+        rewritten = benchmarks[(2 * index + 1) * modes : (2 * index + 2) * modes]
+        comparisons.extend(
+            RewriteComparison(before, after)
+            for before, after in zip(originals, rewritten)
+        )
+    return comparisons
+
+
+def format_comparison_report(comparisons: Sequence[RewriteComparison]) -> str:
+    """Render original versus rewritten latency and samples touched."""
+    header = (
+        f"{'query':<50} {'mode':<10} {'before ms':>9} {'after ms':>9} "
+        f"{'speedup':>8} {'touched before':>15} {'after':>10}"
+    )
+    lines = ["📼 Recording rule speedup (p50)", header, "-" * len(header)]
+    for comparison in comparisons:
+        before, after = comparison.original, comparison.rewritten
+        speedup = comparison.speedup
+        lines.append(
+            f"{before.query.expr[:50]:<50} {before.mode:<10} "
+            f"{before.summary()['p50'] * 1000:>9.1f} "
+            f"{after.summary()['p50'] * 1000:>9.1f} "
+            f"{(f'{speedup:.1f}x' if speedup else '-'):>8} "
+            f"{before.samples_touched:>15,} {after.samples_touched:>10,}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Propose, validate and optionally install and measure recording rules."""
+    parser = argparse.ArgumentParser(description="Generate recording rules")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="propose rules for every query, not only benchmark candidates",
+    )
+    parser.add_argument("--output", default=str(OUTPUT_PATH))
+    parser.add_argument("--install", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--repetitions", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    queries = collect_queries()
+    if args.all:
+        exprs = [query.expr for query in queries]
+    else:
+        benchmarks = benchmark_queries(queries, args.prometheus_url, repetitions=3)
+        exprs = list(recording_rule_candidates(benchmarks))
+
+    rules, rewrites = propose_rules(exprs)
+    if not rules:
+        print("✅ No query needs a recording rule")
+        return
+
+    path = write_rule_file(rules, args.output)
+    print(f"📝 {len(rules)} recording rule(s) written to {path}")
+    for rewrite in rewrites:
+        print(f"  {rewrite.original}\n    → {rewrite.rewritten}")
+
+    valid, output = validate_rules(path)
+    print(f"{'✅' if valid else '❌'} promtool check rules:\n{output}")
+    if not valid or not args.install:
+        return
+
+    install_rules(path)
+    executor = PromQLExecutor(args.prometheus_url)
+    missing = wait_for_records(executor, [rule.record for rule in rules])
+    if missing:
+        print(f"⚠️  No data yet for: {', '.join(missing)}")
+    if args.compare:
+        comparisons = compare_rewrites(
+            rewrites, args.prometheus_url, repetitions=args.repetitions
+        )
+        print(format_comparison_report(comparisons))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Scrape cost profile of every Prometheus job.
+
+Prometheus records, per target and scrape, how long the scrape took and how
+many samples and new series it produced. ``profile_scrape_costs`` pulls
+those series over a time window with one range query per metric, computes
+percentiles per target and per job, and ranks the targets by how much of
+their scrape interval (15 s here) a slow scrape uses up.
+
+Usage:
+    python -m src.utils.scrape_cost
+    python -m src.utils.scrape_cost --window 3600
+"""
+
+import argparse
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import requests
+
+from src.utils.perf_stats import summarize
+from src.utils.prometheus_config import load_scrape_jobs
+from src.utils.promql import PromQLExecutor, PromQuery, QueryResult
+
+SCRAPE_METRICS = (
+    "scrape_duration_seconds",
+    "scrape_samples_scraped",
+    "scrape_series_added",
+    "scrape_samples_post_metric_relabeling",
+)
+DEFAULT_WINDOW = 3600
+DEFAULT_INTERVAL = 15.0
+
+
+@dataclass
+class ScrapeCost:
+    """Scrape statistics of one target (or one whole job)."""
+
+    job: str
+    instance: str
+    interval: float
+    stats: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def interval_usage(self) -> float:
+        """Return the p95 scrape duration as a fraction of the interval."""
+        duration = self.stats.get("scrape_duration_seconds", {})
+        return duration.get("p95", 0.0) / self.interval if self.interval else 0.0
+
+
+@dataclass
+class ScrapeCostProfile:
+    """Per-target and per-job scrape costs over a window."""
+
+    window: float
+    targets: List[ScrapeCost] = field(default_factory=list)
+    jobs: Dict[str, ScrapeCost] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def ranked(self) -> List[ScrapeCost]:
+        """Return the targets, most expensive relative to their interval first."""
+        return sorted(self.targets, key=lambda cost: cost.interval_usage, reverse=True)
+
+
+def scrape_cost_queries(
+    jobs: Iterable[str], window: float, step: float, end: Optional[float] = None
+) -> Dict[str, PromQuery]:
+    """
+    Build one range query per scrape metric, restricted to ``jobs``.
+
+    Job names are matched literally: regex metacharacters are escaped, and the
+    escapes doubled for the PromQL string literal.
+
+    Returns:
+        Range query per metric name
+    """
+    selector = "|".join(re.escape(job).replace("\\", "\\\\") for job in sorted(jobs))
+    return {
+        metric: PromQuery.range(f'{metric}{{job=~"{selector}"}}', window, step, end)
+        for metric in SCRAPE_METRICS
+    }
+
+
+def _values(series: Mapping) -> List[float]:
+    values = (float(value) for _, value in series.get("values", []))
+    return [value for value in values if not math.isnan(value)]
+
+
+def build_profile(
+    results: Mapping[str, QueryResult],
+    intervals: Mapping[str, float],
+    window: float,
+) -> ScrapeCostProfile:
+    """
+    Turn range query results into per-target and per-job percentiles.
+
+    Args:
+        results: Range query result per scrape metric
+        intervals: Scrape interval per job in seconds
+        window: Window the queries covered, in seconds
+
+    Returns:
+        ScrapeCostProfile; failed metrics are listed in ``errors``
+    """
+    profile = ScrapeCostProfile(window)
+    per_target: Dict[Tuple[str, str], Dict[str, List[float]]] = {}
+    per_job: Dict[str, Dict[str, List[float]]] = {}
+
+    for metric, result in results.items():
+        if not result.ok:
+            profile.errors[metric] = result.error or "query failed"
+            continue
+        for series in result.result:
+            labels = series.get("metric", {})
+            job, instance = labels.get("job", ""), labels.get("instance", "")
+            values = _values(series)
+            per_target.setdefault((job, instance), {}).setdefault(metric, []).extend(
+                values
+            )
+            per_job.setdefault(job, {}).setdefault(metric, []).extend(values)
+
+    for (job, instance), metrics in per_target.items():
+        interval = intervals.get(job, DEFAULT_INTERVAL)
+        stats = {metric: summarize(values) for metric, values in metrics.items()}
+        profile.targets.append(ScrapeCost(job, instance, interval, stats))
+    for job, metrics in per_job.items():
+        interval = intervals.get(job, DEFAULT_INTERVAL)
+        stats = {metric: summarize(values) for metric, values in metrics.items()}
+        profile.jobs[job] = ScrapeCost(job, "*", interval, stats)
+    return profile
+
+
+def profile_scrape_costs(
+    prometheus_url: str = "http://localhost:9090",
+    window: float = DEFAULT_WINDOW,
+    session: Optional[requests.Session] = None,
+    intervals: Optional[Mapping[str, float]] = None,
+) -> ScrapeCostProfile:
+    """
+    Profile scrape cost of every job in ``prometheus.yml`` over a window.
+
+    Args:
+        prometheus_url: Prometheus base URL
+        window: Lookback window in seconds
+        session: Session for the queries
+        intervals: Scrape interval per job; read from ``prometheus.yml`` by
+            default
+
+    Returns:
+        ScrapeCostProfile with percentiles per target and per job
+    """
+    if intervals is None:
+        intervals = {
+            name: job.scrape_interval for name, job in load_scrape_jobs().items()
+        }
+    # One point per scrape of the fastest job
+    step = min(intervals.values(), default=DEFAULT_INTERVAL)
+    queries = scrape_cost_queries(intervals, window, step)
+    results = PromQLExecutor(prometheus_url, session=session).run(queries.values())
+    return build_profile(
+        {metric: results[query] for metric, query in queries.items()},
+        intervals,
+        window,
+    )
+
+
+def format_scrape_cost_report(profile: ScrapeCostProfile, top: int = 10) -> str:
+    """Render the most expensive targets and per-job percentiles as text."""
+
+    def stat(cost: ScrapeCost, metric: str, key: str) -> float:
+        return cost.stats.get(metric, {}).get(key, 0.0)
+
+    header = (
+        f"{'job':<28} {'instance':<24} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'% intvl':>8} {'samples':>9} {'post-rel':>9} {'new series':>10}"
+    )
+    lines = [
+        f"💸 Scrape cost over the last {profile.window / 60:.0f} min "
+        "(ranked by p95 duration / interval)",
+        header,
+        "-" * len(header),
+    ]
+    for cost in profile.ranked()[:top]:
+        lines.append(
+            f"{cost.job[:28]:<28} {cost.instance[:24]:<24} "
+            f"{stat(cost, 'scrape_duration_seconds', 'p50') * 1000:>8.1f} "
+            f"{stat(cost, 'scrape_duration_seconds', 'p95') * 1000:>8.1f} "
+            f"{cost.interval_usage * 100:>7.2f}% "
+            f"{stat(cost, 'scrape_samples_scraped', 'p95'):>9,.0f} "
+            f"{stat(cost, 'scrape_samples_post_metric_relabeling', 'p95'):>9,.0f} "
+            f"{stat(cost, 'scrape_series_added', 'max'):>10,.0f}"
+        )
+
+    lines.append("")
+    lines.append("Per job (p50 / p95 / p99 scrape duration, ms):")
+    for job, cost in sorted(profile.jobs.items()):
+        duration = cost.stats.get("scrape_duration_seconds", {})
+        lines.append(
+            f"  {job:<32} {duration.get('p50', 0) * 1000:>8.1f} "
+            f"{duration.get('p95', 0) * 1000:>8.1f} "
+            f"{duration.get('p99', 0) * 1000:>8.1f}"
+        )
+    for metric, error in profile.errors.items():
+        lines.append(f"❌ {metric}: {error[:100]}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Profile the local stack and print the report."""
+    parser = argparse.ArgumentParser(description="Profile Prometheus scrape cost")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="s")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    profile = profile_scrape_costs(args.prometheus_url, args.window)
+    print(format_scrape_cost_report(profile, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Wait for Prometheus to scrape a set of jobs.
+
+``wait_for_scrapes`` follows several jobs at once and asks Prometheus only
+for the active targets of the jobs still pending, one ``scrapePool`` each.
+Target health only changes when a scrape completes, so instead of polling on
+a fixed cadence each job is polled again just after its next scrape is due,
+derived from the target's ``lastScrape`` and the job's ``scrape_interval``
+in ``prometheus.yml``.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import requests
+
+from src.utils.json_stream import JsonStreamError, iter_response_json_path
+from src.utils.prometheus_config import load_scrape_jobs
+
+DEFAULT_POLL_INTERVAL = 5.0
+MIN_POLL_DELAY = 0.25
+# Allowance for the scrape itself and the target list update after it is due
+SCRAPE_SLACK = 0.5
+MAX_WORKERS = 8
+
+# Fractions of any length; Python 3.10's fromisoformat takes only 3 or 6 digits
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+@dataclass
+class ScrapeWaitResult:
+    """Outcome of a multi-job scrape wait."""
+
+    healthy: Dict[str, float] = field(default_factory=dict)
+    waited: Dict[str, float] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    polls: int = 0
+
+    @property
+    def all_healthy(self) -> bool:
+        """Return True if every job was scraped successfully."""
+        return not self.timed_out
+
+    def describe(self) -> str:
+        """Return a one-line summary naming every job still unhealthy."""
+        parts = [f"{len(self.healthy)} healthy after {self.polls} polls"]
+        if self.timed_out:
+            parts.append(f"timed out: {', '.join(self.timed_out)}")
+        return "; ".join(parts)
+
+
+def parse_scrape_time(value: Optional[str]) -> Optional[float]:
+    """
+    Convert a target's ``lastScrape`` (RFC 3339, nanoseconds) to epoch.
+
+    Go trims trailing zeros from the fraction (``...:00.12Z``), so it is
+    padded or trimmed to microseconds and ``Z`` becomes ``+00:00``, as
+    ``datetime.fromisoformat`` needs before Python 3.11.
+
+    Returns:
+        Seconds since the epoch, or None for never-scraped targets (which
+        Prometheus reports as year 1)
+    """
+    if not value:
+        return None
+    value = _FRACTION.sub(lambda match: "." + match[1][:6].ljust(6, "0"), value)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.timestamp() if parsed.year >= 1970 else None
+
+
+def next_poll_delay(last_scrape: Optional[float], interval: float, now: float) -> float:
+    """
+    Return how long to wait before a job's health can next change.
+
+    Args:
+        last_scrape: Epoch of the target's latest scrape, if it had one
+        interval: The job's scrape interval in seconds
+        now: Current epoch
+
+    Returns:
+        Seconds until just after the next scrape is due, between
+        ``MIN_POLL_DELAY`` and one interval; a quarter interval for targets
+        that were not scraped yet (their first scrape is spread over the
+        interval)
+    """
+    if last_scrape is None:
+        return max(MIN_POLL_DELAY, interval / 4)
+    due = last_scrape + interval + SCRAPE_SLACK - now
+    return min(max(due, MIN_POLL_DELAY), interval)
+
+
+def fetch_job_targets(
+    session: requests.Session, prometheus_url: str, job: str, timeout: float = 10
+) -> List[Dict[str, Any]]:
+    """
+    Fetch the active targets of one job.
+
+    The ``scrapePool`` filter keeps the response to the job's targets on
+    Prometheus versions that support it; older ones ignore it and the list
+    is filtered here while it streams.
+
+    Raises:
+        requests.RequestException: On connection errors
+        JsonStreamError: If the response body is not the expected JSON
+    """
+    response = session.get(
+        f"{prometheus_url}/api/v1/targets",
+        params={"state": "active", "scrapePool": job},
+        timeout=timeout,
+        stream=True,
+    )
+    if response.status_code != 200:
+        response.close()
+        return []
+    return [
+        target
+        for target in iter_response_json_path(response, "data.activeTargets.*")
+        if target.get("scrapePool") == job or target.get("labels", {}).get("job") == job
+    ]
+
+
+def wait_for_scrapes(
+    jobs: Iterable[str],
+    prometheus_url: str = "http://localhost:9090",
+    timeout: float = 60,
+    intervals: Optional[Mapping[str, float]] = None,
+    session: Optional[requests.Session] = None,
+) -> ScrapeWaitResult:
+    """
+    Wait until Prometheus has scraped every job successfully.
+
+    Args:
+        jobs: Job names (scrape pools) to wait for
+        prometheus_url: Prometheus base URL
+        timeout: Overall deadline in seconds, shared by all jobs
+        intervals: Scrape interval per job in seconds; read from
+            ``prometheus.yml`` by default (``DEFAULT_POLL_INTERVAL`` for jobs
+            it does not list)
+        session: Session to poll with
+
+    Returns:
+        ScrapeWaitResult with, per healthy job, the epoch of the first
+        healthy scrape observed (at most one interval after the actual
+        first one) and the seconds waited, plus the jobs that timed out
+    """
+    pending = list(dict.fromkeys(jobs))
+    if intervals is None:
+        intervals = {
+            name: job.scrape_interval for name, job in load_scrape_jobs().items()
+        }
+    owned = session is None
+    session = session or requests.Session()
+    result = ScrapeWaitResult()
+    started = time.monotonic()
+    deadline = started + timeout
+    next_poll = {job: started for job in pending}
+
+    def poll(job: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return fetch_job_targets(session, prometheus_url, job)
+        except (requests.RequestException, JsonStreamError):
+            return None
+
+    workers = max(1, min(MAX_WORKERS, len(pending)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                due = [job for job in pending if next_poll[job] <= now]
+                if not due:
+                    wake = min(min(next_poll[job] for job in pending), deadline)
+                    time.sleep(wake - now)
+                    continue
+
+                result.polls += len(due)
+                for job, targets in zip(due, pool.map(poll, due)):
+                    if _record_scrapes(result, job, targets or [], started):
+                        pending.remove(job)
+                        continue
+                    interval = intervals.get(job, DEFAULT_POLL_INTERVAL)
+                    next_poll[job] = time.monotonic() + next_poll_delay(
+                        _latest_scrape(targets or []), interval, time.time()
+                    )
+    finally:
+        if owned:
+            session.close()
+
+    result.timed_out = pending
+    return result
+
+
+def _record_scrapes(
+    result: ScrapeWaitResult, job: str, targets: List[Dict[str, Any]], started: float
+) -> bool:
+    """Record the job's first healthy scrape; return False if none is up."""
+    healthy = [
+        parse_scrape_time(target.get("lastScrape"))
+        for target in targets
+        if target.get("health") == "up"
+    ]
+    if not healthy:
+        return False
+    known = [moment for moment in healthy if moment is not None]
+    result.healthy[job] = min(known) if known else time.time()
+    result.waited[job] = time.monotonic() - started
+    return True
+
+
+def _latest_scrape(targets: List[Dict[str, Any]]) -> Optional[float]:
+    """Return the epoch of the most recent scrape among the targets."""
+    moments = [parse_scrape_time(target.get("lastScrape")) for target in targets]
+    return max((moment for moment in moments if moment is not None), default=None)
@@ -0,0 +1,135 @@
+"""
+Concurrent readiness gating for HTTP services.
+
+``wait_for_urls`` polls every URL from its own thread with jittered
+exponential backoff that starts in the millisecond range, so a service that
+comes up a few milliseconds after the first probe is noticed almost
+immediately while a slow one is not hammered. It returns as soon as every
+URL answered (or its deadline passed) and reports exactly which ones timed
+out. Refused connections are the normal state of a service that is still
+starting, so polling never goes through the probe circuit breakers.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+INITIAL_DELAY = 0.005
+MAX_DELAY = 2.0
+BACKOFF_FACTOR = 2.0
+REQUEST_TIMEOUT = 5.0
+
+
+@dataclass
+class WaitResult:
+    """Outcome of a multi-URL wait."""
+
+    ready: Dict[str, float] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+
+    @property
+    def all_ready(self) -> bool:
+        """Return True if every URL became ready."""
+        return not self.timed_out
+
+    def describe(self) -> str:
+        """Return a one-line summary naming every URL that is not ready."""
+        parts = [f"{len(self.ready)} ready"]
+        if self.timed_out:
+            parts.append(f"timed out: {', '.join(self.timed_out)}")
+        return "; ".join(parts)
+
+
+def backoff_delays(
+    initial: float = INITIAL_DELAY,
+    factor: float = BACKOFF_FACTOR,
+    max_delay: float = MAX_DELAY,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> Iterator[float]:
+    """
+    Yield jittered exponential backoff delays.
+
+    Each delay is drawn uniformly from ``[ceiling / 2, ceiling]`` where the
+    ceiling doubles from ``initial`` up to ``max_delay``; the jitter keeps
+    many pollers from probing in lockstep.
+    """
+    ceiling = initial
+    while True:
+        yield rng(ceiling / 2, ceiling)
+        ceiling = min(ceiling * factor, max_delay)
+
+
+def _wait_for_url(
+    url: str,
+    deadline: float,
+    auth: Optional[Tuple[str, str]],
+    is_ready: Callable[[requests.Response], bool],
+) -> Optional[float]:
+    """Poll one URL until ready; return seconds waited or None on timeout."""
+    started = time.monotonic()
+    delays = backoff_delays()
+
+    with requests.Session() as session:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                response = session.get(
+                    url,
+                    timeout=min(REQUEST_TIMEOUT, remaining),
+                    auth=HTTPBasicAuth(*auth) if auth else None,
+                    verify=False,  # For self-signed certificates in dev
+                )
+                if is_ready(response):
+                    return time.monotonic() - started
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            time.sleep(min(next(delays), max(0.0, deadline - time.monotonic())))
+
+
+def wait_for_urls(
+    urls: Iterable[str],
+    timeout: float = 30,
+    auth: Optional[Mapping[str, Tuple[str, str]]] = None,
+    is_ready: Callable[[requests.Response], bool] = lambda r: r.status_code < 500,
+) -> WaitResult:
+    """
+    Wait for several HTTP services concurrently.
+
+    Args:
+        urls: Full URLs to poll
+        timeout: Overall deadline in seconds, shared by all URLs
+        auth: Optional basic auth tuple per URL
+        is_ready: Predicate on the response; by default any non-5xx answer
+
+    Returns:
+        WaitResult with the time each ready URL took and the URLs that
+        timed out
+    """
+    auth = auth or {}
+    deadline = time.monotonic() + timeout
+    result = WaitResult()
+
+    pending = list(dict.fromkeys(urls))
+    if not pending:
+        return result
+
+    with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+        futures = {
+            url: executor.submit(_wait_for_url, url, deadline, auth.get(url), is_ready)
+            for url in pending
+        }
+        for url, future in futures.items():
+            waited = future.result()
+            if waited is None:
+                result.timed_out.append(url)
+            else:
+                result.ready[url] = waited
+
+    return result
@@ -0,0 +1,556 @@
+"""
+Vectorized threshold and SLO evaluation over metric history.
+
+``scripts/performance-monitor.sh`` compares one averaged sample of CPU,
+memory and disk usage against fixed thresholds. This module evaluates the
+same thresholds over a whole history at once: each resource is a
+``MetricHistory`` (one row per series, one column per step) and every
+computation works on the full matrix with NumPy:
+
+- rolling percentiles over a trailing window,
+- breach windows, i.e. runs of samples at or above the threshold,
+- SLO burn rates over several windows, where the objective is the fraction
+  of samples below the threshold, and multiwindow burn rate alerts
+  (a long and a short window must both exceed the same burn rate).
+
+Breaches stay arrays as well (``Breaches``). A week of 15-second samples
+for 60 series, the default stack at full scrape resolution, evaluates in
+well under a second even when hundreds of thousands of samples breach.
+
+Usage:
+    python -m src.utils.slo_eval
+    python -m src.utils.slo_eval --window 604800 --step 60 --objective 0.99
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import requests
+
+from src.utils.range_export import RangeExport, export_range
+
+# Same thresholds as scripts/performance-monitor.sh; warning starts 10 below
+THRESHOLDS = {"cpu": 80.0, "memory": 85.0, "disk": 80.0}
+WARNING_MARGIN = 10.0
+_FILESYSTEMS = 'fstype!~"tmpfs|overlay|squashfs"'
+RESOURCE_QUERIES = {
+    "cpu": '100 * sum by (name) (rate(container_cpu_usage_seconds_total{name!=""}[1m]))',
+    "memory": (
+        '100 * sum by (name) (container_memory_working_set_bytes{name!=""})'
+        ' / sum by (name) (container_spec_memory_limit_bytes{name!=""} > 0)'
+    ),
+    "disk": (
+        f"100 * (1 - node_filesystem_avail_bytes{{{_FILESYSTEMS}}}"
+        f" / node_filesystem_size_bytes{{{_FILESYSTEMS}}})"
+    ),
+}
+DEFAULT_OBJECTIVE = 0.99
+DEFAULT_WINDOW = 7 * 86400
+DEFAULT_STEP = 60.0
+# (long window, short window, burn rate) pairs for multiwindow alerting
+BURN_RATE_WINDOWS: Tuple[Tuple[float, float, float], ...] = (
+    (3600, 300, 14.4),
+    (6 * 3600, 1800, 6.0),
+    (24 * 3600, 7200, 3.0),
+    (3 * 86400, 6 * 3600, 1.0),
+)
+# Upper bound on elements sorted at once by rolling_percentile
+_BLOCK_ELEMENTS = 1_000_000
+
+
+@dataclass
+class MetricHistory:
+    """
+    Values of many series on a shared, evenly spaced time grid.
+
+    Attributes:
+        timestamps: Grid of shape ``(T,)`` in Unix seconds
+        values: Matrix of shape ``(S, T)``; NaN where a series has no sample
+        labels: Label set of each row
+    """
+
+    timestamps: np.ndarray
+    values: np.ndarray
+    labels: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def step(self) -> float:
+        """Return the grid resolution in seconds."""
+        if len(self.timestamps) < 2:
+            return 0.0
+        return float(self.timestamps[1] - self.timestamps[0])
+
+    def samples_in(self, seconds: float) -> int:
+        """Return the number of grid steps in a duration (at least one)."""
+        return max(1, round(seconds / self.step)) if self.step else 1
+
+    @classmethod
+    def from_export(cls, export: RangeExport) -> "MetricHistory":
+        """Place every series of a range export on the export's time grid."""
+        timestamps = np.arange(
+            export.start, export.end + export.step / 2, export.step, dtype=np.float64
+        )
+        values = np.full((len(export.series), len(timestamps)), np.nan)
+        for row, series in enumerate(export.series):
+            columns = np.rint((series.timestamps - export.start) / export.step)
+            values[row, columns.astype(np.int64)] = series.values
+        return cls(timestamps, values, [series.labels for series in export.series])
+
+
+@dataclass
+class Breach:
+    """A run of consecutive samples at or above the threshold."""
+
+    labels: Dict[str, str]
+    start: float
+    end: float
+    peak: float
+
+    @property
+    def duration(self) -> float:
+        """Return the length of the breach in seconds."""
+        return self.end - self.start
+
+
+@dataclass
+class Breaches:
+    """
+    Every breach of a history as parallel arrays, ordered by series, then time.
+
+    Indexing or iterating yields ``Breach`` objects one at a time.
+
+    Attributes:
+        labels: Label set of every row of the history
+        rows: History row of each breach
+        starts: First sample of each breach in Unix seconds
+        ends: One step after the last sample of each breach
+        peaks: Highest value of each breach
+    """
+
+    labels: List[Dict[str, str]] = field(default_factory=list)
+    rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    starts: np.ndarray = field(default_factory=lambda: np.empty(0))
+    ends: np.ndarray = field(default_factory=lambda: np.empty(0))
+    peaks: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    @property
+    def durations(self) -> np.ndarray:
+        """Return the length of every breach in seconds."""
+        return self.ends - self.starts
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> Breach:
+        return Breach(
+            self.labels[self.rows[index]],
+            float(self.starts[index]),
+            float(self.ends[index]),
+            float(self.peaks[index]),
+        )
+
+    def __iter__(self) -> Iterator[Breach]:
+        return (self[index] for index in range(len(self)))
+
+    def longest(self, count: int) -> List[Breach]:
+        """Return the ``count`` longest breaches, longest first."""
+        order = np.argsort(-self.durations, kind="stable")[:count]
+        return [self[index] for index in order]
+
+
+@dataclass
+class BurnRateAlert:
+    """A series whose error budget burned too fast in both windows of a pair."""
+
+    labels: Dict[str, str]
+    long_window: float
+    short_window: float
+    burn_rate: float
+    firing_seconds: float
+    firing_now: bool
+    peak: float
+
+
+@dataclass
+class ThresholdEvaluation:
+    """Threshold and SLO evaluation of one resource over its history."""
+
+    resource: str
+    threshold: float
+    objective: float
+    history: MetricHistory
+    rolling: np.ndarray
+    breaches: Breaches = field(default_factory=Breaches)
+    alerts: List[BurnRateAlert] = field(default_factory=list)
+
+    @property
+    def compliance(self) -> np.ndarray:
+        """Return the fraction of samples below the threshold, per series."""
+        valid = ~np.isnan(self.history.values)
+        good = (self.history.values < self.threshold) & valid
+        counts = valid.sum(axis=1)
+        return np.divide(
+            good.sum(axis=1),
+            counts,
+            out=np.full(len(counts), np.nan),
+            where=counts > 0,
+        )
+
+    def status(self) -> List[str]:
+        """
+        Return ``critical``, ``warning`` or ``ok`` per series.
+
+        The latest rolling percentile is graded the way the monitor script
+        grades a single sample.
+        """
+        statuses = []
+        for row in self.rolling:
+            valid = row[~np.isnan(row)]
+            latest = valid[-1] if len(valid) else np.nan
+            if latest >= self.threshold:
+                statuses.append("critical")
+            elif latest >= self.threshold - WARNING_MARGIN:
+                statuses.append("warning")
+            else:
+                statuses.append("ok")
+        return statuses
+
+
+def rolling_percentile(values: np.ndarray, window: int, quantile: float) -> np.ndarray:
+    """
+    Compute a trailing percentile of every row over ``window`` samples.
+
+    The first ``window - 1`` columns use the samples available so far and
+    NaN samples are ignored; columns whose window has no sample are NaN.
+    Percentiles interpolate linearly between closest ranks, like
+    ``perf_stats.percentile``.
+
+    Args:
+        values: Matrix of shape ``(S, T)``
+        window: Window length in samples
+        quantile: Quantile between 0.0 and 1.0
+
+    Returns:
+        Matrix of shape ``(S, T)``
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    rows, columns = values.shape
+    padded = np.pad(values, ((0, 0), (window - 1, 0)), constant_values=np.nan)
+    count = _trailing_sums(np.cumsum(~np.isnan(values), axis=1, dtype=np.int32), window)
+    gaps = count < window
+    full_lower, full_upper, full_weight = _closest_ranks(np.array(window), quantile)
+    result = np.empty((rows, columns))
+    block = max(1, _BLOCK_ELEMENTS // max(1, rows * window))
+    for first in range(0, columns, block):
+        last = min(first + block, columns)
+        view = np.lib.stride_tricks.sliding_window_view(
+            padded[:, first : last + window - 1], window, axis=1
+        )
+        # NaN sorts last, so the valid samples are the first ``count``
+        ordered = np.sort(view, axis=-1)
+        low, high = ordered[..., full_lower], ordered[..., full_upper]
+        result[:, first:last] = low + (high - low) * full_weight
+        # Windows with missing samples interpolate between their own ranks
+        gap_rows, gap_columns = np.nonzero(gaps[:, first:last])
+        lower, upper, weight = _closest_ranks(
+            count[gap_rows, gap_columns + first], quantile
+        )
+        low = ordered[gap_rows, gap_columns, lower]
+        high = ordered[gap_rows, gap_columns, upper]
+        result[gap_rows, gap_columns + first] = low + (high - low) * weight
+    return result
+
+
+def _closest_ranks(
+    count: np.ndarray, quantile: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the ranks around a quantile of ``count`` samples and its weight."""
+    highest = np.maximum(count - 1, 0)
+    rank = quantile * highest
+    lower = np.floor(rank).astype(np.int64)
+    return lower, np.minimum(lower + 1, highest), rank - lower
+
+
+def _trailing_sums(totals: np.ndarray, window: int) -> np.ndarray:
+    """Turn running totals along each row into sums over trailing windows."""
+    sums = totals.copy()
+    sums[:, window:] -= totals[:, :-window]
+    return sums
+
+
+def breach_windows(
+    history: MetricHistory, threshold: float, min_duration: float = 0.0
+) -> Breaches:
+    """
+    Find every run of samples at or above ``threshold``.
+
+    Missing samples end a run. A breach lasts from its first sample to one
+    step after its last.
+
+    Args:
+        history: Series to scan
+        threshold: Breach level (inclusive, as in the monitor script)
+        min_duration: Shortest breach to report, in seconds
+
+    Returns:
+        Breaches ordered by series, then time
+    """
+    values = history.values
+    rows, columns = values.shape
+    if not columns:
+        return Breaches(history.labels)
+    above = np.zeros((rows, columns + 2), dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        above[:, 1:-1] = values >= threshold
+    edges = np.diff(above, axis=1)
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    if not len(starts):
+        return Breaches(history.labels)
+
+    # Peak of each run in one reduceat over the flattened matrix
+    flat = np.append(values.ravel(), np.nan)
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2] = start_rows * columns + starts
+    bounds[1::2] = start_rows * columns + ends
+    peaks = np.maximum.reduceat(flat, bounds)[0::2]
+
+    breaches = Breaches(
+        history.labels,
+        start_rows,
+        history.timestamps[starts],
+        history.timestamps[ends - 1] + history.step,
+        peaks,
+    )
+    keep = breaches.durations >= min_duration
+    if keep.all():
+        return breaches
+    return Breaches(
+        history.labels,
+        start_rows[keep],
+        breaches.starts[keep],
+        breaches.ends[keep],
+        peaks[keep],
+    )
+
+
+def burn_rates(
+    history: MetricHistory,
+    threshold: float,
+    objective: float,
+    windows: Sequence[float],
+) -> Dict[float, np.ndarray]:
+    """
+    Compute the error budget burn rate of every series over trailing windows.
+
+    A sample is bad when it is at or above ``threshold``; the burn rate is
+    the bad fraction of the window divided by the error budget
+    (``1 - objective``), so 1.0 spends the budget exactly over the SLO
+    period. Missing samples count as neither good nor bad.
+
+    Returns:
+        Matrix of shape ``(S, T)`` per window in seconds; NaN where the
+        window has no sample
+    """
+    values = history.values
+    with np.errstate(invalid="ignore"):
+        bad = values >= threshold
+    bad_totals = np.cumsum(bad, axis=1, dtype=np.int32)
+    valid_totals = np.cumsum(~np.isnan(values), axis=1, dtype=np.int32)
+    budget = 1.0 - objective
+
+    rates = {}
+    for window in windows:
+        samples = history.samples_in(window)
+        allowed = _trailing_sums(valid_totals, samples) * budget
+        # A window without samples has no bad ones either: 0 / 0 is NaN
+        with np.errstate(invalid="ignore"):
+            rates[window] = np.divide(
+                _trailing_sums(bad_totals, samples), allowed, out=allowed
+            )
+    return rates
+
+
+def burn_rate_alerts(
+    history: MetricHistory,
+    threshold: float,
+    objective: float,
+    windows: Sequence[Tuple[float, float, float]] = BURN_RATE_WINDOWS,
+) -> List[BurnRateAlert]:
+    """
+    Evaluate multiwindow burn rate alerts for every series.
+
+    A ``(long, short, rate)`` pair fires while both windows burn at least
+    ``rate`` times faster than the budget allows: the long window proves
+    the burn is significant, the short one that it is still happening.
+
+    Returns:
+        One alert per series and pair that fired at any time
+    """
+    durations = sorted({window for pair in windows for window in pair[:2]})
+    rates = burn_rates(history, threshold, objective, durations)
+    alerts = []
+    for long_window, short_window, rate in windows:
+        with np.errstate(invalid="ignore"):
+            firing = (rates[long_window] >= rate) & (rates[short_window] >= rate)
+        fired = np.flatnonzero(firing.any(axis=1))
+        seconds = firing[fired].sum(axis=1) * history.step
+        peaks = np.fmax.reduce(rates[long_window][fired], axis=1)
+        for row, firing_seconds, peak in zip(fired, seconds, peaks):
+            alerts.append(
+                BurnRateAlert(
+                    history.labels[row],
+                    long_window,
+                    short_window,
+                    rate,
+                    float(firing_seconds),
+                    bool(firing[row, -1]),
+                    float(peak),
+                )
+            )
+    return alerts
+
+
+def evaluate_history(
+    history: MetricHistory,
+    resource: str,
+    threshold: float,
+    objective: float = DEFAULT_OBJECTIVE,
+    quantile: float = 0.95,
+    rolling_window: float = 300.0,
+    min_breach: float = 0.0,
+) -> ThresholdEvaluation:
+    """
+    Evaluate one resource's history against its threshold and SLO.
+
+    Args:
+        history: Usage percentages per series
+        resource: Name for the report
+        threshold: Critical level in percent
+        objective: Target fraction of samples below the threshold
+        quantile: Quantile of the rolling percentile
+        rolling_window: Rolling percentile window in seconds
+        min_breach: Shortest breach to report, in seconds
+
+    Returns:
+        ThresholdEvaluation with rolling percentiles, breaches and alerts
+    """
+    return ThresholdEvaluation(
+        resource,
+        threshold,
+        objective,
+        history,
+        rolling_percentile(
+            history.values, history.samples_in(rolling_window), quantile
+        ),
+        breach_windows(history, threshold, min_breach),
+        burn_rate_alerts(history, threshold, objective),
+    )
+
+
+def evaluate_resources(
+    prometheus_url: str = "http://localhost:9090",
+    window: float = DEFAULT_WINDOW,
+    step: float = DEFAULT_STEP,
+    objective: float = DEFAULT_OBJECTIVE,
+    session: Optional[requests.Session] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> Dict[str, ThresholdEvaluation]:
+    """
+    Evaluate CPU, memory and disk usage of the stack over a window.
+
+    CPU and memory are per container (cAdvisor), disk per filesystem
+    (node-exporter), each against the monitor script's threshold.
+
+    Returns:
+        ThresholdEvaluation per resource
+    """
+    end = time.time() // step * step
+    evaluations = {}
+    for resource, expr in RESOURCE_QUERIES.items():
+        export = export_range(
+            expr,
+            end - window,
+            end,
+            step,
+            prometheus_url,
+            session=session,
+            cache_dir=cache_dir,
+        )
+        evaluations[resource] = evaluate_history(
+            MetricHistory.from_export(export),
+            resource,
+            THRESHOLDS[resource],
+            objective,
+        )
+    return evaluations
+
+
+def _series_name(labels: Dict[str, str]) -> str:
+    for key in ("name", "mountpoint", "instance"):
+        if key in labels:
+            return labels[key]
+    return ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+
+
+def format_evaluation_report(evaluations: Dict[str, ThresholdEvaluation]) -> str:
+    """Render the status, compliance, breaches and alerts of every resource."""
+    icons = {"critical": "❌", "warning": "⚠️ ", "ok": "✅"}
+    lines = ["🎯 Threshold and SLO evaluation"]
+    for evaluation in evaluations.values():
+        lines.append("")
+        lines.append(
+            f"{evaluation.resource.upper()} (threshold {evaluation.threshold:g}%, "
+            f"objective {evaluation.objective:.2%})"
+        )
+        latest = [
+            row[~np.isnan(row)][-1] if (~np.isnan(row)).any() else np.nan
+            for row in evaluation.rolling
+        ]
+        for labels, status, p95, compliance in zip(
+            evaluation.history.labels,
+            evaluation.status(),
+            latest,
+            evaluation.compliance,
+        ):
+            lines.append(
+                f"  {icons[status]} {_series_name(labels)[:40]:<40} "
+                f"p95 {p95:>6.1f}%  compliance {compliance:>8.3%}"
+            )
+        for breach in evaluation.breaches.longest(5):
+            lines.append(
+                f"  🔥 {_series_name(breach.labels)[:40]:<40} "
+                f"{breach.duration / 60:>6.1f} min, peak {breach.peak:.1f}% "
+                f"at {time.strftime('%Y-%m-%d %H:%M', time.localtime(breach.start))}"
+            )
+        for alert in evaluation.alerts:
+            state = "FIRING" if alert.firing_now else "fired"
+            lines.append(
+                f"  🚨 {_series_name(alert.labels)[:40]:<40} {state} "
+                f"{alert.burn_rate:g}x over {alert.long_window / 3600:g}h/"
+                f"{alert.short_window / 60:g}m for {alert.firing_seconds / 60:.0f} min"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Evaluate the stack's resource history and print the report."""
+    parser = argparse.ArgumentParser(description="Evaluate thresholds and SLOs")
+    parser.add_argument("--prometheus-url", default="http://localhost:9090")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="s")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP, help="s")
+    parser.add_argument("--objective", type=float, default=DEFAULT_OBJECTIVE)
+    args = parser.parse_args(argv)
+
+    evaluations = evaluate_resources(
+        args.prometheus_url, args.window, args.step, args.objective
+    )
+    print(format_evaluation_report(evaluations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Synthetic high-cardinality exporter.
+
+Serves a ``/metrics`` endpoint whose size and shape are configurable: the
+number of counter/gauge metrics, series per metric (label cardinality),
+extra labels per series, histogram metrics and buckets, and a churn rate
+at which series are replaced by new ones (a ``pod`` label that changes, as
+with redeployed containers). The body is plain text exposition format, so
+it can be fed to ``parse_prometheus_metrics``, the streaming parser
+benchmark, or scraped by the local Prometheus to measure ingestion at a
+multiple of the stack's real series count.
+
+Usage:
+    python -m src.utils.synthetic_exporter --target-series 500000 --churn 0.05
+    python -m src.utils.prometheus_text http://localhost:9500/metrics
+
+To let the local Prometheus scrape it, add a job to ``prometheus.yml``:
+    - job_name: 'synthetic-exporter'
+      static_configs:
+        - targets: ['host.docker.internal:9500']
+"""
+
+import argparse
+import gzip
+import math
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_PORT = 9500
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    Shape of the synthetic exporter's output.
+
+    Attributes:
+        metrics: Counter and gauge metrics (alternating)
+        series_per_metric: Series of each metric, i.e. ``pod`` cardinality
+        labels: Extra labels per series, each with fewer distinct values
+        histograms: Histogram metrics, with ``series_per_metric`` series each
+        buckets: Buckets per histogram (exponential bounds, plus ``+Inf``)
+        churn: Fraction of each metric's series replaced per churn interval
+        churn_interval: Seconds between churn steps
+    """
+
+    metrics: int = 50
+    series_per_metric: int = 100
+    labels: int = 3
+    histograms: int = 5
+    buckets: int = 10
+    churn: float = 0.0
+    churn_interval: float = 60.0
+
+    @property
+    def series(self) -> int:
+        """Return the number of series in one scrape."""
+        histogram_series = self.series_per_metric * (self.buckets + 3)
+        return (
+            self.metrics * self.series_per_metric + self.histograms * histogram_series
+        )
+
+    @classmethod
+    def for_series(cls, target: int, **overrides: Any) -> "SyntheticConfig":
+        """Return a config sized to roughly ``target`` series per scrape."""
+        config = cls(**overrides)
+        per_series = config.metrics + config.histograms * (config.buckets + 3)
+        config.series_per_metric = max(1, round(target / per_series))
+        return config
+
+
+class SyntheticExporter:
+    """
+    Renders the exposition body for a ``SyntheticConfig``.
+
+    Label sets only change when the churn step does, so they are built once
+    per step and each scrape only formats the current values.
+
+    Args:
+        config: Output shape
+        clock: Time source, for deterministic tests
+    """
+
+    def __init__(
+        self, config: SyntheticConfig, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.config = config
+        self.clock = clock
+        self.started = clock()
+        self._lock = threading.Lock()
+        self._label_cache: Tuple[int, List[str]] = (-1, [])
+        self._bounds = [0.001 * 2**index for index in range(config.buckets)]
+
+    def churn_step(self) -> int:
+        """Return the number of churn steps since the exporter started."""
+        if not self.config.churn or self.config.churn_interval <= 0:
+            return 0
+        return int((self.clock() - self.started) / self.config.churn_interval)
+
+    def pod_id(self, index: int, step: int) -> int:
+        """
+        Return the ``pod`` identity of series ``index`` at a churn step.
+
+        Every step replaces the next ``churn * series_per_metric`` series in
+        round-robin order; a replaced series is identified by the number of
+        series plus its position in that sequence, so identities are never
+        reused.
+        """
+        count = self.config.series_per_metric
+        replaced = step * max(1, round(self.config.churn * count))
+        if not self.config.churn or replaced <= index:
+            return index
+        return count + replaced - 1 - ((replaced - 1 - index) % count)
+
+    def label_sets(self) -> List[str]:
+        """Return the label set of every series index at the current step."""
+        step = self.churn_step()
+        with self._lock:
+            cached_step, cached = self._label_cache
+            if cached_step == step:
+                return cached
+
+            config = self.config
+            label_sets = []
+            for index in range(config.series_per_metric):
+                pairs = [f'pod="pod-{self.pod_id(index, step)}"']
+                for label in range(config.labels):
+                    values = max(1, config.series_per_metric // 10 ** (label + 1))
+                    pairs.append(f'label_{label}="value-{index % values}"')
+                label_sets.append(",".join(pairs))
+            self._label_cache = (step, label_sets)
+            return label_sets
+
+    def render(self) -> str:
+        """Render the exposition body for the current time."""
+        config = self.config
+        elapsed = self.clock() - self.started
+        label_sets = self.label_sets()
+        lines: List[str] = []
+
+        for metric in range(config.metrics):
+            if metric % 2 == 0:
+                name = f"synthetic_metric_{metric}_total"
+                lines += [f"# HELP {name} Synthetic counter.", f"# TYPE {name} counter"]
+                lines += [
+                    f"{name}{{{labels}}} {(index + 1) * (elapsed + 1):.3f}"
+                    for index, labels in enumerate(label_sets)
+                ]
+            else:
+                name = f"synthetic_metric_{metric}"
+                level = 50 + 50 * math.sin(elapsed / 30 + metric)
+                lines += [f"# HELP {name} Synthetic gauge.", f"# TYPE {name} gauge"]
+                lines += [
+                    f"{name}{{{labels}}} {level + index % 7:.3f}"
+                    for index, labels in enumerate(label_sets)
+                ]
+
+        scrapes = int(elapsed) + 1
+        bounds = [f"{bound:g}" for bound in self._bounds] + ["+Inf"]
+        for histogram in range(config.histograms):
+            name = f"synthetic_latency_{histogram}_seconds"
+            lines += [f"# HELP {name} Synthetic histogram.", f"# TYPE {name} histogram"]
+            for labels in label_sets:
+                lines += [
+                    f'{name}_bucket{{{labels},le="{bound}"}} '
+                    f"{scrapes * (position + 1) // len(bounds)}"
+                    for position, bound in enumerate(bounds)
+                ]
+                lines.append(f"{name}_sum{{{labels}}} {scrapes * 0.05:.3f}")
+                lines.append(f"{name}_count{{{labels}}} {scrapes}")
+        return "\n".join(lines) + "\n"
+
+
+def serve(
+    exporter: SyntheticExporter, host: str = "0.0.0.0", port: int = DEFAULT_PORT
+) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server for ``exporter`` (call ``serve_forever`` on it).
+
+    ``/metrics`` is gzip-compressed when the client accepts it, as
+    Prometheus does; every other path is a 404.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = exporter.render().encode()
+            headers: Dict[str, str] = {"Content-Type": CONTENT_TYPE}
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+            self.send_response(200)
+            for header, value in headers.items():
+                self.send_header(header, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the synthetic exporter until interrupted."""
+    parser = argparse.ArgumentParser(description="Synthetic high-cardinality exporter")
+    parser.add_argument("--host", default="0.0.0.0")  # nosec B104 - for Prometheus
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--metrics", type=int, default=50)
+    parser.add_argument("--series-per-metric", type=int, default=100)
+    parser.add_argument("--labels", type=int, default=3)
+    parser.add_argument("--histograms", type=int, default=5)
+    parser.add_argument("--buckets", type=int, default=10)
+    parser.add_argument("--churn", type=float, default=0.0, help="fraction")
+    parser.add_argument("--churn-interval", type=float, default=60.0, help="s")
+    parser.add_argument(
+        "--target-series", type=int, help="size series per metric to this total"
+    )
+    args = parser.parse_args(argv)
+
+    shape = {
+        "metrics": args.metrics,
+        "labels": args.labels,
+        "histograms": args.histograms,
+        "buckets": args.buckets,
+        "churn": args.churn,
+        "churn_interval": args.churn_interval,
+    }
+    if args.target_series:
+        config = SyntheticConfig.for_series(args.target_series, **shape)
+    else:
+        config = SyntheticConfig(series_per_metric=args.series_per_metric, **shape)
+
+    exporter = SyntheticExporter(config)
+    started = time.perf_counter()
+    size = len(exporter.render())
+    print(
+        f"🧪 {config.series:,} series, {size / 1024 / 1024:.1f} MB per scrape "
+        f"(rendered in {time.perf_counter() - started:.2f}s)"
+    )
+    server = serve(exporter, args.host, args.port)
+    print(f"📡 Serving http://{args.host}:{args.port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
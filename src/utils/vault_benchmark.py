@@ -0,0 +1,227 @@
+"""
+Vault KV v2 and transit throughput benchmark.
+
+Uses ``VAULT_DEV_ROOT_TOKEN_ID`` to mount a KV v2 engine and a transit engine
+(``VAULT_BENCH_KV_MOUNT`` / ``VAULT_BENCH_TRANSIT_MOUNT``, created on first
+use) and sweeps concurrency and payload size for four operations:
+
+- ``kv_write``: ``POST <kv>/data/<key>``
+- ``kv_read``: ``GET <kv>/data/<key>`` over a pre-written key space
+- ``transit_encrypt``: ``POST <transit>/encrypt/<key>``
+- ``transit_decrypt``: ``POST <transit>/decrypt/<key>``
+
+Reads model the service startup path: many clients fetching a small set of
+secrets at once, as during a deploy storm.
+
+Usage:
+    python -m src.utils.vault_benchmark --concurrency 1,8,32 --sizes 64,4096
+"""
+
+import argparse
+import base64
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv  # type: ignore[import-untyped]
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.load_testing import LoadResult, format_load_table, run_load
+
+load_dotenv()
+
+OPERATIONS = ("kv_write", "kv_read", "transit_encrypt", "transit_decrypt")
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_PAYLOAD_SIZES = (64, 1024, 16384)
+DEFAULT_DURATION = 10.0
+DEFAULT_TIMEOUT = 10
+# Number of distinct secrets read back; roughly one per service
+DEFAULT_KEY_SPACE = 32
+TRANSIT_KEY = "bench"
+KV_MOUNT = os.getenv("VAULT_BENCH_KV_MOUNT", "bench-kv")
+TRANSIT_MOUNT = os.getenv("VAULT_BENCH_TRANSIT_MOUNT", "bench-transit")
+
+
+class VaultBenchmarkError(Exception):
+    """Custom exception for Vault benchmark failures."""
+
+
+class VaultClient:
+    """Minimal token-authenticated client for the benchmarked engines."""
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        session: Optional[TimedSession] = None,
+        kv_mount: str = KV_MOUNT,
+        transit_mount: str = TRANSIT_MOUNT,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.base_url = base_url
+        self.kv_mount = kv_mount
+        self.transit_mount = transit_mount
+        self.timeout = timeout
+        self.session = session or TimedSession("vault", recorder=TimingRecorder())
+        self.session.headers["X-Vault-Token"] = token
+
+    def _call(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        response = self.session.request(
+            method, f"{self.base_url}/v1/{path}", json=payload, timeout=self.timeout
+        )
+        if response.status_code not in (200, 204):
+            raise VaultBenchmarkError(
+                f"{method} /v1/{path} failed: HTTP {response.status_code} "
+                f"{response.text[:200]}"
+            )
+        return response.json() if response.content else {}
+
+    def prepare(self) -> None:
+        """
+        Mount the KV v2 and transit engines and create the transit key.
+
+        Existing mounts and keys are reused.
+
+        Raises:
+            VaultBenchmarkError: If Vault is sealed or the token lacks rights
+        """
+        mounts = self._call("GET", "sys/mounts")
+        mounted = set(mounts.get("data", mounts))
+        engines: List[Tuple[str, Dict[str, Any]]] = [
+            (self.kv_mount, {"type": "kv", "options": {"version": "2"}}),
+            (self.transit_mount, {"type": "transit"}),
+        ]
+        for path, config in engines:
+            if f"{path}/" not in mounted:
+                self._call("POST", f"sys/mounts/{path}", config)
+        self._call("POST", f"{self.transit_mount}/keys/{TRANSIT_KEY}")
+
+    def kv_write(self, key: str, value: str) -> None:
+        """Write a secret version."""
+        self._call("POST", f"{self.kv_mount}/data/{key}", {"data": {"value": value}})
+
+    def kv_read(self, key: str) -> str:
+        """Read the latest secret version."""
+        document = self._call("GET", f"{self.kv_mount}/data/{key}")
+        return document["data"]["data"]["value"]
+
+    def encrypt(self, plaintext: bytes) -> str:
+        """Encrypt with the transit key and return the ciphertext."""
+        document = self._call(
+            "POST",
+            f"{self.transit_mount}/encrypt/{TRANSIT_KEY}",
+            {"plaintext": base64.b64encode(plaintext).decode()},
+        )
+        return document["data"]["ciphertext"]
+
+    def decrypt(self, ciphertext: str) -> bytes:
+        """Decrypt a transit ciphertext."""
+        document = self._call(
+            "POST",
+            f"{self.transit_mount}/decrypt/{TRANSIT_KEY}",
+            {"ciphertext": ciphertext},
+        )
+        return base64.b64decode(document["data"]["plaintext"])
+
+
+def _operation(
+    name: str, client: VaultClient, payload_size: int, key_space: int
+) -> Callable[[int], Any]:
+    """Build the per-call operation, seeding whatever it reads back."""
+    payload = os.urandom(payload_size)
+    value = base64.b64encode(payload).decode()[:payload_size]
+
+    if name == "kv_write":
+        return lambda i: client.kv_write(f"bench/{payload_size}/{i % key_space}", value)
+
+    if name == "kv_read":
+        for index in range(key_space):
+            client.kv_write(f"bench/{payload_size}/{index}", value)
+        return lambda i: client.kv_read(f"bench/{payload_size}/{i % key_space}")
+
+    if name == "transit_encrypt":
+        return lambda _: client.encrypt(payload)
+
+    if name == "transit_decrypt":
+        ciphertext = client.encrypt(payload)
+        return lambda _: client.decrypt(ciphertext)
+
+    raise ValueError(f"Unknown operation: {name}")
+
+
+def benchmark_vault(
+    base_url: Optional[str] = None,
+    token: Optional[str] = None,
+    operations: Sequence[str] = OPERATIONS,
+    concurrency_levels: Sequence[int] = DEFAULT_CONCURRENCY,
+    payload_sizes: Sequence[int] = DEFAULT_PAYLOAD_SIZES,
+    duration: float = DEFAULT_DURATION,
+    key_space: int = DEFAULT_KEY_SPACE,
+) -> List[LoadResult]:
+    """
+    Sweep Vault KV and transit operations over concurrency and payload size.
+
+    Args:
+        base_url: Vault URL (defaults to ``VAULT_ADDR`` or localhost:8200)
+        token: Vault token (defaults to ``VAULT_DEV_ROOT_TOKEN_ID``)
+        operations: Operations to run, see module docstring
+        concurrency_levels: Worker counts to sweep
+        payload_sizes: Secret / plaintext sizes in bytes
+        duration: Seconds per scenario
+        key_space: Number of distinct KV keys written and read
+
+    Returns:
+        One LoadResult per operation/payload size/concurrency
+
+    Raises:
+        VaultBenchmarkError: If no token is available or setup fails
+    """
+    base_url = base_url or os.getenv("VAULT_ADDR") or "http://localhost:8200"
+    token = token or os.getenv("VAULT_DEV_ROOT_TOKEN_ID")
+    if not token:
+        raise VaultBenchmarkError("VAULT_DEV_ROOT_TOKEN_ID is not set")
+
+    with TimedSession("vault", recorder=TimingRecorder()) as session:
+        VaultClient(base_url, token, session=session).prepare()
+
+    results = []
+    for name in operations:
+        for payload_size in payload_sizes:
+            for concurrency in concurrency_levels:
+                with TimedSession(
+                    "vault", recorder=TimingRecorder(), pool_maxsize=concurrency
+                ) as session:
+                    client = VaultClient(base_url, token, session=session)
+                    result = run_load(
+                        _operation(name, client, payload_size, key_space),
+                        concurrency=concurrency,
+                        duration=duration,
+                        name="vault",
+                    )
+                result.labels = {"op": name, "bytes": payload_size}
+                results.append(result)
+
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the benchmark from the command line and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--sizes", default="64,1024,16384")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument("--operations", default=",".join(OPERATIONS))
+    args = parser.parse_args(argv)
+
+    results = benchmark_vault(
+        operations=args.operations.split(","),
+        concurrency_levels=[int(level) for level in args.concurrency.split(",")],
+        payload_sizes=[int(size) for size in args.sizes.split(",")],
+        duration=args.duration,
+    )
+    print(format_load_table(results, "🔒 Vault KV / transit benchmark"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Load test for the webhook listener using Alertmanager-shaped payloads.
+
+Alertmanager delivers one POST per alert group (webhook payload version 4)
+to ``http://webhook-listener:5001/alert``. This module pre-renders groups of
+varying size and replays them against the listener at a fixed rate
+(open-loop) or as fast as the workers allow, reporting acceptance
+throughput, latency percentiles and error rates.
+
+Usage:
+    python -m src.utils.webhook_load --alerts 1,10,100 --rate 50 --concurrency 16
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.utils.http_timing import TimedSession, TimingRecorder
+from src.utils.load_testing import LoadResult, format_load_table, run_load
+
+DEFAULT_URL = os.getenv("WEBHOOK_LISTENER_URL", "http://localhost:5001/alert")
+DEFAULT_ALERTS_PER_GROUP = (1, 10, 100)
+DEFAULT_CONCURRENCY = (4, 16)
+DEFAULT_DURATION = 10.0
+DEFAULT_TIMEOUT = 10
+# Distinct pre-rendered groups per size, so consecutive posts differ
+PAYLOAD_VARIANTS = 16
+
+
+def build_alertmanager_payload(
+    alert_count: int,
+    alertname: str = "LoadTestAlert",
+    group_index: int = 0,
+    status: str = "firing",
+    receiver: str = "webhook-rabbitmq",
+    annotation_size: int = 200,
+) -> Dict[str, Any]:
+    """
+    Build an Alertmanager webhook (version 4) payload for one alert group.
+
+    Args:
+        alert_count: Number of alerts in the group
+        alertname: Group label shared by every alert, as in ``group_by``
+        group_index: Distinguishes otherwise identical groups
+        status: ``firing`` or ``resolved``
+        receiver: Receiver name reported by Alertmanager
+        annotation_size: Approximate description length per alert, in chars
+
+    Returns:
+        Payload dictionary ready to be serialized as JSON
+    """
+    starts_at = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(
+        minutes=group_index
+    )
+    common_labels = {
+        "alertname": alertname,
+        "severity": "critical",
+        "job": "load-test",
+    }
+    alerts = []
+    for index in range(alert_count):
+        instance = f"load-test-{group_index}-{index}:9100"
+        labels = {**common_labels, "instance": instance}
+        fingerprint = hashlib.sha256(
+            json.dumps(labels, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        alerts.append(
+            {
+                "status": status,
+                "labels": labels,
+                "annotations": {
+                    "summary": f"{alertname} on {instance}",
+                    "description": ("x" * annotation_size),
+                },
+                "startsAt": starts_at.isoformat().replace("+00:00", "Z"),
+                "endsAt": "0001-01-01T00:00:00Z",
+                "generatorURL": "http://prometheus:9090/graph?g0.expr=up",
+                "fingerprint": fingerprint,
+            }
+        )
+
+    return {
+        "version": "4",
+        "groupKey": f'{{}}:{{alertname="{alertname}"}}',
+        "truncatedAlerts": 0,
+        "status": status,
+        "receiver": receiver,
+        "groupLabels": {"alertname": alertname},
+        "commonLabels": common_labels,
+        "commonAnnotations": {},
+        "externalURL": "http://alertmanager:9093",
+        "alerts": alerts,
+    }
+
+
+def render_payloads(alert_count: int, variants: int = PAYLOAD_VARIANTS) -> List[bytes]:
+    """Pre-serialize payload variants so the load loop only sends bytes."""
+    return [
+        json.dumps(
+            build_alertmanager_payload(
+                alert_count, alertname=f"LoadTestAlert{index}", group_index=index
+            )
+        ).encode()
+        for index in range(variants)
+    ]
+
+
+def benchmark_webhook_listener(
+    url: str = DEFAULT_URL,
+    alerts_per_group: Sequence[int] = DEFAULT_ALERTS_PER_GROUP,
+    concurrency_levels: Sequence[int] = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    duration: float = DEFAULT_DURATION,
+) -> List[LoadResult]:
+    """
+    Replay Alertmanager-shaped payloads against the webhook listener.
+
+    Args:
+        url: Listener endpoint that Alertmanager posts to
+        alerts_per_group: Group sizes to sweep
+        concurrency_levels: Worker counts to sweep
+        rate: Target posts per second (open-loop); None runs closed-loop
+        duration: Seconds per scenario
+
+    Returns:
+        One LoadResult per group size/concurrency, labelled with the group
+        size and payload bytes. Non-2xx responses count as errors.
+    """
+    results = []
+    for alert_count in alerts_per_group:
+        payloads = render_payloads(alert_count)
+
+        for concurrency in concurrency_levels:
+            with TimedSession(
+                "webhook-listener", recorder=TimingRecorder(), pool_maxsize=concurrency
+            ) as session:
+
+                def post(iteration: int) -> None:
+                    response = session.post(
+                        url,
+                        data=payloads[iteration % len(payloads)],
+                        headers={"Content-Type": "application/json"},
+                        timeout=DEFAULT_TIMEOUT,
+                    )
+                    response.raise_for_status()
+
+                result = run_load(
+                    post,
+                    concurrency=concurrency,
+                    duration=duration,
+                    name="webhook",
+                    rate=rate,
+                )
+            result.labels = {
+                "alerts": alert_count,
+                "bytes": len(payloads[0]),
+                "rate": rate or "max",
+            }
+            results.append(result)
+
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the load test from the command line and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--alerts", default="1,10,100")
+    parser.add_argument("--concurrency", default="4,16")
+    parser.add_argument("--rate", type=float, default=0, help="posts/s, 0 = max")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    args = parser.parse_args(argv)
+
+    results = benchmark_webhook_listener(
+        url=args.url,
+        alerts_per_group=[int(count) for count in args.alerts.split(",")],
+        concurrency_levels=[int(level) for level in args.concurrency.split(",")],
+        rate=args.rate or None,
+        duration=args.duration,
+    )
+    print(format_load_table(results, "🔗 Webhook listener ingestion"))
+
+
+if __name__ == "__main__":
+    main()